@@ -0,0 +1,424 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Batch game annotation for Chess by Chris. Every move of a directory of
+#   recorded games (PGN files and binary move logs) is given the engine's score,
+#   the engine's best move and a flag if it lost too much ("?!" an inaccuracy, "?"
+#   a mistake, "??" a blunder), and the games are written out as annotated PGN.
+#   The scores are written as PGN "[%eval]" comments from white's side.
+#
+#   The positions are searched by a pool of worker processes. Positions which
+#   come up more than once (the openings of most games, for one) are only searched
+#   once: every search result goes into a hash table in shared memory, which the
+#   workers and the main process all look in before searching.
+#
+#   The games are handled a window of games at a time. Once a window is written
+#   (and flushed to disk), a checkpoint file next to the output records how far
+#   the annotation has got, so an interrupted run carries on from there when it
+#   is started again with the same settings.
+#
+#   Usage:
+#       python annotate.py games --output annotated.pgn [--depth 2] [--workers 4]
+
+import os
+import sys
+import json
+import time
+import argparse
+from multiprocessing import RawArray
+from concurrent.futures import ProcessPoolExecutor
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pgn
+import movelog
+from main import start_fen
+from engine import Engine, mate_score
+
+# Default number of entries of the shared hash table (16 bytes each).
+default_table_size = 1 << 20
+
+# Games annotated between two checkpoints.
+default_window = 8
+
+# Positions handed to a worker at a time.
+chunk_positions = 16
+
+# Centipawns a move may lose before it is flagged, and the glyph it is given.
+default_thresholds = ((300, "??"), (100, "?"), (50, "?!"))
+
+# Scores are stored in the table offset by this, so they are never negative.
+score_offset = 1 << 20
+
+# The Engine() and shared table of a worker process (see init_worker()).
+_worker_engine = None
+_worker_board = None
+_worker_table = None
+
+
+class SharedHashTable:
+    """
+    Class SharedHashTable represents a table of search results (best move and
+    score by position hash) in shared memory, which every process of the pool
+    reads and writes without locks.
+    ----------------------------------
+    Each entry is two 64-bit words: the position hash XOR the data, and the data.
+    A process may read an entry while another is halfway through writing it, but
+    then the hash worked out from the two words does not match and the entry is
+    simply treated as missing. The data word holds the depth (bits 0-7), the move
+    code (bits 8-23), the score plus score_offset (bits 24-44) and a bit which
+    marks the entry as used (bit 63).
+    """
+    def __init__(self, size=default_table_size, words=None):
+        """
+        Constructor method for class SharedHashTable.
+        :param size: number of entries, rounded up to a power of 2.
+        :param words: the shared array of an existing table (used when a table
+            is handed to another process).
+        """
+        size = 1 << max(size - 1, 0).bit_length()
+        self._mask = size - 1
+        self._words = words if words is not None else RawArray("Q", 2 * size)
+
+    def __len__(self):
+        return self._mask + 1
+
+    def __reduce__(self):
+        # Only the shared array is handed over, never a copy of the entries.
+        return SharedHashTable, (self._mask + 1, self._words)
+
+    def get(self, key, depth):
+        """
+        This class method looks up a position.
+        :param key: the position hash (Board().get_hash()).
+        :param depth: the smallest search depth which is good enough.
+        :return: (move code or None, score), or None if the position is not in
+            the table (or was searched less deeply).
+        """
+        slot = (key & self._mask) * 2
+        check, data = self._words[slot], self._words[slot + 1]
+        if data >> 63 == 0 or check ^ data != key or data & 0xFF < depth:
+            return None
+        code = data >> 8 & 0xFFFF
+        return (None if code == 0xFFFF else code), (data >> 24 & 0x1FFFFF) - score_offset
+
+    def put(self, key, depth, code, score):
+        """This class method stores the search result of a position (move code None
+        if the position has no legal moves)."""
+        data = 1 << 63 | (score + score_offset) << 24 | (0xFFFF if code is None else code) << 8 | depth
+        slot = (key & self._mask) * 2
+        self._words[slot + 1] = data
+        self._words[slot] = key ^ data
+
+
+def init_worker(table, depth):
+    """This function is run once in each worker process. It creates the Board()
+    and Engine() the worker searches all of its positions with."""
+    global _worker_engine, _worker_board, _worker_table
+    _worker_board = pgn.new_board()
+    _worker_engine = Engine(depth)
+    _worker_table = table
+
+
+def analyze_positions(positions):
+    """
+    This function searches a chunk of positions in a worker process. A position
+    another worker has searched in the meantime is taken from the shared table.
+    :param positions: list of (position hash, FEN string) tuples.
+    :return: (list of (position hash, move code, score), number of positions
+        found in the table).
+    """
+    depth = _worker_engine.get_depth()
+    results = []
+    hits = 0
+    for key, fen in positions:
+        entry = _worker_table.get(key, depth)
+        if entry is not None:
+            hits += 1
+        else:
+            _worker_board.set_fen(fen)
+            entry = _worker_engine.search(_worker_board)
+            _worker_table.put(key, depth, entry[0], entry[1])
+        results.append((key, entry[0], entry[1]))
+    return results, hits
+
+
+def read_directory(directory, exclude=()):
+    """
+    This generator streams the games of every file in a directory (in name
+    order): PGN files (ending in .pgn) and binary move logs (any other file).
+    :param directory: directory path (or the path of a single file).
+    :param exclude: paths of files to leave out (i.e. the output file).
+    :return: yields (headers, FEN string or None, list of SAN strings or move
+        codes, result or None if it is not recorded).
+    """
+    if os.path.isdir(directory):
+        paths = [os.path.join(directory, name) for name in sorted(os.listdir(directory))]
+    else:
+        paths = [directory]
+    for path in paths:
+        if not os.path.isfile(path) or os.path.abspath(path) in exclude:
+            continue
+        if path.lower().endswith(".pgn"):
+            for game in pgn.read_games(path):
+                headers = game.get_headers()
+                yield headers, headers.get("FEN"), game.get_moves(), game.get_result()
+        else:
+            for codes in movelog.read_games(path):
+                yield {"Event": os.path.basename(path)}, None, codes, None
+
+
+def get_result_string(board):
+    """This function returns the PGN result of a game which has reached the
+    board's position ("*" if the game is not over)."""
+    reason = board.get_game_result()
+    if reason is None:
+        return "*"
+    if reason == "checkmate":
+        return "1-0" if board.get_active_p() == "B" else "0-1"
+    return "1/2-1/2"
+
+
+def replay(board, fen, moves):
+    """
+    This function replays a game and collects its positions.
+    :param board: Board() object.
+    :param fen: FEN string of the starting position, or None.
+    :param moves: list of SAN strings or move codes.
+    :return: (move codes, position hashes, FEN strings). There is one more
+        position than moves, the last one being the position after the game.
+    :raises ValueError: if a move is not legal.
+    """
+    board.set_fen(fen or start_fen)
+    codes, hashes, fens = [], [board.get_hash()], [board.to_fen()]
+    for move in moves:
+        if isinstance(move, str):
+            code = pgn.play_san(board, move)
+        else:
+            code = move
+            if board.make_encoded_move(code) is not True:
+                raise ValueError("Illegal move: %d" % code)
+        codes.append(code)
+        hashes.append(board.get_hash())
+        fens.append(board.to_fen())
+    return codes, hashes, fens
+
+
+def format_eval(score, color):
+    """This function returns a search score (for the player to move, whose color
+    is given) as a PGN eval from white's side, i.e. "0.35" or "#-3"."""
+    if color == "B":
+        score = -score
+    if abs(score) >= mate_score - 1000:
+        moves = (mate_score - abs(score) + 1) // 2
+        return "#%d" % (moves if score > 0 else -moves)
+    return "%.2f" % (score / 100.0)
+
+
+def get_best_san(board, code):
+    """This function returns the SAN (with check suffix) of a move on the board,
+    without changing the board."""
+    san = pgn.move_to_san(board, code)
+    board.make_encoded_move(code)
+    san += pgn.get_check_suffix(board)
+    board.undo_move()
+    return san
+
+
+def annotate_game(board, fen, codes, hashes, analysis, thresholds=default_thresholds):
+    """
+    ------------------------------------
+    This function builds the annotated moves of a game. A move's loss is the
+    score of the best move less the score of the move played (the score of the
+    position it leads to, turned around), both for the player who moved.
+    ------------------------------------
+    :param board: Board() object.
+    :param fen: FEN string of the starting position, or None.
+    :param codes: the move codes of the game (see replay()).
+    :param hashes: the position hashes of the game (see replay()).
+    :param analysis: dictionary of position hash: (best move code, score).
+    :param thresholds: (loss, glyph) tuples, largest loss first.
+    :return: (list of (SAN, comment) tuples for PGNWriter().write_game(), the
+        result reached on the board).
+    """
+    board.set_fen(fen or start_fen)
+    moves = []
+    for ply in range(len(codes)):
+        code = codes[ply]
+        best_code, best_score = analysis[hashes[ply]]
+        next_score = analysis[hashes[ply + 1]][1]
+        san = pgn.move_to_san(board, code)
+        best_san = get_best_san(board, best_code) if best_code is not None and best_code != code else None
+
+        board.make_encoded_move(code)
+        san += pgn.get_check_suffix(board)
+        comment = "[%%eval %s]" % format_eval(next_score, board.get_active_p())
+        if best_san is not None:
+            loss = best_score + next_score
+            for limit, glyph in thresholds:
+                if loss >= limit:
+                    san += glyph
+                    comment += " %s, best was %s" % (
+                        {"??": "Blunder", "?": "Mistake", "?!": "Inaccuracy"}.get(glyph, glyph), best_san)
+                    break
+        moves.append((san, comment))
+    return moves, get_result_string(board)
+
+
+def write_json(path, data):
+    """This function writes a JSON file under a temporary name first, then moves
+    it into place."""
+    with open(path + ".tmp", "w") as file:
+        json.dump(data, file)
+    os.replace(path + ".tmp", path)
+
+
+def annotate(directory, output, depth=2, workers=None, window=default_window, table_size=default_table_size,
+             thresholds=default_thresholds, callback=None):
+    """
+    ------------------------------------
+    This function annotates every game of a directory into a PGN file. The
+    positions of a window of games are collected, each one once, and those not
+    already in the shared table are searched by the pool. The window's games
+    are then written, and the checkpoint updated. The checkpoint (output +
+    ".checkpoint") holds the number of games done and the size of the output
+    file at that point; anything after it in the file was written by a run
+    which was interrupted, and is cut off when carrying on.
+    ------------------------------------
+    :param directory: directory of PGN files and binary move logs.
+    :param output: path of the annotated PGN file.
+    :param depth: search depth in plies.
+    :param workers: number of worker processes (default: one per CPU core).
+    :param window: games annotated between two checkpoints.
+    :param table_size: entries in the shared hash table.
+    :param thresholds: (loss, glyph) tuples, largest loss first.
+    :param callback: optional function called as callback(games done) after
+        each window.
+    :return: dictionary with games, skipped, positions, searched, table_hits,
+        seconds and positions_per_sec.
+    """
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    settings = {"directory": os.path.abspath(directory), "depth": depth,
+                "thresholds": [list(threshold) for threshold in thresholds]}
+    checkpoint_path = output + ".checkpoint"
+    exclude = [os.path.abspath(path) for path in (output, checkpoint_path, checkpoint_path + ".tmp")]
+    progress = {"settings": settings, "games": 0, "offset": 0, "written": 0, "skipped": 0, "positions": 0}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as file:
+            progress = json.load(file)
+        if progress["settings"] != settings:
+            raise ValueError("%s belongs to an annotation with different settings" % checkpoint_path)
+
+    # Games written after the last checkpoint are cut off, they are annotated
+    #   again below.
+    with open(output, "a", encoding="utf-8") as file:
+        file.truncate(progress["offset"])
+
+    table = SharedHashTable(table_size)
+    board = pgn.new_board()
+    searched = hits = 0
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(table, depth))
+    else:
+        init_worker(table, depth)
+
+    def flush_window(games, file, writer):
+        # Every position of the window is looked up in the table first, and the
+        #   rest are shared out between the workers.
+        nonlocal searched, hits
+        analysis = {}
+        pending = {}
+        for headers, fen, codes, hashes, fens, result in games:
+            for key, position in zip(hashes, fens):
+                if key in analysis or key in pending:
+                    continue
+                entry = table.get(key, depth)
+                if entry is not None:
+                    analysis[key] = entry
+                    hits += 1
+                else:
+                    pending[key] = position
+        chunks = list(pending.items())
+        chunks = [chunks[index:index + chunk_positions] for index in range(0, len(chunks), chunk_positions)]
+        for results, chunk_hits in (pool.map(analyze_positions, chunks) if pool else map(analyze_positions, chunks)):
+            hits += chunk_hits
+            searched += len(results) - chunk_hits
+            for key, code, score in results:
+                analysis[key] = (code, score)
+
+        for headers, fen, codes, hashes, fens, result in games:
+            moves, reached = annotate_game(board, fen, codes, hashes, analysis, thresholds)
+            headers = dict(headers)
+            headers["Annotator"] = "Chess by Chris (depth %d)" % depth
+            # A recorded result (i.e. a resignation) is kept unless the board
+            #   shows the game is over.
+            writer.write_game(headers, moves, reached if reached != "*" else result or "*")
+            progress["positions"] += len(codes)
+        progress["written"] += len(games)
+        writer.flush()
+        os.fsync(file.fileno())
+        progress["offset"] = file.tell()
+
+    try:
+        with open(output, "a", encoding="utf-8") as file:
+            writer = pgn.PGNWriter(file)
+            games = []
+            game_number = -1
+            for headers, fen, moves, result in read_directory(directory, exclude):
+                game_number += 1
+                if game_number < progress["games"]:
+                    continue
+                try:
+                    codes, hashes, fens = replay(board, fen, moves)
+                    games.append((headers, fen, codes, hashes, fens, result))
+                except ValueError:
+                    progress["skipped"] += 1
+                if game_number + 1 - progress["games"] >= window:
+                    flush_window(games, file, writer)
+                    progress["games"] = game_number + 1
+                    write_json(checkpoint_path, progress)
+                    games = []
+                    if callback is not None:
+                        callback(progress["games"])
+            flush_window(games, file, writer)
+            progress["games"] = max(progress["games"], game_number + 1)
+            write_json(checkpoint_path, progress)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    seconds = time.perf_counter() - start_time
+    return {
+        "games": progress["written"],
+        "skipped": progress["skipped"],
+        "positions": progress["positions"],
+        "searched": searched,
+        "table_hits": hits,
+        "seconds": seconds,
+        "positions_per_sec": (searched + hits) / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Annotate recorded games with engine scores and best moves.")
+    parser.add_argument("directory", help="directory of PGN files (.pgn) and binary move logs")
+    parser.add_argument("--output", default="annotated.pgn", help="annotated PGN file")
+    parser.add_argument("--depth", type=int, default=2, help="search depth in plies")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--window", type=int, default=default_window, help="games between checkpoints")
+    parser.add_argument("--table-size", type=int, default=default_table_size, help="shared hash table entries")
+    args = parser.parse_args(argv)
+
+    stats = annotate(args.directory, args.output, args.depth, args.workers, args.window, args.table_size,
+                     callback=lambda games: print("%d games done" % games))
+    print("games: %d (%d skipped)  moves: %d" % (stats["games"], stats["skipped"], stats["positions"]))
+    print("positions searched: %d  found in table: %d  time: %.2f s (%.1f positions/sec)" % (
+        stats["searched"], stats["table_hits"], stats["seconds"], stats["positions_per_sec"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
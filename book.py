@@ -0,0 +1,290 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Opening book for Chess by Chris, so the engine can play well known
+#   opening moves straight away instead of spending its time searching them.
+#
+#   A book is a file of 16-byte records sorted by position hash, laid out like a
+#   Polyglot book (all numbers big-endian):
+#       hash (8 bytes) | move (2 bytes) | weight (2 bytes) | learn (4 bytes)
+#   Moves are encoded the Polyglot way as well (see to_book_move()). The hashes
+#   however are the Board()'s own Zobrist hashes, not Polyglot's, so books made by
+#   other programs cannot be read here (nor ours there).
+#
+#   OpeningBook() memory-maps the file and finds a position by binary search, so
+#   opening a book reads nothing in advance, and processes using the same book
+#   share its pages. build_book() makes a book from a PGN file in a single
+#   streaming pass.
+#
+#   Usage:
+#       python book.py build games.pgn book.bin [--plies 20] [--min-games 2]
+#       python book.py probe book.bin [--fen FEN]
+
+import os
+import sys
+import mmap
+import time
+import random
+import struct
+import argparse
+
+from main import square_name
+from movelog import encode_move, decode_move, get_promotion_flag, get_promotion_letter, FLAG_CASTLE
+from pgn import PGNError, new_board, read_games, play_san
+
+record = struct.Struct(">QHHI")
+record_size = record.size
+hash_format = struct.Struct(">Q")
+
+# Promotion pieces in the order of the Polyglot move encoding (0 is no promotion).
+book_promotions = ("", "N", "B", "R", "Q")
+
+# Moves are only added to a book for this many plies from the start of a game.
+default_book_plies = 20
+
+
+def to_book_move(code):
+    """
+    This function returns the Polyglot encoding of a move code:
+        to file (bits 0-2) | to rank (bits 3-5) | from file (bits 6-8) |
+        from rank (bits 9-11) | promotion piece (bits 12-14)
+    Ranks count from white's side (rank 1 is 0), and castling is written as the
+    King taking its own Rook (i.e. e1h1 rather than e1g1).
+    :param code: move code.
+    :return: int
+    """
+    start, end, flags = decode_move(code)
+    end_col = end[1]
+    if flags == FLAG_CASTLE:
+        end_col = 7 if end_col == 6 else 0
+    promotion = book_promotions.index(get_promotion_letter(flags) or "")
+    return end_col | (7 - end[0]) << 3 | start[1] << 6 | (7 - start[0]) << 9 | promotion << 12
+
+
+def from_book_move(board, move):
+    """
+    This function returns the move code of a Polyglot encoded move on the board.
+    :param board: Board() object at the position the move is for.
+    :param move: the Polyglot encoded move.
+    :return: move code (whether or not the move is legal).
+    """
+    start = [7 - (move >> 9 & 7), move >> 6 & 7]
+    end = [7 - (move >> 3 & 7), move & 7]
+    promotion = book_promotions[move >> 12 & 7]
+
+    piece = board.get_board()[start[0]][start[1]].get_occupant()
+    if piece is not None and piece.get_letter() == "K" and start[1] == 4 and end[0] == start[0] \
+            and end[1] in (0, 7):
+        return encode_move(start, [end[0], 6 if end[1] == 7 else 2], FLAG_CASTLE)
+    if promotion:
+        return encode_move(start, end, get_promotion_flag(promotion))
+    return board.get_move_code(start, end)
+
+
+class OpeningBook:
+    """
+    Class OpeningBook represents a memory-mapped book file.
+    ----------------------------------
+    The records are never read into Python objects as a whole: a lookup reads
+    about log2(records) hashes out of the map to find the first record of a
+    position, and then the records of that position.
+    """
+    def __init__(self, path):
+        """
+        Constructor method for class OpeningBook.
+        :param path: path of the book file.
+        """
+        self._path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size % record_size != 0:
+            self._file.close()
+            raise ValueError("Not a book file: " + path)
+        self._count = size // record_size
+        # mmap cannot map an empty file.
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._random = random.Random()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def get_path(self):
+        """This class method returns the path of the book file."""
+        return self._path
+
+    def find(self, position_hash):
+        """This class method returns the index of the first record of a position
+        hash (binary search), or the number of records if there is none."""
+        low = 0
+        high = self._count
+        while low < high:
+            middle = (low + high) // 2
+            if hash_format.unpack_from(self._map, middle * record_size)[0] < position_hash:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and hash_format.unpack_from(self._map, low * record_size)[0] == position_hash:
+            return low
+        return self._count
+
+    def get_entries(self, position_hash):
+        """
+        This class method returns the records of a position.
+        :param position_hash: the position's hash (Board().get_hash()).
+        :return: list of (Polyglot move, weight, learn) tuples.
+        """
+        entries = []
+        index = self.find(position_hash)
+        while index < self._count:
+            key, move, weight, learn = record.unpack_from(self._map, index * record_size)
+            if key != position_hash:
+                break
+            entries.append((move, weight, learn))
+            index += 1
+        return entries
+
+    def get_moves(self, board):
+        """
+        This class method returns the book moves of the board's position. Moves
+        which are not legal on the board (i.e. a hash collision) are left out.
+        :param board: Board() object.
+        :return: list of (move code, weight) tuples, highest weight first.
+        """
+        buffer, count = board.generate_legal_moves(board.get_active_p())
+        legal = set(buffer[index] for index in range(count))
+        moves = []
+        for move, weight, learn in self.get_entries(board.get_hash()):
+            code = from_book_move(board, move)
+            if code in legal:
+                moves.append((code, weight))
+        moves.sort(key=lambda entry: -entry[1])
+        return moves
+
+    def choose_move(self, board, best=False):
+        """
+        This class method picks a book move for the board's position.
+        :param board: Board() object.
+        :param best: if True the move with the highest weight is picked, else a
+            move is picked at random in proportion to the weights.
+        :return: move code, or None if the position is not in the book.
+        """
+        moves = self.get_moves(board)
+        if not moves:
+            return None
+        total = sum(weight for code, weight in moves)
+        if best is True or total == 0:
+            return moves[0][0]
+        pick = self._random.randrange(total)
+        for code, weight in moves:
+            if pick < weight:
+                return code
+            pick -= weight
+        return moves[0][0]
+
+    def close(self):
+        """This class method unmaps and closes the book file."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._map = b""
+        self._count = 0
+        self._file.close()
+
+
+def build_book(source, path, plies=default_book_plies, min_games=1):
+    """
+    ------------------------------------
+    This function makes a book from the games of a PGN file. The games are read
+    one at a time (see pgn.read_games()), and only the counts of each (position,
+    move) pair are kept in memory. As in Polyglot books, a move scores 2 for a
+    win and 1 for a draw by the player who made it; the weights are scaled down
+    if needed to fit in 16 bits.
+    ------------------------------------
+    :param source: PGN file path or open text file object.
+    :param path: path of the book file to write.
+    :param plies: number of plies of each game which are added.
+    :param min_games: moves played in fewer games than this are left out.
+    :return: dictionary with games, errors, positions and records.
+    """
+    counts = {}
+    games = errors = 0
+    for game in read_games(source):
+        result = game.get_result()
+        scores = {"W": 2 if result == "1-0" else 1 if result == "1/2-1/2" else 0,
+                  "B": 2 if result == "0-1" else 1 if result == "1/2-1/2" else 0}
+        try:
+            board = new_board(game.get_headers().get("FEN"))
+            for san in game.get_moves()[:plies]:
+                position_hash = board.get_hash()
+                color = board.get_active_p()
+                key = (position_hash, to_book_move(play_san(board, san)))
+                entry = counts.get(key)
+                if entry is None:
+                    counts[key] = [1, scores[color]]
+                else:
+                    entry[0] += 1
+                    entry[1] += scores[color]
+        except (PGNError, ValueError):
+            errors += 1
+            continue
+        games += 1
+
+    entries = sorted((key[0], key[1], entry[1]) for key, entry in counts.items() if entry[0] >= min_games)
+    scale = max([weight for key, move, weight in entries] + [0xFFFF]) / 0xFFFF
+
+    # The book is written to a temporary file first, so a reader never sees a
+    #   book which is only partly written.
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        for key, move, weight in entries:
+            file.write(record.pack(key, move, int(weight / scale), 0))
+    os.replace(temporary_path, path)
+
+    return {
+        "games": games,
+        "errors": errors,
+        "positions": len(set(key for key, move, weight in entries)),
+        "records": len(entries),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or probe an opening book.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="make a book from a PGN file")
+    build.add_argument("pgn", help="PGN file")
+    build.add_argument("book", help="book file to write")
+    build.add_argument("--plies", type=int, default=default_book_plies, help="plies of each game added")
+    build.add_argument("--min-games", type=int, default=1, help="leave out moves played in fewer games")
+    probe = commands.add_parser("probe", help="list the book moves of a position")
+    probe.add_argument("book", help="book file")
+    probe.add_argument("--fen", default=None, help="position (the starting position by default)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start_time = time.perf_counter()
+        stats = build_book(args.pgn, args.book, args.plies, args.min_games)
+        print("games: %d (%d skipped)  positions: %d  records: %d  time: %.2f s" % (
+            stats["games"], stats["errors"], stats["positions"], stats["records"],
+            time.perf_counter() - start_time))
+        return
+
+    board = new_board(args.fen)
+    with OpeningBook(args.book) as book:
+        moves = book.get_moves(board)
+        total = sum(weight for code, weight in moves) or 1
+        for code, weight in moves:
+            start, end, flags = decode_move(code)
+            print("%s%s%s  %5d  %5.1f%%" % (square_name(start), square_name(end),
+                                            (get_promotion_letter(flags) or "").lower(), weight,
+                                            100.0 * weight / total))
+        if not moves:
+            print("position not in book")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Spectator broadcasts for Chess by Chris. Instead of sending the whole
+#   board to every watcher after each move, a GamePublisher encodes each move once
+#   as a small delta (the ply, the 16-bit move code and the Zobrist hash of the
+#   resulting position) and hands the same bytes to every subscriber.
+#
+#   Each subscriber has a bounded queue. A watcher which falls too far behind does
+#   not hold up the others or use up memory: its queue is emptied and it is sent a
+#   snapshot (a FEN string) of the current position instead, after which it follows
+#   the deltas again. Watchers who join late also start with a snapshot.
+#
+#   Frames are JSON lines, the same as the game server's protocol (server.py):
+#       {"op": "snapshot", "ply": 12, "hash": "9f3a...", "fen": "..."}
+#       {"op": "delta", "ply": 13, "move": 1804, "hash": "5be1..."}
+#       {"op": "end"}
+#
+#   Usage (fan-out benchmark):
+#       python broadcast.py --subscribers 1000 5000 --moves 200
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import Board, start_fen
+from movelog import decode_move, get_promotion_letter
+
+# Number of frames a subscriber may fall behind before it is resynchronized.
+default_queue_limit = 64
+
+end_frame = b'{"op": "end"}\n'
+
+
+def encode_delta(ply, code, position_hash):
+    """This function returns the delta frame for a move, as bytes."""
+    return b'{"op": "delta", "ply": %d, "move": %d, "hash": "%016x"}\n' % (ply, code, position_hash)
+
+
+def encode_snapshot(ply, position_hash, fen):
+    """This function returns the snapshot frame for a position, as bytes."""
+    return json.dumps({"op": "snapshot", "ply": ply, "hash": "%016x" % position_hash,
+                       "fen": fen}).encode("utf-8") + b"\n"
+
+
+class Subscriber:
+    """
+    Class Subscriber represents one watcher of a game: a bounded queue of frames
+    waiting to be sent to it.
+    """
+    __slots__ = ("_queue", "_limit", "_event", "_closed", "_resyncs")
+
+    def __init__(self, limit=default_queue_limit):
+        """
+        Constructor method for class Subscriber.
+        :param limit: the most frames the queue holds.
+        """
+        self._queue = deque()
+        self._limit = limit
+        self._event = None
+        self._closed = False
+        self._resyncs = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def get_resyncs(self):
+        """This class method returns how often the subscriber fell too far behind
+        and was sent a snapshot instead."""
+        return self._resyncs
+
+    def get_closed(self):
+        """This class method returns True once the broadcast has ended."""
+        return self._closed
+
+    def put(self, frame):
+        """
+        This class method adds a frame to the queue.
+        :param frame: bytes.
+        :return: False if the queue is full (the frame is not added), else True.
+        """
+        if len(self._queue) >= self._limit:
+            return False
+        self._queue.append(frame)
+        if self._event is not None:
+            self._event.set()
+        return True
+
+    def resync(self, snapshot_frame):
+        """This class method replaces everything in the queue with a snapshot."""
+        self._queue.clear()
+        self._queue.append(snapshot_frame)
+        self._resyncs += 1
+        if self._event is not None:
+            self._event.set()
+
+    def close(self):
+        """This class method ends the broadcast for the subscriber. Frames already
+        in the queue can still be read, followed by the end frame."""
+        self._queue.append(end_frame)
+        self._closed = True
+        if self._event is not None:
+            self._event.set()
+
+    def get_nowait(self):
+        """This class method returns the next frame, or None if the queue is empty."""
+        if self._queue:
+            return self._queue.popleft()
+        return None
+
+    def drain(self):
+        """This class method returns all of the queued frames joined together, and
+        empties the queue (so they can be written to a socket at once)."""
+        frames = b"".join(self._queue)
+        self._queue.clear()
+        return frames
+
+    async def wait(self):
+        """This coroutine waits until the queue has a frame in it."""
+        if self._event is None:
+            self._event = asyncio.Event()
+        while not self._queue:
+            self._event.clear()
+            await self._event.wait()
+
+
+class GamePublisher:
+    """
+    Class GamePublisher represents the broadcast of one game to its subscribers.
+    ----------------------------------
+    The publisher does not hold a Board() of its own. It asks for the current
+    position through a function only when a snapshot is needed, and the snapshot
+    frame is then shared by every subscriber which needs it at that ply.
+    """
+    def __init__(self, get_position, queue_limit=default_queue_limit):
+        """
+        Constructor method for class GamePublisher.
+        ------------------------------------
+        :param get_position: function returning (ply, position hash, FEN string)
+            of the game's current position.
+        :param queue_limit: the most frames a subscriber may fall behind.
+        """
+        self._get_position = get_position
+        self._queue_limit = queue_limit
+        self._subscribers = set()
+        self._snapshot_frame = None
+        self._published = 0
+        self._resyncs = 0
+
+    def get_subscriber_count(self):
+        """This class method returns the number of subscribers."""
+        return len(self._subscribers)
+
+    def get_published(self):
+        """This class method returns the number of deltas published."""
+        return self._published
+
+    def get_resyncs(self):
+        """This class method returns the number of snapshots sent to subscribers
+        which fell behind."""
+        return self._resyncs
+
+    def get_snapshot_frame(self):
+        """This class method returns the snapshot frame of the current position,
+        creating it only once per ply."""
+        if self._snapshot_frame is None:
+            ply, position_hash, fen = self._get_position()
+            self._snapshot_frame = encode_snapshot(ply, position_hash, fen)
+        return self._snapshot_frame
+
+    def subscribe(self):
+        """This class method adds a subscriber, which starts with a snapshot of the
+        current position."""
+        subscriber = Subscriber(self._queue_limit)
+        subscriber.put(self.get_snapshot_frame())
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """This class method removes a subscriber."""
+        self._subscribers.discard(subscriber)
+
+    def publish(self, ply, code, position_hash):
+        """
+        ------------------------------------
+        This class method sends a move to every subscriber. The delta frame is
+        encoded once and the same bytes are queued for all of them. A subscriber
+        whose queue is full is sent a snapshot instead.
+        ------------------------------------
+        :param ply: the ply of the move (1 for the first move of the game).
+        :param code: the move code.
+        :param position_hash: the hash of the position after the move.
+        :return: None
+        """
+        self._snapshot_frame = None
+        self._published += 1
+        frame = encode_delta(ply, code, position_hash)
+        for subscriber in self._subscribers:
+            if subscriber.put(frame) is False:
+                subscriber.resync(self.get_snapshot_frame())
+                self._resyncs += 1
+
+    def close(self):
+        """This class method ends the broadcast for every subscriber."""
+        for subscriber in self._subscribers:
+            subscriber.close()
+        self._subscribers.clear()
+
+
+class Spectator:
+    """
+    Class Spectator represents the watcher's side of a broadcast: a Board() kept
+    up to date from the frames. After each delta the hash of the Board() is
+    compared with the one sent, so a missed or wrong frame is noticed.
+    """
+    def __init__(self):
+        """Constructor method for class Spectator."""
+        self._board = Board()
+        self._board.generate_board()
+        self._board.set_verbose(False)
+        self._ply = 0
+        self._ended = False
+
+    def get_board(self):
+        """This class method returns the spectator's Board()."""
+        return self._board
+
+    def get_ply(self):
+        """This class method returns the ply of the spectator's position."""
+        return self._ply
+
+    def get_ended(self):
+        """This class method returns True once the end frame has been received."""
+        return self._ended
+
+    def apply_frame(self, frame):
+        """
+        This class method applies a frame to the spectator's Board().
+        :param frame: bytes (or str) of one frame.
+        :return: None. Raises ValueError if the frame does not follow on from
+            the spectator's position.
+        """
+        message = json.loads(frame)
+        if message["op"] == "snapshot":
+            self._board.set_fen(message["fen"])
+            self._ply = message["ply"]
+        elif message["op"] == "delta":
+            if message["ply"] != self._ply + 1:
+                raise ValueError("Missed a move: expected ply %d, got %d" % (self._ply + 1, message["ply"]))
+            start, end, flags = decode_move(message["move"])
+            if self._board.make_move(start, end, simulation=True, promotion=get_promotion_letter(flags) or "Q") \
+                    is not True:
+                raise ValueError("Move cannot be conducted: %d" % message["move"])
+            self._ply = message["ply"]
+        elif message["op"] == "end":
+            self._ended = True
+            return
+        else:
+            raise ValueError("Unknown frame: %r" % frame)
+
+        if "%016x" % self._board.get_hash() != message["hash"]:
+            raise ValueError("Position hash does not match at ply %d" % self._ply)
+
+
+def play_random_game(moves, seed=0):
+    """This function plays random legal moves from the starting position and
+    returns the Board() and the list of (move code, hash) after each move."""
+    generator = random.Random(seed)
+    board = Board.from_fen(start_fen)
+    board.set_verbose(False)
+    played = []
+    while len(played) < moves:
+        buffer, count = board.generate_legal_moves(board.get_active_p())
+        if count == 0:
+            board.set_fen(start_fen)
+            continue
+        code = buffer[generator.randrange(count)]
+        board.make_encoded_move(code, simulation=True)
+        played.append((code, board.get_hash()))
+    return board, played
+
+
+def benchmark(subscribers, moves=200, seed=0):
+    """
+    ------------------------------------
+    This function measures the cost of broadcasting moves to many subscribers.
+    Each subscriber's queue is drained after every move, as a connection writer
+    would. For comparison, the cost of encoding the whole board for every
+    subscriber is measured as well.
+    ------------------------------------
+    :param subscribers: number of subscribers.
+    :param moves: number of moves broadcast.
+    :param seed: random seed for the moves.
+    :return: dictionary with subscribers, moves, ns_per_delivery,
+        delta_bytes, full_board_ns_per_delivery and full_board_bytes.
+    """
+    board, played = play_random_game(moves, seed)
+    ply_box = [0]
+    publisher = GamePublisher(lambda: (ply_box[0], board.get_hash(), board.to_fen()))
+    members = [publisher.subscribe() for index in range(subscribers)]
+    for member in members:
+        member.drain()
+
+    delta_bytes = 0
+    start_time = time.perf_counter()
+    for ply in range(len(played)):
+        code, position_hash = played[ply]
+        ply_box[0] = ply + 1
+        publisher.publish(ply + 1, code, position_hash)
+        for member in members:
+            delta_bytes += len(member.drain())
+    delta_seconds = time.perf_counter() - start_time
+
+    # The naive way: every subscriber is sent the whole board after each move.
+    full_moves = max(len(played) // 10, 1)
+    full_bytes = 0
+    start_time = time.perf_counter()
+    for ply in range(full_moves):
+        for member in members:
+            full_bytes += len(encode_snapshot(ply, board.get_hash(), board.to_fen()))
+    full_seconds = time.perf_counter() - start_time
+
+    deliveries = subscribers * len(played)
+    return {
+        "subscribers": subscribers,
+        "moves": len(played),
+        "ns_per_delivery": delta_seconds / deliveries * 1e9 if deliveries else 0.0,
+        "delta_bytes": delta_bytes / deliveries if deliveries else 0.0,
+        "full_board_ns_per_delivery": full_seconds / (subscribers * full_moves) * 1e9 if subscribers else 0.0,
+        "full_board_bytes": full_bytes / (subscribers * full_moves) if subscribers else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cost of broadcasting moves to many subscribers.")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="numbers of subscribers to measure")
+    parser.add_argument("--moves", type=int, default=200, help="moves broadcast per measurement")
+    args = parser.parse_args(argv)
+
+    for subscribers in args.subscribers:
+        stats = benchmark(subscribers, args.moves)
+        print("%6d subscribers: delta %7.0f ns, %3.0f bytes per delivery | full board %7.0f ns, %3.0f bytes" % (
+            subscribers, stats["ns_per_delivery"], stats["delta_bytes"],
+            stats["full_board_ns_per_delivery"], stats["full_board_bytes"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,572 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: A simple computer player for Chess by Chris. Positions are scored
+#   by material and piece-square tables, and the best move is found with an
+#   alpha-beta search over the moves generated by Board().generate_moves().
+#   This is not a strong player, but it plays real moves, which is what the
+#   headless simulations (simulate.py) need.
+#
+#   The evaluation weights below are the hand-set defaults. If an evaluation.json
+#   file (written by tune.py) is next to this file, its weights are used instead.
+
+import os
+import json
+import time
+from array import array
+
+from main import square_name, parse_square
+from movelog import decode_move, get_end_square, get_promotion_letter, promotion_letters, FLAG_EN_PASSANT
+
+# Scores are in centipawns (1/100 of a Pawn).
+piece_values = {"": 100, "N": 320, "B": 330, "R": 500, "Q": 900, "K": 0}
+
+# Score for checkmate. Mates which take fewer moves score a little higher.
+mate_score = 100000
+
+# The search checks its time/node limits once every (check_interval + 1) positions.
+check_interval = 1023
+
+# Pawn structure: penalties for doubled and isolated Pawns, and a bonus for a
+#   passed Pawn (no enemy Pawn in front of it on its own or a neighboring column)
+#   by the number of rows it has moved up the board.
+doubled_pawn_penalty = 10
+isolated_pawn_penalty = 15
+passed_pawn_bonus = (0, 5, 10, 20, 35, 60, 100, 0)
+
+# Number of entries of the pawn hash table (a power of 2).
+default_pawn_table_size = 1 << 14
+
+# Piece-square tables: a bonus (or penalty) for a piece standing on a square. The
+#   tables are written from white's side of the board, row 0 being the 8th rank,
+#   and are flipped over for black pieces.
+piece_square_tables = {
+    "": [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    "N": [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    "B": [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    "R": [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    "Q": [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    "K": [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+# Tuned evaluation weights, read when this module is first imported (see tune.py).
+parameters_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluation.json")
+
+
+def get_parameters():
+    """This function returns the evaluation weights as a dictionary (the format
+    of evaluation.json)."""
+    return {
+        "piece_values": dict(piece_values),
+        "piece_square_tables": {letter: list(table) for letter, table in piece_square_tables.items()},
+        "doubled_pawn_penalty": doubled_pawn_penalty,
+        "isolated_pawn_penalty": isolated_pawn_penalty,
+        "passed_pawn_bonus": list(passed_pawn_bonus),
+    }
+
+
+def set_parameters(parameters):
+    """
+    This function replaces the evaluation weights. Weights missing from the
+    dictionary keep their value. Modules which copy the weights when they are
+    imported (i.e. batch.py) only see weights set before that.
+    :param parameters: dictionary in the format of get_parameters().
+    :return: None
+    """
+    global doubled_pawn_penalty, isolated_pawn_penalty, passed_pawn_bonus
+    piece_values.update(parameters.get("piece_values", {}))
+    for letter, table in parameters.get("piece_square_tables", {}).items():
+        if len(table) != 64:
+            raise ValueError("Piece-square table for %r needs 64 values" % letter)
+        piece_square_tables[letter][:] = table
+    doubled_pawn_penalty = parameters.get("doubled_pawn_penalty", doubled_pawn_penalty)
+    isolated_pawn_penalty = parameters.get("isolated_pawn_penalty", isolated_pawn_penalty)
+    if "passed_pawn_bonus" in parameters:
+        if len(parameters["passed_pawn_bonus"]) != 8:
+            raise ValueError("passed_pawn_bonus needs 8 values")
+        passed_pawn_bonus = tuple(parameters["passed_pawn_bonus"])
+
+
+def load_parameters(path=parameters_path):
+    """This function reads evaluation weights from a JSON file (see tune.py)."""
+    with open(path) as file:
+        set_parameters(json.load(file))
+
+
+if os.path.exists(parameters_path):
+    load_parameters(parameters_path)
+
+
+class PawnHashTable:
+    """
+    Class PawnHashTable represents a cache of pawn structure scores, keyed by the
+    pawn hash of the position (Board().get_pawn_hash()).
+    ----------------------------------
+    The Pawns only move now and then, so most positions a search visits share
+    their pawn structure with many others. The table has a fixed number of
+    entries, and a key always goes in the entry given by its low bits, taking
+    the place of whatever was there. The full key is stored as well, so two
+    keys sharing an entry are never mixed up.
+    """
+    def __init__(self, size=default_pawn_table_size):
+        """
+        Constructor method for class PawnHashTable.
+        :param size: number of entries, rounded up to a power of 2.
+        """
+        size = 1 << max(size - 1, 0).bit_length()
+        self._mask = size - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._scores = array("i", bytes(4 * size))
+        self._filled = bytearray(size)
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, key):
+        """This class method returns the score stored for a pawn hash, or None."""
+        slot = key & self._mask
+        if self._filled[slot] and self._keys[slot] == key:
+            self._hits += 1
+            return self._scores[slot]
+        self._misses += 1
+        return None
+
+    def put(self, key, score):
+        """This class method stores the score of a pawn hash."""
+        slot = key & self._mask
+        self._keys[slot] = key
+        self._scores[slot] = score
+        self._filled[slot] = 1
+
+    def clear(self):
+        """This class method empties the table and resets the hit counts."""
+        size = len(self._keys)
+        self._keys = array("Q", bytes(8 * size))
+        self._scores = array("i", bytes(4 * size))
+        self._filled = bytearray(size)
+        self._hits = 0
+        self._misses = 0
+
+    def get_hits(self):
+        """This class method returns the number of lookups which found a score."""
+        return self._hits
+
+    def get_misses(self):
+        """This class method returns the number of lookups which did not."""
+        return self._misses
+
+    def get_hit_rate(self):
+        """This class method returns the share (0 - 1) of lookups which found a score."""
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+
+def evaluate_pawns(board):
+    """
+    ------------------------------------
+    This function scores the pawn structure of a position: doubled, isolated
+    and passed Pawns. Only the Pawn() pieces on the board are looked at.
+    ------------------------------------
+    :param board: Board() object.
+    :return: the score in centipawns, from white's side.
+    """
+    # The rows of each color's Pawns on each column.
+    pawn_rows = {"W": [[] for col in range(8)], "B": [[] for col in range(8)]}
+    grid = board.get_board()
+    for row in range(1, 7):
+        for col in range(8):
+            piece = grid[row][col].get_occupant()
+            if piece is not None and piece.get_letter() == "":
+                pawn_rows[piece.get_color()][col].append(row)
+
+    score = 0
+    for color, sign in (("W", 1), ("B", -1)):
+        own = pawn_rows[color]
+        enemy = pawn_rows["B" if color == "W" else "W"]
+        for col in range(8):
+            if not own[col]:
+                continue
+            score -= sign * doubled_pawn_penalty * (len(own[col]) - 1)
+            neighbors = [each for each in (col - 1, col + 1) if 0 <= each <= 7]
+            if not any(own[each] for each in neighbors):
+                score -= sign * isolated_pawn_penalty * len(own[col])
+
+            # White Pawns move towards row 0, so the enemy Pawns in front of a
+            #   white Pawn are on lower rows (and the other way around).
+            for row in own[col]:
+                blockers = [enemy_row for each in [col] + neighbors for enemy_row in enemy[each]
+                            if (enemy_row < row if color == "W" else enemy_row > row)]
+                if not blockers:
+                    score += sign * passed_pawn_bonus[7 - row if color == "W" else row]
+    return score
+
+
+def evaluate(board, pawn_table=None):
+    """
+    ------------------------------------
+    This function scores a position by material, piece-square tables and the
+    pawn structure (see evaluate_pawns()).
+    ------------------------------------
+    :param board: Board() object.
+    :param pawn_table: optional PawnHashTable() the pawn structure scores are
+        cached in.
+    :return: the score in centipawns, from the side of the player to move
+        (a positive score is good for the player to move).
+    """
+    score = 0
+    grid = board.get_board()
+    for row in range(8):
+        for col in range(8):
+            piece = grid[row][col].get_occupant()
+            if piece is None:
+                continue
+            letter = piece.get_letter()
+            if piece.get_color() == "W":
+                score += piece_values[letter] + piece_square_tables[letter][row * 8 + col]
+            else:
+                score -= piece_values[letter] + piece_square_tables[letter][(7 - row) * 8 + col]
+
+    if pawn_table is None:
+        score += evaluate_pawns(board)
+    else:
+        pawn_hash = board.get_pawn_hash()
+        pawn_score = pawn_table.get(pawn_hash)
+        if pawn_score is None:
+            pawn_score = evaluate_pawns(board)
+            pawn_table.put(pawn_hash, pawn_score)
+        score += pawn_score
+
+    if board.get_active_p() == "W":
+        return score
+    return -score
+
+
+def in_check(board, color):
+    """This function returns True if the King of the color param is attacked."""
+    if color == "W":
+        king = board.get_w_king_location()
+        return board.is_square_attacked(king[0], king[1], "B")
+    king = board.get_b_king_location()
+    return board.is_square_attacked(king[0], king[1], "W")
+
+
+class Engine:
+    """
+    Class Engine represents a computer player which searches for the best move
+    with an iterative deepening alpha-beta (negamax) search.
+    ----------------------------------
+    The search conducts each move on the Board() as a simulation and takes it
+    back again with undo_move(), so the Board() is left as it was found. The
+    moves of each ply are kept in the Board()'s preallocated move buffers.
+    """
+    def __init__(self, depth=2, book=None, tablebase=None):
+        """
+        Constructor method for class Engine.
+        ------------------------------------
+        :param depth: number of plies to search.
+        :param book: optional OpeningBook() (see book.py). Positions in the book
+            are answered with a book move instead of a search.
+        :param tablebase: optional Tablebase() (see tablebase.py). Endings in the
+            tables are played from the tables instead of a search.
+        """
+        self._depth = depth
+        self._book = book
+        self._tablebase = tablebase
+        self._pawn_table = PawnHashTable()
+        self._nodes = 0
+        self._stopped = False
+        self._start_time = 0.0
+        self._deadline = None
+        self._node_limit = None
+        self._stop_event = None
+
+    def get_depth(self):
+        """This class method returns the search depth in plies."""
+        return self._depth
+
+    def set_depth(self, depth):
+        """This class method sets the search depth in plies."""
+        self._depth = depth
+
+    def get_book(self):
+        """This class method returns the OpeningBook(), or None."""
+        return self._book
+
+    def set_book(self, book):
+        """This class method sets the OpeningBook() (None for no book)."""
+        self._book = book
+
+    def get_tablebase(self):
+        """This class method returns the Tablebase(), or None."""
+        return self._tablebase
+
+    def set_tablebase(self, tablebase):
+        """This class method sets the Tablebase() (None for no tables)."""
+        self._tablebase = tablebase
+
+    def get_pawn_table(self):
+        """This class method returns the PawnHashTable() of the search (its hit
+        counts add up over all searches until it is cleared)."""
+        return self._pawn_table
+
+    def get_nodes(self):
+        """This class method returns the number of positions visited by the last
+        search."""
+        return self._nodes
+
+    def get_stopped(self):
+        """This class method returns True if the last search was stopped before
+        it finished."""
+        return self._stopped
+
+    def order_moves(self, board, buffer, count):
+        """
+        This class method returns the moves of a move buffer with captures first,
+        the most valuable captured piece first (the moves which are most likely to
+        be best, so the alpha-beta search can skip more of the others).
+        :param board: Board() object.
+        :param buffer: move buffer from Board().generate_moves().
+        :param count: number of moves in the buffer.
+        :return: list of move codes.
+        """
+        grid = board.get_board()
+        scored = []
+        for index in range(count):
+            code = buffer[index]
+            end = get_end_square(code)
+            victim = grid[end >> 3][end & 7].get_occupant()
+            if victim is not None:
+                scored.append((piece_values[victim.get_letter()], code))
+            elif code >> 12 == FLAG_EN_PASSANT:
+                scored.append((piece_values[""], code))
+            else:
+                scored.append((0, code))
+        scored.sort(key=lambda each: -each[0])
+        return [code for value, code in scored]
+
+    def search(self, board, depth=None, time_limit=None, node_limit=None, stop_event=None, callback=None):
+        """
+        ------------------------------------
+        This class method searches for the best move for the player to move.
+        The search is iterative deepening: depth 1 is searched first, then depth
+        2 and so on, with the best move of each depth searched first at the next
+        one. If the search is stopped (by the time or node limit, or the stop
+        event), the best move of the last finished depth is returned.
+        ------------------------------------
+        :param board: Board() object.
+        :param depth: optional maximum search depth, else get_depth() is used.
+        :param time_limit: optional number of seconds the search may take.
+        :param node_limit: optional number of positions the search may visit.
+        :param stop_event: optional threading.Event(), the search stops soon
+            after it is set (i.e. by another thread).
+        :param callback: optional function called after each finished depth as
+            callback(depth, score, nodes, seconds, move code).
+        :return: (move code, score). The move code is None if the player has
+            no legal moves. A book move is returned with a score of 0, and a
+            tablebase move with the score of its known result.
+        """
+        if depth is None:
+            depth = self._depth
+        self._nodes = 0
+        self._stopped = False
+        self._start_time = time.perf_counter()
+
+        if self._book is not None:
+            code = self._book.choose_move(board)
+            if code is not None:
+                return code, 0
+        if self._tablebase is not None:
+            best = self._tablebase.best_move(board)
+            if best is not None:
+                code, result, plies = best
+                return code, result * (mate_score - plies)
+        self._deadline = None if time_limit is None else self._start_time + time_limit
+        self._node_limit = node_limit
+        self._stop_event = stop_event
+
+        buffer, count = board.generate_moves(board.get_active_p(), 0)
+        root_moves = self.order_moves(board, buffer, count)
+        best_code, best_score = None, -mate_score - 1
+
+        for current_depth in range(1, depth + 1):
+            code, score = self.search_root(board, root_moves, current_depth)
+
+            # An unfinished depth is only used if no depth has finished yet.
+            if self._stopped and best_code is not None:
+                break
+            if code is None:
+                return best_code, score
+            best_code, best_score = code, score
+            root_moves.remove(code)
+            root_moves.insert(0, code)
+
+            if callback is not None:
+                callback(current_depth, best_score, self._nodes, time.perf_counter() - self._start_time, best_code)
+
+            # Once a mate is found, searching deeper cannot find a shorter one.
+            if self._stopped or abs(best_score) >= mate_score - current_depth:
+                break
+        return best_code, best_score
+
+    def search_root(self, board, moves, depth):
+        """
+        This class method searches each of the moves of the root position.
+        :param board: Board() object.
+        :param moves: list of move codes, the most promising first.
+        :param depth: search depth in plies.
+        :return: (best move code, score). The move code is None if none of the
+            moves are legal (the score is then the score of the position).
+        """
+        best_code, best_score = None, -mate_score - 1
+        alpha, beta = -mate_score - 1, mate_score + 1
+        for code in moves:
+            if board.make_encoded_move(code, simulation=True) is not True:
+                continue
+            score = -self.negamax(board, depth - 1, 1, -beta, -alpha)
+            board.undo_move()
+            if self._stopped:
+                break
+            if score > best_score:
+                best_code, best_score = code, score
+            alpha = max(alpha, score)
+
+        if best_code is None and not self._stopped:
+            best_score = -mate_score if in_check(board, board.get_active_p()) else 0
+        return best_code, best_score
+
+    def check_limits(self):
+        """This class method stops the search if the time or node limit has been
+        reached, or the stop event has been set."""
+        if (self._deadline is not None and time.perf_counter() >= self._deadline) or \
+                (self._node_limit is not None and self._nodes >= self._node_limit) or \
+                (self._stop_event is not None and self._stop_event.is_set()):
+            self._stopped = True
+
+    def negamax(self, board, depth, ply, alpha, beta):
+        """
+        This class method is the recursive part of the alpha-beta search.
+        :param board: Board() object.
+        :param depth: remaining plies to search.
+        :param ply: number of plies from the root position.
+        :param alpha: lower bound of the score.
+        :param beta: upper bound of the score.
+        :return: the score of the position for the player to move.
+        """
+        self._nodes += 1
+
+        # The limits are only checked every so often, as looking at the clock
+        #   for every position would slow the search down.
+        if self._nodes & check_interval == 0:
+            self.check_limits()
+        if self._stopped:
+            return 0
+
+        # A repeated position or the fifty move rule is (or leads to) a draw.
+        if board.is_repetition() or board.is_fifty_move_draw():
+            return 0
+        if depth <= 0:
+            return evaluate(board, self._pawn_table)
+
+        color = board.get_active_p()
+        buffer, count = board.generate_moves(color, ply)
+        legal = False
+        for code in self.order_moves(board, buffer, count):
+            if board.make_encoded_move(code, simulation=True) is not True:
+                continue
+            legal = True
+            score = -self.negamax(board, depth - 1, ply + 1, -beta, -alpha)
+            board.undo_move()
+            if self._stopped:
+                return 0
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+
+        # Without a legal move the game is over: checkmate or stalemate.
+        if legal is False:
+            return -mate_score + ply if in_check(board, color) else 0
+        return alpha
+
+    def choose_move(self, board):
+        """This class method returns the best move code for the player to move,
+        or None if there are no legal moves."""
+        return self.search(board)[0]
+
+
+def move_to_coordinates(code):
+    """This function returns a move code in coordinate notation, i.e. "e2e4", or
+    "e7e8q" for a promotion."""
+    start, end, flags = decode_move(code)
+    letter = get_promotion_letter(flags)
+    return square_name(start) + square_name(end) + (letter.lower() if letter else "")
+
+
+def coordinates_to_move(board, text):
+    """
+    This function returns the move code for a move in coordinate notation, i.e.
+    "e2e4" or "e7e8q", on the board (see Board().get_move_code()).
+    :param board: Board() object.
+    :param text: the move as a string.
+    :return: move code. Raises ValueError if the text is not a move.
+    """
+    if len(text) not in (4, 5):
+        raise ValueError("Invalid move: " + text)
+    promotion = text[4].upper() if len(text) == 5 else "Q"
+    if promotion not in promotion_letters:
+        raise ValueError("Invalid move: " + text)
+    return board.get_move_code(parse_square(text[:2]), parse_square(text[2:4]), promotion)
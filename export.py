@@ -0,0 +1,328 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Training data export for Chess by Chris. Recorded games (PGN files
+#   and binary move logs) are replayed through Board(), and every position before
+#   a move is written out for training evaluation models:
+#       planes   uint8 (N, 12, 8, 8)  the position (see batch.py)
+#       sides    int8 (N,)            1 if white is to move, -1 if black is
+#       legal    uint8 (N, 512)       the legal moves, as 4096 bits packed with
+#                                     numpy.packbits(): bit from * 64 + to
+#       moves    uint16 (N,)          the move code played (see movelog.py)
+#       results  int8 (N,)            game result from white's side (1, 0, -1)
+#       games    int32 (N,)           game number (in the order of the sources)
+#       plies    int16 (N,)           ply of the position in its game
+#
+#   Positions are collected into shards of a fixed number of positions, each a
+#   compressed .npz file, so memory use stays the same however many games are
+#   exported. The games are shared out between worker processes (game i goes to
+#   worker i % workers), and each worker writes its own shards. After each shard
+#   a worker saves how far it has got, so an interrupted export carries on where
+#   it stopped when it is started again with the same settings.
+#
+#   Needs NumPy (pip install numpy).
+#
+#   Usage:
+#       python export.py games.pgn moves.bin --output shards [--workers 4] [--shard-size 16384]
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pgn
+import movelog
+from main import start_fen
+from batch import encode_squares
+from movelog import decode_move, get_promotion_letter
+
+# Positions per shard file.
+default_shard_size = 16384
+
+# Legal moves are marked by from-square * 64 + to-square (a promotion to any piece
+#   marks the same bit).
+move_slots = 4096
+
+result_values = {"1-0": 1, "0-1": -1, "1/2-1/2": 0}
+
+
+def read_source(path):
+    """
+    This generator streams the games of a source file: a PGN file (ending in
+    .pgn) or a binary move log (see movelog.py).
+    :param path: file path.
+    :return: yields (FEN string or None, list of SAN strings or move codes,
+        result from white's side or None if it is not known).
+    """
+    if path.lower().endswith(".pgn"):
+        for game in pgn.read_games(path):
+            yield game.get_headers().get("FEN"), game.get_moves(), result_values.get(game.get_result())
+    else:
+        # Move logs do not store the result, it is found by replaying the game.
+        for codes in movelog.read_games(path):
+            yield None, codes, None
+
+
+def get_final_result(board):
+    """This function returns the result (from white's side) of a game which has
+    reached the board's position, or None if the game is not over."""
+    reason = board.get_game_result()
+    if reason is None:
+        return None
+    if reason == "checkmate":
+        return 1 if board.get_active_p() == "B" else -1
+    return 0
+
+
+class ShardWriter:
+    """
+    Class ShardWriter represents the shard being filled by one worker. The arrays
+    of a whole shard are allocated once and reused for every shard.
+    """
+    def __init__(self, directory, worker, shard_size, shards=0):
+        """
+        Constructor method for class ShardWriter.
+        :param directory: the output directory.
+        :param worker: the worker's number.
+        :param shard_size: positions per shard.
+        :param shards: number of shards the worker has already written.
+        """
+        self._directory = directory
+        self._worker = worker
+        self._size = shard_size
+        self._shards = shards
+        self._count = 0
+        self._squares = numpy.zeros((shard_size, 64), dtype=numpy.uint8)
+        self._sides = numpy.zeros(shard_size, dtype=numpy.int8)
+        self._legal = numpy.zeros((shard_size, move_slots), dtype=numpy.bool_)
+        self._moves = numpy.zeros(shard_size, dtype=numpy.uint16)
+        self._results = numpy.zeros(shard_size, dtype=numpy.int8)
+        self._games = numpy.zeros(shard_size, dtype=numpy.int32)
+        self._plies = numpy.zeros(shard_size, dtype=numpy.int16)
+
+    def get_shards(self):
+        """This class method returns the number of shards written."""
+        return self._shards
+
+    def is_full(self):
+        """This class method returns True once the shard holds shard_size positions."""
+        return self._count == self._size
+
+    def add(self, squares, side, legal, move, result, game, ply):
+        """
+        This class method adds a position to the shard.
+        :param squares: the 64 packed squares (BoardSnapshot().get_squares()).
+        :param side: 1 if white is to move, -1 if black is.
+        :param legal: list of the legal moves' from * 64 + to.
+        :param move: the move code played.
+        :param result: game result from white's side.
+        :param game: game number.
+        :param ply: ply of the position in its game.
+        :return: None
+        """
+        index = self._count
+        self._squares[index] = numpy.frombuffer(squares, dtype=numpy.uint8)
+        self._sides[index] = side
+        self._legal[index] = False
+        self._legal[index, legal] = True
+        self._moves[index] = move
+        self._results[index] = result
+        self._games[index] = game
+        self._plies[index] = ply
+        self._count += 1
+
+    def flush(self):
+        """This class method writes the shard (if it has any positions) and starts
+        the next one. The file is written under a temporary name first, so a
+        shard file is never seen half written."""
+        if self._count == 0:
+            return
+        count = self._count
+        path = os.path.join(self._directory, "shard-w%02d-%05d.npz" % (self._worker, self._shards))
+        with open(path + ".tmp", "wb") as file:
+            numpy.savez_compressed(file, planes=encode_squares(self._squares[:count]),
+                                   sides=self._sides[:count], legal=numpy.packbits(self._legal[:count], axis=1),
+                                   moves=self._moves[:count], results=self._results[:count],
+                                   games=self._games[:count], plies=self._plies[:count])
+        os.replace(path + ".tmp", path)
+        self._shards += 1
+        self._count = 0
+
+
+def write_json(path, data):
+    """This function writes a JSON file under a temporary name first, then moves
+    it into place."""
+    with open(path + ".tmp", "w") as file:
+        json.dump(data, file)
+    os.replace(path + ".tmp", path)
+
+
+def export_worker(sources, directory, worker, workers, shard_size):
+    """
+    ------------------------------------
+    This function exports the games of one worker: every game number which is
+    worker modulo workers. Its progress file records the number of shards
+    written and the (game, ply) of the first position not yet in a shard, and
+    is only updated after a shard file has been written.
+    ------------------------------------
+    :param sources: list of source file paths.
+    :param directory: the output directory.
+    :param worker: the worker's number.
+    :param workers: the number of workers.
+    :param shard_size: positions per shard.
+    :return: dictionary with games, skipped, positions and shards.
+    """
+    progress_path = os.path.join(directory, "worker-%02d.json" % worker)
+    progress = {"shards": 0, "game": 0, "ply": 0, "games": 0, "skipped": 0, "positions": 0, "done": False}
+    if os.path.exists(progress_path):
+        with open(progress_path) as file:
+            progress = json.load(file)
+    if progress["done"]:
+        return progress
+
+    board = pgn.new_board()
+    writer = ShardWriter(directory, worker, shard_size, progress["shards"])
+    games = progress["games"]
+    skipped = progress["skipped"]
+    positions = progress["positions"]
+    resume_game, resume_ply = progress["game"], progress["ply"]
+
+    game_number = -1
+    for path in sources:
+        for fen, moves, result in read_source(path):
+            game_number += 1
+            if game_number % workers != worker or game_number < resume_game:
+                continue
+
+            # The game is replayed in full first, since the result of a game from
+            #   a move log is only known at the end.
+            rows = []
+            try:
+                board.set_fen(fen or start_fen)
+                for move in moves:
+                    buffer, count = board.generate_legal_moves(board.get_active_p())
+                    legal = [(buffer[index] & 63) * 64 + (buffer[index] >> 6 & 63) for index in range(count)]
+                    squares = board.snapshot().get_squares()
+                    side = 1 if board.get_active_p() == "W" else -1
+                    if isinstance(move, str):
+                        code = pgn.play_san(board, move)
+                    else:
+                        code = move
+                        start, end, flags = decode_move(code)
+                        if board.make_move(start, end, promotion=get_promotion_letter(flags) or "Q") is not True:
+                            raise ValueError("Illegal move: %d" % code)
+                    rows.append((squares, side, legal, code))
+            except ValueError:
+                skipped += 1
+                continue
+            if result is None:
+                result = get_final_result(board)
+            if result is None:
+                skipped += 1
+                continue
+
+            first_ply = resume_ply if game_number == resume_game else 0
+            for ply in range(first_ply, len(rows)):
+                squares, side, legal, code = rows[ply]
+                writer.add(squares, side, legal, code, result, game_number, ply)
+                positions += 1
+                if writer.is_full():
+                    writer.flush()
+                    write_json(progress_path, {"shards": writer.get_shards(), "game": game_number, "ply": ply + 1,
+                                               "games": games, "skipped": skipped, "positions": positions,
+                                               "done": False})
+            games += 1
+
+    writer.flush()
+    progress = {"shards": writer.get_shards(), "game": game_number + 1, "ply": 0, "games": games,
+                "skipped": skipped, "positions": positions, "done": True}
+    write_json(progress_path, progress)
+    return progress
+
+
+def export(sources, directory, workers=None, shard_size=default_shard_size):
+    """
+    ------------------------------------
+    This function exports the positions of recorded games into shard files,
+    in a pool of worker processes. If the directory holds an unfinished export
+    with the same settings, it is carried on.
+    ------------------------------------
+    :param sources: list of PGN or binary move log file paths.
+    :param directory: the output directory.
+    :param workers: number of worker processes (default: one per CPU core).
+    :param shard_size: positions per shard.
+    :return: dictionary with games, skipped, positions, shards, seconds and
+        positions_per_sec.
+    """
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(directory, exist_ok=True)
+
+    # The settings decide which positions go into which shard, so they cannot
+    #   change between an export and its continuation.
+    settings = {"sources": [os.path.abspath(path) for path in sources], "workers": workers,
+                "shard_size": shard_size}
+    manifest_path = os.path.join(directory, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            if json.load(file) != settings:
+                raise ValueError("%s holds an export with different settings" % directory)
+    else:
+        write_json(manifest_path, settings)
+
+    if workers == 1:
+        results = [export_worker(sources, directory, 0, 1, shard_size)]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(export_worker, [sources] * workers, [directory] * workers,
+                                    range(workers), [workers] * workers, [shard_size] * workers))
+
+    seconds = time.perf_counter() - start_time
+    positions = sum(result["positions"] for result in results)
+    return {
+        "games": sum(result["games"] for result in results),
+        "skipped": sum(result["skipped"] for result in results),
+        "positions": positions,
+        "shards": sum(result["shards"] for result in results),
+        "seconds": seconds,
+        "positions_per_sec": positions / seconds if seconds else 0.0,
+    }
+
+
+def load_shard(path):
+    """
+    This function reads a shard file back.
+    :param path: path of the .npz file.
+    :return: dictionary of the arrays, with "legal" unpacked to a bool array of
+        shape (N, 4096).
+    """
+    with numpy.load(path) as data:
+        shard = {name: data[name] for name in data.files}
+    shard["legal"] = numpy.unpackbits(shard["legal"], axis=1, count=move_slots).astype(numpy.bool_)
+    return shard
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the positions of recorded games as training data.")
+    parser.add_argument("sources", nargs="+", help="PGN files (.pgn) or binary move logs")
+    parser.add_argument("--output", default="shards", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--shard-size", type=int, default=default_shard_size, help="positions per shard")
+    args = parser.parse_args(argv)
+
+    stats = export(args.sources, args.output, args.workers, args.shard_size)
+    print("games: %d (%d skipped)  positions: %d  shards: %d" % (
+        stats["games"], stats["skipped"], stats["positions"], stats["shards"]))
+    print("time: %.2f s (%.0f positions/sec)" % (stats["seconds"], stats["positions_per_sec"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Load generator for the Chess by Chris game server (server.py). It
+#   stands in for real players: many simulated clients connect at once, each
+#   starting games and playing random legal moves until the game ends. It reports
+#   requests/sec, moves/sec and the p50/p99 round trip time of the requests.
+#
+#   Usage (with a server running):
+#       python loadgen.py --port 8765 --clients 50 --games 4
+#       python loadgen.py --unix /tmp/chess.sock --clients 200 --games 1
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+# Games which are not over after this many plies are stopped.
+default_max_plies = 200
+
+
+class LoadClient:
+    """
+    Class LoadClient represents one simulated player connection. Requests are
+    sent one at a time, as a real player would, and each round trip is timed.
+    """
+    def __init__(self, reader, writer, seed=None):
+        """
+        Constructor method for class LoadClient.
+        :param reader: asyncio StreamReader of the connection.
+        :param writer: asyncio StreamWriter of the connection.
+        :param seed: optional random seed for the moves.
+        """
+        self._reader = reader
+        self._writer = writer
+        self._random = random.Random(seed)
+        self._latencies = []
+        self._moves = 0
+        self._errors = 0
+
+    def get_latencies(self):
+        """This class method returns the list of round trip times in seconds."""
+        return self._latencies
+
+    def get_moves(self):
+        """This class method returns the number of moves played."""
+        return self._moves
+
+    def get_errors(self):
+        """This class method returns the number of failed requests."""
+        return self._errors
+
+    async def request(self, **request):
+        """This coroutine sends a request and returns the server's response."""
+        start_time = time.perf_counter()
+        self._writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        line = await self._reader.readline()
+        self._latencies.append(time.perf_counter() - start_time)
+        if not line:
+            raise ConnectionError("server closed the connection")
+        response = json.loads(line)
+        if response.get("ok") is not True:
+            self._errors += 1
+        return response
+
+    async def play_game(self, max_plies=default_max_plies, think_time=0.0):
+        """
+        This coroutine plays one game with random moves for both players.
+        :param max_plies: the game is stopped after this many plies.
+        :param think_time: seconds to wait before each move (0 plays flat out).
+        :return: the game's result, or None if it was stopped.
+        """
+        game = (await self.request(op="new"))["game"]
+        result = None
+        for ply in range(max_plies):
+            moves = (await self.request(op="moves", game=game)).get("moves")
+            if not moves:
+                break
+            if think_time:
+                await asyncio.sleep(think_time)
+            response = await self.request(op="move", game=game, move=self._random.choice(moves))
+            self._moves += 1
+            result = response.get("result")
+            if result is not None:
+                break
+        await self.request(op="close", game=game)
+        return result
+
+    def close(self):
+        self._writer.close()
+
+
+async def connect(host, port, unix_path):
+    """This coroutine opens a connection to the server."""
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def run_client(index, games, host, port, unix_path, max_plies, think_time, seed):
+    """This coroutine plays a number of games over one connection and returns the
+    LoadClient()."""
+    reader, writer = await connect(host, port, unix_path)
+    client = LoadClient(reader, writer, seed * 100003 + index)
+    try:
+        for game in range(games):
+            await client.play_game(max_plies, think_time)
+    finally:
+        client.close()
+    return client
+
+
+def percentile(values, fraction):
+    """This function returns the value below which the fraction (0 - 1) of the
+    sorted values fall (nearest rank)."""
+    if not values:
+        return 0.0
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+async def run_load(clients, games, host="127.0.0.1", port=8765, unix_path=None,
+                   max_plies=default_max_plies, think_time=0.0, seed=0):
+    """
+    ------------------------------------
+    This coroutine runs the simulated clients at the same time and measures
+    the load they put on the server.
+    ------------------------------------
+    :param clients: number of simultaneous connections.
+    :param games: number of games each client plays, one after another.
+    :param host: server TCP host.
+    :param port: server TCP port.
+    :param unix_path: if given, the server's Unix socket is used instead of TCP.
+    :param max_plies: games are stopped after this many plies.
+    :param think_time: seconds each client waits before a move.
+    :param seed: random seed.
+    :return: dictionary with clients, games, requests, moves, errors, seconds,
+        requests_per_sec, moves_per_sec, p50_ms and p99_ms.
+    """
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_client(index, games, host, port, unix_path, max_plies, think_time, seed)
+        for index in range(clients)])
+    seconds = time.perf_counter() - start_time
+
+    latencies = sorted(latency for client in results for latency in client.get_latencies())
+    moves = sum(client.get_moves() for client in results)
+    return {
+        "clients": clients,
+        "games": clients * games,
+        "requests": len(latencies),
+        "moves": moves,
+        "errors": sum(client.get_errors() for client in results),
+        "seconds": seconds,
+        "requests_per_sec": len(latencies) / seconds if seconds else 0.0,
+        "moves_per_sec": moves / seconds if seconds else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many players against the game server.")
+    parser.add_argument("--host", default="127.0.0.1", help="server TCP host")
+    parser.add_argument("--port", type=int, default=8765, help="server TCP port")
+    parser.add_argument("--unix", default=None, help="server Unix socket path (instead of TCP)")
+    parser.add_argument("--clients", type=int, default=10, help="simultaneous connections")
+    parser.add_argument("--games", type=int, default=1, help="games per client")
+    parser.add_argument("--max-plies", type=int, default=default_max_plies, help="maximum plies per game")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds before each move")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(run_load(args.clients, args.games, args.host, args.port, args.unix,
+                                 args.max_plies, args.think_time, args.seed))
+    print("clients: %d  games: %d  moves: %d  errors: %d" % (
+        stats["clients"], stats["games"], stats["moves"], stats["errors"]))
+    print("requests: %d in %.2f s (%.1f requests/sec, %.1f moves/sec)" % (
+        stats["requests"], stats["seconds"], stats["requests_per_sec"], stats["moves_per_sec"]))
+    print("round trip p50: %.2f ms  p99: %.2f ms" % (stats["p50_ms"], stats["p99_ms"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
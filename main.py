@@ -3,10 +3,14 @@
 # Description: After creating a Hasami Shogi Board game for a class project, I decided
 #   that I wanted to create a chess program, as it is a game I am more acquainted with.
 #   This program is still currently in progress, as there are some missing functionality
-#   to this program (i.e. en passant rule for pawns is still needed).
+#   to this program (i.e. choosing the piece for a pawn promotion, it is always a Queen).
 
-import copy
+import random
+from collections import OrderedDict
 import pygame
+from array import array
+from movelog import MoveLog, encode_move, decode_move, get_promotion_flag, get_promotion_letter, promotion_letters, \
+    FLAG_NONE, FLAG_CASTLE, FLAG_EN_PASSANT
 pygame.init()
 
 # Some constants for the pygame window
@@ -16,23 +20,128 @@ white = (255, 255, 255)
 blue = (0, 0, 110)
 rows, cols = 8, 8
 size = width // cols
-window = pygame.display.set_mode((width, height))
-resize = 40
-
-# Images for chess pieces
-# pygame.transform.scale(pygame.image.load("sprites/Sand.png"), (SCALE, SCALE))
-white_king = pygame.transform.scale(pygame.image.load('pieces/white_king.png'), (resize, resize))
-white_queen = pygame.transform.scale(pygame.image.load('pieces/white_queen.png'), (resize, resize))
-white_rook = pygame.transform.scale(pygame.image.load('pieces/white_rook.png'), (resize, resize))
-white_bishop = pygame.transform.scale(pygame.image.load('pieces/white_bishop.png'), (resize, resize))
-white_knight = pygame.transform.scale(pygame.image.load('pieces/white_knight.png'), (resize, resize))
-white_pawn = pygame.transform.scale(pygame.image.load('pieces/white_pawn.png'), (resize, resize))
-black_king = pygame.transform.scale(pygame.image.load('pieces/black_king.png'), (resize, resize))
-black_queen = pygame.transform.scale(pygame.image.load('pieces/black_queen.png'), (resize, resize))
-black_rook = pygame.transform.scale(pygame.image.load('pieces/black_rook.png'), (resize, resize))
-black_bishop = pygame.transform.scale(pygame.image.load('pieces/black_bishop.png'), (resize, resize))
-black_knight = pygame.transform.scale(pygame.image.load('pieces/black_knight.png'), (resize, resize))
-black_pawn = pygame.transform.scale(pygame.image.load('pieces/black_pawn.png'), (resize, resize))
+sprite_cache_limit = 4
+
+# Size of the move buffers used by Board().generate_moves(). No chess position
+#   has more than 218 legal moves, so 256 moves per ply is always enough.
+max_moves = 256
+files = "abcdefgh"
+start_fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Images for chess pieces, keyed by (color, letter). Pawns have an empty
+#   letter (see class Pawn). The images are only loaded once, and the scaled
+#   copies that are actually drawn are kept in the SpriteCache below.
+piece_images = {
+    ("W", "K"): 'pieces/white_king.png',
+    ("W", "Q"): 'pieces/white_queen.png',
+    ("W", "R"): 'pieces/white_rook.png',
+    ("W", "B"): 'pieces/white_bishop.png',
+    ("W", "N"): 'pieces/white_knight.png',
+    ("W", ""): 'pieces/white_pawn.png',
+    ("B", "K"): 'pieces/black_king.png',
+    ("B", "Q"): 'pieces/black_queen.png',
+    ("B", "R"): 'pieces/black_rook.png',
+    ("B", "B"): 'pieces/black_bishop.png',
+    ("B", "N"): 'pieces/black_knight.png',
+    ("B", ""): 'pieces/black_pawn.png',
+}
+
+
+def get_square_size(window_size):
+    """
+    This function returns the side length (in pixels) of a single board square
+    for a window of the given size. The board is always square, so it is fit
+    to the shorter side of the window.
+    :param window_size: (width, height) tuple, i.e. from win.get_size()
+    :return: integer square size in pixels (never less than 1)
+    """
+    return max(min(window_size[0], window_size[1]) // cols, 1)
+
+
+def square_name(square):
+    """This function returns the algebraic name of a [row, col] square, i.e. [7, 4] is "e1"."""
+    return files[square[1]] + str(8 - square[0])
+
+
+def parse_square(name):
+    """This function returns the [row, col] indices of an algebraic square name, i.e. "e1"."""
+    if len(name) != 2 or name[0] not in files or name[1] not in "12345678":
+        raise ValueError("Invalid square: " + name)
+    return [8 - int(name[1]), files.index(name[0])]
+
+
+def pixel_to_square(coord, square_size):
+    """
+    This function translates pygame window coordinates (x, y) into the
+    [row, col] indices of the Square() under that pixel.
+    :param coord: (x, y) tuple, i.e. from pygame.mouse.get_pos()
+    :param square_size: side length of a square in pixels
+    :return: [row, col] list of integers
+    """
+    return [coord[1] // square_size, coord[0] // square_size]
+
+
+class SpriteCache:
+    """
+    Class SpriteCache holds the piece images scaled to the current square size.
+    ----------------------------------
+    Scaling a large image is slow, so it should never be done per frame. Each
+    set of 12 scaled sprites is built once for a square size and then reused
+    until the window is resized. The most recently used sizes are kept so that
+    resizing back and forth does not rescale, and the least recently used size
+    is evicted once more than max_sizes sets are held.
+    """
+    def __init__(self, max_sizes=sprite_cache_limit):
+        """
+        Constructor method for class SpriteCache.
+        ------------------------------------
+        :param max_sizes: the number of scaled sprite sets to keep in memory.
+        """
+        self._images = {}
+        self._scaled = OrderedDict()
+        self._max_sizes = max_sizes
+
+    def load_images(self):
+        """This class method loads the full size piece images from disk (only once)."""
+        if not self._images:
+            for key in piece_images:
+                self._images[key] = pygame.image.load(piece_images[key])
+
+    def get_sprites(self, square_size):
+        """
+        This class method returns a dictionary of scaled sprites for a square size,
+        keyed the same way as piece_images. Sprites are half the square size, as
+        the original 40 pixel sprites were on 80 pixel squares.
+        :param square_size: side length of a square in pixels
+        :return: dictionary of pygame surfaces
+        """
+        sprite_size = max(square_size // 2, 1)
+        sprites = self._scaled.get(sprite_size)
+
+        if sprites is not None:
+            self._scaled.move_to_end(sprite_size)
+            return sprites
+
+        self.load_images()
+        sprites = {}
+        for key in self._images:
+            sprites[key] = pygame.transform.smoothscale(self._images[key], (sprite_size, sprite_size))
+
+        self._scaled[sprite_size] = sprites
+        while len(self._scaled) > self._max_sizes:
+            self._scaled.popitem(last=False)
+        return sprites
+
+    def get_sprite(self, color, letter, square_size):
+        """This class method returns the scaled sprite for a single piece."""
+        return self.get_sprites(square_size)[(color, letter)]
+
+    def clear(self):
+        """This class method drops every scaled sprite set."""
+        self._scaled.clear()
+
+
+sprites = SpriteCache()
 
 
 class Pieces:
@@ -60,7 +169,7 @@ class Pieces:
         self._x = 0
         self._y = 0
         self._color = color
-        self._moves = []
+        self._moves = array("H")
         self._letter = ""
         self._has_moved = None
         self.calculate_location()
@@ -106,20 +215,25 @@ class Pieces:
         self._y = y_value
 
     def get_moves(self):
-        """This class method returns a list of moves as board indices
-        i.e. example: moves = [[row_1, col_1], [row_2, col_2],...]"""
+        """This class method returns the piece's moves as an array of 16-bit move
+        codes (see movelog.py), i.e. example: moves = array('H', [2356, 1804,...])
+        Use decode_move() to get the [row, col] indices back."""
         return self._moves
 
     def clear_moves(self):
-        """This class method clears the list of moves for the piece object."""
-        self._moves = []
+        """This class method clears the list of moves for the piece object. The array
+        is emptied in place, so scanning the piece again does not create a new
+        one."""
+        del self._moves[:]
 
-    def add_move(self, row, col):
-        """This class method appends a list of board indices to self._moves"""
-        self._moves.append([row, col])
+    def add_move(self, row, col, flags=FLAG_NONE):
+        """This class method appends the move code for moving the piece to the
+        board indices [row, col] to self._moves"""
+        self._moves.append((self._row << 3 | self._col) | ((row << 3 | col) << 6) | (flags << 12))
 
-    def remove_move(self, coord):
-        self._moves.remove(coord)
+    def remove_move(self, code):
+        """This class method removes a move code from the piece's list of moves."""
+        self._moves.remove(code)
 
     def get_letter(self):
         """This class method returns the piece letter for the object. I.e. for a King
@@ -134,12 +248,24 @@ class Pieces:
     def set_has_moved(self):
         self._has_moved = True
 
-    def calculate_location(self):
+    def save_state(self):
+        """This class method returns the attributes a move can change, so that
+        the move can be taken back (see Board().undo_move())."""
+        return self._row, self._col, self._has_moved
+
+    def restore_state(self, state):
+        """This class method restores the attributes saved by save_state()."""
+        self._row, self._col, self._has_moved = state
+        self.calculate_location()
+
+    def calculate_location(self, square_size=size):
         """This class method calculates the (x,y) coordinates for which the piece image will
         be blit onto the pygame window. These coordinates are in opposite order from the row
-        and column values."""
-        self._x = self._col * 80 + 20
-        self._y = self._row * 80 + 20
+        and column values. The sprite is half a square wide, so it is offset by a quarter
+        of a square to center it."""
+        offset = (square_size - square_size // 2) // 2
+        self._x = self._col * square_size + offset
+        self._y = self._row * square_size + offset
 
 
 class King(Pieces):
@@ -202,6 +328,24 @@ class Pawn(Pieces):
         pawn's future possible moves to only 1 square forward."""
         self._pawn_range = 1
 
+    def add_move(self, row, col, flags=FLAG_NONE):
+        """This Pawn class method appends a move (see Pieces). A move onto the last
+        row is added once for each piece the Pawn can be promoted to."""
+        if (row == 0 or row == 7) and flags == FLAG_NONE:
+            for letter in promotion_letters:
+                super().add_move(row, col, get_promotion_flag(letter))
+        else:
+            super().add_move(row, col, flags)
+
+    def save_state(self):
+        """This Pawn class method also saves the pawn range (see Pieces)."""
+        return self._row, self._col, self._has_moved, self._pawn_range
+
+    def restore_state(self, state):
+        """This Pawn class method restores the attributes saved by save_state()."""
+        self._row, self._col, self._has_moved, self._pawn_range = state
+        self.calculate_location()
+
 
 class Knight(Pieces):
     """
@@ -251,6 +395,61 @@ class Rook(Pieces):
         self._letter = "R"
 
 
+# Piece classes by their letter, used for pawn promotion.
+piece_classes = {"Q": Queen, "R": Rook, "B": Bishop, "N": Knight}
+
+# Piece classes by their (upper case) FEN letter.
+fen_piece_classes = {"K": King, "Q": Queen, "R": Rook, "B": Bishop, "N": Knight, "P": Pawn}
+
+# Offsets and ray directions (row, col) used by Board().is_square_attacked(). The
+#   pieces move the same way in both directions, so looking outward from a square
+#   along a Knight's offsets finds the Knights which attack it, and so on.
+knight_offsets = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+king_offsets = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+straight_rays = ((-1, 0), (1, 0), (0, -1), (0, 1))
+diagonal_rays = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+# Random 64-bit keys for Zobrist hashing of positions. A position's hash is the
+#   XOR of the key of each piece on its square, plus keys for the castling rights,
+#   the en passant column and the player to move. The generator is seeded, so the
+#   hashes are the same every time the program runs (and can be stored in files).
+zobrist_random = random.Random(1122)
+zobrist_pieces = {}
+for zobrist_color in ("W", "B"):
+    for zobrist_letter in ("K", "Q", "R", "B", "N", ""):
+        zobrist_pieces[(zobrist_color, zobrist_letter)] = [zobrist_random.getrandbits(64) for index in range(64)]
+zobrist_castling = [0] + [zobrist_random.getrandbits(64) for index in range(15)]
+zobrist_en_passant = [zobrist_random.getrandbits(64) for index in range(8)]
+zobrist_side = zobrist_random.getrandbits(64)
+
+
+# Piece classes by the number a piece is stored as in a BoardSnapshot(). A snapshot
+#   stores each square as one byte: the number below, plus snapshot_black for a
+#   black piece and snapshot_moved for a King or Rook which has moved (or a Pawn
+#   which may only move 1 square). 0 is an empty square.
+snapshot_classes = (None, Pawn, Knight, Bishop, Rook, Queen, King)
+snapshot_numbers = {"": 1, "N": 2, "B": 3, "R": 4, "Q": 5, "K": 6}
+snapshot_black = 8
+snapshot_moved = 16
+
+
+def get_piece_key(piece, row, col):
+    """This function returns the Zobrist key of a piece on a square (0 for an
+    empty square)."""
+    if piece is None:
+        return 0
+    return zobrist_pieces[(piece.get_color(), piece.get_letter())][row * 8 + col]
+
+
+def get_pawn_key(piece, row, col):
+    """This function returns the Zobrist key of a Pawn() on a square (0 for any
+    other piece or an empty square). The pawn hash of a position is the XOR of
+    these keys, so it only changes when a Pawn moves, is captured or promotes."""
+    if piece is None or piece.get_letter() != "":
+        return 0
+    return zobrist_pieces[(piece.get_color(), "")][row * 8 + col]
+
+
 class Square:
     """
     Class Square represents a Square object. A traditional chess board should contain
@@ -292,6 +491,49 @@ class Square:
         return self._coordinates
 
 
+class BoardSnapshot:
+    """
+    Class BoardSnapshot represents a saved position of a Board(), see
+    Board().snapshot() and Board().restore_snapshot().
+    ----------------------------------
+    The squares are packed into 64 bytes (see snapshot_classes) and the rest of
+    the position (whose turn it is, en passant, the clocks...) is kept as the tuple
+    from Board().save_state(). Both are immutable, so a snapshot never changes after
+    it has been created and any number of them can be kept at once, i.e. one for
+    every move of a game or for every branch of a variation being analysed.
+    """
+    __slots__ = ("_squares", "_state", "_hash")
+
+    def __init__(self, squares, state, position_hash):
+        """
+        Constructor method for class BoardSnapshot.
+        ------------------------------------
+        :param squares: bytes object of length 64, one byte per square in the
+            order row * 8 + col.
+        :param state: tuple returned by Board().save_state().
+        :param position_hash: the Zobrist hash of the position.
+        """
+        self._squares = squares
+        self._state = state
+        self._hash = position_hash
+
+    def get_squares(self):
+        """This class method returns the 64 packed squares as a bytes object."""
+        return self._squares
+
+    def get_state(self):
+        """This class method returns the saved Board() state tuple."""
+        return self._state
+
+    def get_hash(self):
+        """This class method returns the Zobrist hash of the position."""
+        return self._hash
+
+    def get_active_p(self):
+        """This class method returns the player to move in the position."""
+        return self._state[0]
+
+
 class Board:
     """
     ====================================
@@ -321,6 +563,70 @@ class Board:
         self._inactive_p = "B"
         self._checkmate = False
         self._stalemate = False
+        self._square_size = size
+        self._en_passant = None
+        self._last_move = None
+        self._verbose = True
+        self._halfmove_clock = 0
+        self._fullmove_number = 1
+        self._move_records = []
+        self._hash_history = [0]
+        self._pawn_hash_history = [0]
+        self._hash_counts = {0: 1}
+        self._move_buffers = []
+
+    @classmethod
+    def from_fen(cls, fen, verbose=False):
+        """
+        ------------------------------------
+        This Board() class method creates a new Board() directly from a FEN
+        (Forsyth-Edwards Notation) string, without replaying any moves.
+        ------------------------------------
+        :param fen: FEN string, i.e. start_fen
+        :param verbose: if True, check/checkmate messages are printed to the
+            terminal (see set_verbose()), already while the position is set up.
+        :return: the new Board() object.
+        """
+        board = cls()
+        board.set_verbose(verbose)
+        board.generate_board(fen)
+        return board
+
+    def get_halfmove_clock(self):
+        """This class method returns the number of half moves since the last
+        pawn move or capture (used for the fifty move rule)."""
+        return self._halfmove_clock
+
+    def get_fullmove_number(self):
+        """This class method returns the full move number, which starts at 1
+        and goes up after each of black's moves."""
+        return self._fullmove_number
+
+    def set_verbose(self, bool_value):
+        """This class method turns the check/checkmate messages printed to the
+        terminal on or off. Replaying or simulating many games should turn
+        them off."""
+        self._verbose = bool_value
+
+    def get_en_passant(self):
+        """This class method returns the [row, col] of the square a Pawn() skipped
+        over on the last move (which can be captured en passant), or None."""
+        return self._en_passant
+
+    def get_last_move(self):
+        """This class method returns the move code (see movelog.py) of the last
+        move conducted on the board, or None."""
+        return self._last_move
+
+    def get_square_size(self):
+        """This class method returns the side length of a square (in pixels) as it
+        is currently drawn on the pygame window."""
+        return self._square_size
+
+    def set_square_size(self, square_size):
+        """This class method sets the side length of a square (in pixels). It should
+        be called whenever the pygame window is resized."""
+        self._square_size = square_size
 
     def get_checkmate_bool(self):
         """This class method returns a boolean value for the
@@ -328,14 +634,250 @@ class Board:
         return self._checkmate
 
     def set_simulation(self):
-        """This method creates a deepcopy of the list containing the square
-        objects. It essentially saves a copy of the current board/pieces
-        setup."""
-        self._simulator = copy.deepcopy(self._board)
+        """This method saves a snapshot of the current board/pieces setup (see
+        snapshot()), which reset_simulation() goes back to."""
+        self._simulator = self.snapshot()
 
     def reset_simulation(self):
-        """This class method restores the saved copy of the board and piece setup."""
-        self._board = copy.deepcopy(self._simulator)
+        """This class method restores the saved copy of the board and piece setup.
+        Moves made since set_simulation() can no longer be taken back."""
+        self.restore_snapshot(self._simulator)
+
+    def snapshot(self):
+        """
+        ------------------------------------
+        This Board() class method saves the current position as a BoardSnapshot().
+        Only the piece on each square (and whether it has moved) is saved, packed
+        into 64 bytes, instead of copying the Square() and Piece() objects.
+        ------------------------------------
+        :return: BoardSnapshot() object.
+        """
+        squares = bytearray(64)
+        for row in range(8):
+            for col in range(8):
+                piece = self._board[row][col].get_occupant()
+                if piece is None:
+                    continue
+                letter = piece.get_letter()
+                number = snapshot_numbers[letter]
+                if piece.get_color() == "B":
+                    number |= snapshot_black
+                if (letter == "" and piece.get_pawn_range() == 1) or piece.get_has_moved() is True:
+                    number |= snapshot_moved
+                squares[row * 8 + col] = number
+        return BoardSnapshot(bytes(squares), self.save_state(), self._hash_history[-1])
+
+    def restore_snapshot(self, snapshot, history=()):
+        """
+        ------------------------------------
+        This Board() class method sets the board to the position saved in a
+        BoardSnapshot(). The existing Square() objects are reused, and new Piece()
+        objects are created for the pieces. Moves conducted before can no longer
+        be taken back with undo_move() afterwards.
+        ------------------------------------
+        :param snapshot: BoardSnapshot() object from snapshot().
+        :param history: optional hashes of the positions which came before the
+            snapshot's position (oldest first), so repetitions are still counted.
+        :return: None
+        """
+        squares = snapshot.get_squares()
+        for index in range(64):
+            row, col = index >> 3, index & 7
+            number = squares[index]
+            if number == 0:
+                self._board[row][col].set_occupant(None)
+                continue
+
+            piece = snapshot_classes[number & 7](row, col, "B" if number & snapshot_black else "W")
+            if number & snapshot_moved:
+                if piece.get_letter() == "":
+                    piece.set_pawn_range()
+                else:
+                    piece.set_has_moved()
+            self._board[row][col].set_occupant(piece)
+
+        self.restore_state(snapshot.get_state())
+        self.reset_history(history, snapshot.get_hash())
+
+    def save_state(self):
+        """This class method returns the Board() attributes which a move can change
+        (not including the squares and pieces themselves) as a tuple."""
+        return (self._active_p, self._inactive_p, self._en_passant, self._last_move,
+                self._white_king_loc, self._black_king_loc, self._white_king_in_check,
+                self._black_king_in_check, self._halfmove_clock, self._fullmove_number,
+                self._checkmate, self._stalemate)
+
+    def restore_state(self, state):
+        """This class method restores the Board() attributes saved by save_state()."""
+        (self._active_p, self._inactive_p, self._en_passant, self._last_move,
+         self._white_king_loc, self._black_king_loc, self._white_king_in_check,
+         self._black_king_in_check, self._halfmove_clock, self._fullmove_number,
+         self._checkmate, self._stalemate) = state
+
+    def restore_move(self, record):
+        """
+        This class method puts back everything a move changed.
+        :param record: (changed squares, changed pieces, board state) as saved
+            by make_move().
+        :return: None
+        """
+        changed_squares, changed_pieces, state = record
+        for row, col, occupant in changed_squares:
+            self._board[row][col].set_occupant(occupant)
+        for piece, piece_state in changed_pieces:
+            piece.restore_state(piece_state)
+        self.restore_state(state)
+
+    def push_move_record(self, record, old_hash_key):
+        """
+        ------------------------------------
+        This class method saves a conducted move so it can be taken back, and adds
+        the hash of the new position to the position history. The hash is updated
+        from the previous one using only the squares the move changed.
+        ------------------------------------
+        :param record: the move record, as saved by make_move().
+        :param old_hash_key: get_state_hash_key() from before the move.
+        :return: None
+        """
+        position_hash = self._hash_history[-1] ^ old_hash_key ^ self.get_state_hash_key()
+        pawn_hash = self._pawn_hash_history[-1]
+        for row, col, occupant in record[0]:
+            new_occupant = self._board[row][col].get_occupant()
+            position_hash ^= get_piece_key(occupant, row, col)
+            position_hash ^= get_piece_key(new_occupant, row, col)
+            pawn_hash ^= get_pawn_key(occupant, row, col)
+            pawn_hash ^= get_pawn_key(new_occupant, row, col)
+
+        self._move_records.append(record)
+        self._hash_history.append(position_hash)
+        self._pawn_hash_history.append(pawn_hash)
+        self._hash_counts[position_hash] = self._hash_counts.get(position_hash, 0) + 1
+
+    def undo_move(self):
+        """
+        ------------------------------------
+        This Board() class method takes back the last conducted move.
+        ------------------------------------
+        :return: True if a move was taken back, False if there is no move to
+            take back.
+        """
+        if not self._move_records:
+            return False
+
+        position_hash = self._hash_history.pop()
+        self._pawn_hash_history.pop()
+        count = self._hash_counts[position_hash] - 1
+        if count:
+            self._hash_counts[position_hash] = count
+        else:
+            del self._hash_counts[position_hash]
+        self.restore_move(self._move_records.pop())
+        return True
+
+    def reset_history(self, history=(), position_hash=None):
+        """
+        This class method clears the moves which can be taken back, and starts
+        the position history over from the current position.
+        :param history: optional hashes of the positions which came before the
+            current position (oldest first).
+        :param position_hash: the hash of the current position, if it is already
+            known (else it is computed).
+        :return: None
+        """
+        if position_hash is None:
+            position_hash = self.compute_hash()
+        self._move_records = []
+        self._hash_history = list(history)
+        self._hash_history.append(position_hash)
+        self._hash_counts = {}
+        for each in self._hash_history:
+            self._hash_counts[each] = self._hash_counts.get(each, 0) + 1
+
+        # Only the pawn hash of the current position is needed (the positions
+        #   before it can no longer be taken back).
+        self._pawn_hash_history = [self.compute_pawn_hash()]
+
+    def compute_hash(self):
+        """
+        ------------------------------------
+        This Board() class method computes the Zobrist hash of the position from
+        scratch. (After a move, the hash is instead updated from the previous one,
+        see push_move_record().)
+        ------------------------------------
+        :return: 64-bit integer hash
+        """
+        position_hash = self.get_state_hash_key()
+        for row in range(8):
+            for col in range(8):
+                position_hash ^= get_piece_key(self._board[row][col].get_occupant(), row, col)
+        return position_hash
+
+    def compute_pawn_hash(self):
+        """This Board() class method computes the pawn hash (see get_pawn_key())
+        of the position from scratch."""
+        pawn_hash = 0
+        for row in range(8):
+            for col in range(8):
+                pawn_hash ^= get_pawn_key(self._board[row][col].get_occupant(), row, col)
+        return pawn_hash
+
+    def get_state_hash_key(self):
+        """
+        This class method returns the part of the hash which is not made up of the
+        pieces: the player to move, the castling rights, and the en passant column.
+        The en passant column is only counted when a Pawn() can actually capture
+        en passant, since otherwise the position is the same.
+        """
+        key = zobrist_castling[self.get_castling_bits()]
+        if self._active_p == "B":
+            key ^= zobrist_side
+
+        if self._en_passant is not None:
+            row = self._en_passant[0] + (1 if self._active_p == "W" else -1)
+            for col in (self._en_passant[1] - 1, self._en_passant[1] + 1):
+                if 0 <= col <= 7:
+                    pawn = self._board[row][col].get_occupant()
+                    if pawn is not None and pawn.get_letter() == "" and pawn.get_color() == self._active_p:
+                        key ^= zobrist_en_passant[self._en_passant[1]]
+                        break
+        return key
+
+    def get_hash(self):
+        """This class method returns the Zobrist hash of the current position."""
+        return self._hash_history[-1]
+
+    def get_pawn_hash(self):
+        """This class method returns the pawn hash of the current position, which
+        is kept up to date by the moves and undo_move() like get_hash()."""
+        return self._pawn_hash_history[-1]
+
+    def get_hash_history(self):
+        """This class method returns the list of position hashes since the start
+        of the game (or the last set_fen()), the current position last."""
+        return self._hash_history
+
+    def get_repetition_count(self):
+        """This class method returns how many times the current position has
+        occurred (1 if it is the first time)."""
+        return self._hash_counts.get(self._hash_history[-1], 0)
+
+    def is_repetition(self, count=2):
+        """
+        This class method checks if the current position has occurred at least
+        count times. Search code can use the default of 2 (a twofold repetition)
+        to cut off lines which go around in a cycle.
+        """
+        return self.get_repetition_count() >= count
+
+    def is_threefold_repetition(self):
+        """This class method returns True if the current position has occurred
+        three times (a draw can be claimed)."""
+        return self.get_repetition_count() >= 3
+
+    def is_fifty_move_draw(self):
+        """This class method returns True if fifty moves have been made by each
+        player without a pawn move or capture (a draw can be claimed)."""
+        return self._halfmove_clock >= 100
 
     def get_active_p(self):
         """This class method returns the active player."""
@@ -365,9 +907,9 @@ class Board:
             and False if not.
         """
         if color == "W":
-            self.get_w_king_check_status()
+            return self.get_w_king_check_status()
         elif color == "B":
-            self.get_b_king_check_status()
+            return self.get_b_king_check_status()
 
     def get_b_king_check_status(self):
         # This method may be unnecessary
@@ -458,7 +1000,7 @@ class Board:
         """This method returns the self._board list."""
         return self._board
 
-    def make_move(self, start, end, simulation=False):
+    def make_move(self, start, end, simulation=False, promotion="Q"):
         """
         ------------------------------------
         This Board() Class method is the primary method used for
@@ -485,6 +1027,10 @@ class Board:
                 this method to iterate on possible moves for when
                 determining checkmate.
 
+        :param promotion: the letter of the piece a Pawn() is promoted
+                to when it reaches the last row. Either "Q", "R", "B"
+                or "N".
+
         :return: True if the piece move meets game rule requirements.
                  returns False or None, otherwise.
         """
@@ -493,12 +1039,11 @@ class Board:
         #   of coordinates being passed to this function. I.e. either
         #   [row, col] where row, col are integers, or (x, y), where
         #   x, y are the pixel coordinates (also integers, just a much
-        #   larger value) on the pygame window.
-        if simulation is False:
-            start = list(start)
-            end = list(end)
-            start_col, start_row = start[0] // 80, start[1] // 80
-            end_col, end_row = end[0] // 80, end[1] // 80
+        #   larger value) on the pygame window. The pygame module always
+        #   gives us a tuple for mouse positions.
+        if isinstance(start, tuple):
+            start_row, start_col = pixel_to_square(start, self._square_size)
+            end_row, end_col = pixel_to_square(end, self._square_size)
         else:
             start_row, start_col = start[0], start[1]
             end_row, end_col = end[0], end[1]
@@ -513,6 +1058,8 @@ class Board:
             save_square = self._board[end_row][end_col].get_occupant()
         except AttributeError:
             save_square = None
+        except IndexError:
+            return False
         # ---------------
 
         # Below is the start of main branch for executing a piece movement.
@@ -526,16 +1073,46 @@ class Board:
                 #   methods such as get_color())
                 piece = self._board[start_row][start_col].get_occupant()
                 piece_color = piece.get_color()
-                moves = piece.get_moves()
                 destination = [end_row, end_col]
 
+                # The piece's moves are scanned again here (rather than relying
+                #   on the last scan drawn to the window) so that moves can also
+                #   be made without the pygame window, i.e. when replaying games.
+                if simulation is False:
+                    moves = self.scan_for_moves(start_row, start_col)
+                    code = self.get_move_code([start_row, start_col], destination, promotion)
+                else:
+                    moves = piece.get_moves()
+                    code = None
+
                 # Verification that the piece being moved meets conditions:
                 #   -The active player is moving their own piece.
-                #   -The destination square is in the calculated allowed moves list.
+                #   -The move code is in the calculated allowed moves array.
                 #   -The make_move() method is being run as a simulation.
-                if (destination in moves and piece_color == self.get_active_p()) or simulation is True:
+                if (code in moves and piece_color == self.get_active_p()) or simulation is True:
                     letter = piece.get_letter()
                     move_status = piece.get_has_moved()
+                    flags = FLAG_NONE
+
+                    # Everything the move is about to change is saved first (the squares
+                    #   with their original occupants, the moved pieces and the Board()
+                    #   attributes), so the move can be taken back again. This is done
+                    #   right away if the move leaves the King in check, or later on
+                    #   with undo_move().
+                    changed_squares = [(start_row, start_col, piece), (end_row, end_col, save_square)]
+                    changed_pieces = [(piece, piece.save_state())]
+                    if save_square is not None:
+                        changed_pieces.append((save_square, save_square.save_state()))
+                    home_row = 7 if piece_color == "W" else 0
+                    if letter == "K" and move_status is False and destination in ([home_row, 6], [home_row, 2]):
+                        rook_col, rook_end_col = (7, 5) if end_col == 6 else (0, 3)
+                        rook = self._board[home_row][rook_col].get_occupant()
+                        changed_squares.append((home_row, rook_col, rook))
+                        changed_squares.append((home_row, rook_end_col, self._board[home_row][rook_end_col].get_occupant()))
+                        if rook is not None:
+                            changed_pieces.append((rook, rook.save_state()))
+                    record = (changed_squares, changed_pieces, self.save_state())
+                    old_hash_key = self.get_state_hash_key()
 
                     # Below is a special branch for King moves/castling
                     if letter == "K":
@@ -547,10 +1124,12 @@ class Board:
                                     self.castle_king_side(piece.get_color())
                                     self.set_king_location([7, 6], piece.get_color())
                                     piece.set_has_moved()
+                                    flags = FLAG_CASTLE
                                 elif destination == [7, 2]:
                                     self.castle_queen_side(piece.get_color())
                                     self.set_king_location([7, 2], piece.get_color())
                                     piece.set_has_moved()
+                                    flags = FLAG_CASTLE
 
                             # Black King Castling
                             elif piece.get_color() == "B":
@@ -558,12 +1137,24 @@ class Board:
                                     self.castle_king_side(piece.get_color())
                                     self.set_king_location([0, 6], piece.get_color())
                                     piece.set_has_moved()
+                                    flags = FLAG_CASTLE
                                 elif destination == [0, 2]:
                                     self.castle_queen_side(piece.get_color())
                                     self.set_king_location([0, 2], piece.get_color())
                                     piece.set_has_moved()
+                                    flags = FLAG_CASTLE
                         self.set_king_location([end_row, end_col], piece.get_color())
 
+                    # En passant: a Pawn() moving diagonally onto the empty square
+                    #   that the opponent's Pawn() skipped over captures that Pawn(),
+                    #   which is found beside the starting square.
+                    en_passant_pawn = None
+                    if letter == "" and destination == self._en_passant and save_square is None:
+                        en_passant_pawn = self._board[start_row][end_col].get_occupant()
+                        changed_squares.append((start_row, end_col, en_passant_pawn))
+                        self._board[start_row][end_col].set_occupant(None)
+                        flags = FLAG_EN_PASSANT
+
                     # The piece being moved is now reassigned to the destination coordinates.
                     #   The starting square is also set to None occupant (or empty square).
                     piece.set_row(end_row)
@@ -575,29 +1166,11 @@ class Board:
 
                     # Next, we verify that the conducted piece movement has not placed the
                     #   active player's King in check (a violation of game rules).
-                    #   If check is True, then we 'reset' the starting and ending squares
-                    #   with the original occupants.
+                    #   If check is True, then we 'reset' every changed square with its
+                    #   original occupant (including the Rook of a castle).
                     active_p_king_check = self.scan_for_king_check(self.get_active_p())
                     if active_p_king_check is True:
-
-                        # Updates the King location in the Board() object if illegal move
-                        #   must be reversed.
-                        if piece.get_letter() == "K":
-                            self.set_king_location([start_row, start_col], piece.get_color())
-                            # self.scan_for_king_check(self.get_active_p())
-
-                        # Below we reset the starting/ending squares with the original
-                        #   occupant values.
-                        self._board[start_row][start_col].set_occupant(piece)
-                        piece.set_row(start_row)
-                        piece.set_col(start_col)
-                        piece.calculate_location()
-                        self._board[end_row][end_col].set_occupant(save_square)
-                        save_square.set_row(end_row)
-                        save_square.set_col(end_col)
-                        save_square.calculate_location()
-                        # ---------------
-
+                        self.restore_move(record)
                         return False
 
                     # else: the move conducted does not put the active player's King in
@@ -609,6 +1182,13 @@ class Board:
                         if piece.get_letter() == "":
                             piece.set_pawn_range()
 
+                            # A Pawn() which reaches the last row is promoted. The new
+                            #   piece simply replaces the Pawn() as the square occupant.
+                            if end_row == 0 or end_row == 7:
+                                piece = piece_classes[promotion](end_row, end_col, piece.get_color())
+                                self._board[end_row][end_col].set_occupant(piece)
+                                flags = get_promotion_flag(promotion)
+
                         # Additionally, if the moved piece is the King or Rook type, their
                         #   has_moved value must be set to True for the castling rule.
                         elif piece.get_letter() == "K" or piece.get_letter() == "R":
@@ -620,15 +1200,36 @@ class Board:
                             if piece.get_letter() == "K":
                                 self.set_king_location(destination, piece.get_color())
 
+                        # A Pawn() moving two squares forward can be captured en passant
+                        #   on the following move only, so the skipped square is saved.
+                        if letter == "" and abs(end_row - start_row) == 2:
+                            self._en_passant = [(start_row + end_row) // 2, end_col]
+                        else:
+                            self._en_passant = None
+                        self._last_move = encode_move([start_row, start_col], destination, flags)
+
+                        # The half move clock is reset by any pawn move or capture.
+                        if letter == "" or save_square is not None:
+                            self._halfmove_clock = 0
+                        else:
+                            self._halfmove_clock += 1
+                        if piece_color == "B":
+                            self._fullmove_number += 1
+
+                        # The turn passes to the opponent, and the move is saved so it can
+                        #   be taken back, along with the hash of the new position.
+                        self.set_active_p()
+                        self.push_move_record(record, old_hash_key)
+
                         # finally, we check if the active player's piece movement has put their opponent in
-                        #   check. If check is True for the inactive player, then we also call an additional
-                        #   class method to determine if this check has placed the inactive player's king
+                        #   check. If check is True for the opponent, then we also call an additional
+                        #   class method to determine if this check has placed the opponent's king
                         #   in checkmate.
-                        if self.scan_for_king_check(self.get_inactive_p()) is True and simulation is False:
-                            if self.scan_for_checkmate(self.get_inactive_p()) is True:
-                                print("CHECKMATE!!!")
+                        if self.scan_for_king_check(self.get_active_p()) is True and simulation is False:
+                            if self.scan_for_checkmate(self.get_active_p()) is True:
+                                if self._verbose is True:
+                                    print("CHECKMATE!!!")
 
-                        self.set_active_p()
                         return True
 
                     # possibly might need a return False somewhere around here so we have only
@@ -640,6 +1241,142 @@ class Board:
         else:
             return False
 
+    def get_move_code(self, start, end, promotion="Q"):
+        """
+        ------------------------------------
+        This Board() class method returns the move code (see movelog.py) for
+        moving the piece on the start square to the end square, as it would be
+        found in the piece's moves array. The flags are worked out from the
+        board: a King moving two columns castles, a Pawn moving onto the en
+        passant square captures en passant, and a Pawn reaching the last row
+        is promoted.
+        ------------------------------------
+        :param start: [row, col] of the piece.
+        :param end: [row, col] of the destination.
+        :param promotion: the promotion piece letter, for a Pawn move onto the
+            last row.
+        :return: the move code.
+        """
+        piece = self._board[start[0]][start[1]].get_occupant()
+        flags = FLAG_NONE
+        if piece is not None:
+            letter = piece.get_letter()
+            if letter == "K" and piece.get_has_moved() is False and abs(end[1] - start[1]) == 2:
+                flags = FLAG_CASTLE
+            elif letter == "" and end[0] in (0, 7):
+                flags = get_promotion_flag(promotion)
+            elif letter == "" and end == self._en_passant and self._board[end[0]][end[1]].get_occupant() is None:
+                flags = FLAG_EN_PASSANT
+        return encode_move(start, end, flags)
+
+    def make_encoded_move(self, code, simulation=False):
+        """
+        This Board() class method conducts a move given as a move code (see
+        make_move() for the details and return values).
+        :param code: the move code, i.e. from a piece's moves array.
+        :param simulation: passed on to make_move().
+        """
+        start, end, flags = decode_move(code)
+        return self.make_move(start, end, simulation, get_promotion_letter(flags) or "Q")
+
+    def generate_moves(self, color, ply=0):
+        """
+        ------------------------------------
+        This Board() class method scans the possible moves for every piece of a
+        player and copies their move codes into the move buffer for the ply.
+        The buffers are arrays which are created once and reused, so searching
+        through many positions does not create new lists of moves. (The moves are
+        possible moves: a move may still leave the King in check, which
+        make_move() refuses.)
+        ------------------------------------
+        :param color: string type, either "B" or "W"
+        :param ply: the search depth the buffer is for. A search keeps the moves
+            of each ply in its own buffer, since a deeper ply would otherwise
+            overwrite the moves that have not been tried yet.
+        :return: (buffer, count), the moves are buffer[0] to buffer[count - 1]
+        """
+        while len(self._move_buffers) <= ply:
+            self._move_buffers.append(array("H", bytes(2 * max_moves)))
+        buffer = self._move_buffers[ply]
+
+        count = 0
+        for row in range(8):
+            for col in range(8):
+                occupant = self._board[row][col].get_occupant()
+                if occupant is None or occupant.get_color() != color:
+                    continue
+                for code in self.scan_for_moves(row, col):
+                    buffer[count] = code
+                    count += 1
+        return buffer, count
+
+    def generate_legal_moves(self, color, ply=0):
+        """
+        This Board() class method works like generate_moves(), but only keeps the
+        legal moves (each move is conducted and then taken back).
+        :param color: string type, either "B" or "W"
+        :param ply: the search depth the buffer is for.
+        :return: (buffer, count)
+        """
+        buffer, count = self.generate_moves(color, ply)
+
+        active_p = self.get_active_p()
+        if active_p != color:
+            self.set_active_p()
+
+        legal = 0
+        for index in range(count):
+            code = buffer[index]
+            if self.make_encoded_move(code, simulation=True) is True:
+                self.undo_move()
+                buffer[legal] = code
+                legal += 1
+
+        if self.get_active_p() != active_p:
+            self.set_active_p()
+        return buffer, legal
+
+    def has_legal_move(self, color):
+        """
+        ------------------------------------
+        This Board() Class method checks if the player of the color param has
+        at least one legal move. It stops at the first legal move it finds, so
+        in most positions only a single piece has its moves scanned.
+        ------------------------------------
+        :param color: string type, should be either "B" or "W"
+        :return: True if the player has a legal move, else False.
+        """
+
+        # The moves are simulated for the player of the color param, so they
+        #   are made the active player while we scan.
+        active_p = self.get_active_p()
+        if active_p != color:
+            self.set_active_p()
+
+        found = False
+        for row in range(8):
+            for col in range(8):
+                occupant = self._board[row][col].get_occupant()
+                if occupant is None or occupant.get_color() != color:
+                    continue
+
+                # make_move() refuses (and resets) any move that leaves the King
+                #   in check, so the first move it conducts is a legal move. That
+                #   move is then taken back again.
+                for code in self.scan_for_moves(row, col):
+                    if self.make_encoded_move(code, simulation=True) is True:
+                        self.undo_move()
+                        found = True
+                        break
+                if found:
+                    break
+            if found:
+                break
+
+        if self.get_active_p() != active_p:
+            self.set_active_p()
+        return found
+
     def scan_for_checkmate(self, color):
         """
         ------------------------------------
@@ -651,48 +1388,89 @@ class Board:
                 remaining moves which take its king out of check. False
                 if there is a possible move that removes the king check.
         """
+        if self.has_legal_move(color) is True:
+            return False
+        self._checkmate = True
+        return True
 
-        # Creates deepcopy of the board, along with all the square() and piece() objects.
-        self.set_simulation()
-        bool_values = []
+    def get_game_result(self):
+        """
+        ------------------------------------
+        This Board() class method checks if the game has ended after a move, and
+        why. Only a single legal move has to be found to rule out both checkmate
+        and stalemate (see has_legal_move()).
+        ------------------------------------
+        :return: "checkmate", "stalemate", "insufficient material", "threefold
+            repetition", "fifty move rule", or None while the game is still going.
+        """
+        if self._checkmate is True:
+            return "checkmate"
+
+        # make_move() only looks for checkmate when the move is not a simulation,
+        #   and a position set up from a FEN was never looked at at all, so a
+        #   player without a legal move is checked here, whether in check or not.
+        if self.has_legal_move(self._active_p) is False:
+            if self._active_p == "W":
+                king = self.get_w_king_location()
+            else:
+                king = self.get_b_king_location()
+            if self.is_square_attacked(king[0], king[1], self._inactive_p):
+                self._checkmate = True
+                return "checkmate"
+            self._stalemate = True
+            return "stalemate"
+        elif self.has_insufficient_material() is True:
+            return "insufficient material"
+        elif self.is_threefold_repetition() is True:
+            return "threefold repetition"
+        elif self.is_fifty_move_draw() is True:
+            return "fifty move rule"
+        return None
+
+    def scan_for_stalemate(self, color):
+        """
+        ------------------------------------
+        This Board() Class method is used to determine if the player of the color
+        param is in stalemate, i.e. their King is not in check but they have no
+        legal moves.
+        ------------------------------------
+        :param color: string type, should be either "B" or "W"
+        :return: True if it is stalemate, else False.
+        """
+        if self.get_king_check_status(color) is True or self.has_legal_move(color) is True:
+            return False
+        self._stalemate = True
+        return True
 
-        # First we iterate through each square on the board.
-        for row in range(len(self._board)):
-            for col in range(len(self._board[row])):
-                # ---------------
-                try:
-                    player_color = self._board[row][col].get_occupant().get_color()
-                    occupant = self._board[row][col].get_occupant()
-
-                    # Next, if the current square iteration contains a Piece()
-                    #   then all the possible moves are then scanned for the piece.
-                    if player_color == color and occupant is not None:
-                        piece_moves = self.scan_for_moves(row, col)
-
-                        # Then we iterate through all possible moves for the currently
-                        #   analyzed piece. For each possible move, we append the return
-                        #   value from the make_move() method and check if the bool_values
-                        #   list contains a True. If we obtain a True return then we know
-                        #   that there is at least 1 possible move that will take the player
-                        #   out of check, thus it is not checkmate and we return False.
-                        for each in piece_moves:
-                            if self.get_active_p() != color:
-                                self.set_active_p()
-                            bool_values.append(self.make_move([row, col], each, simulation=True))
-                            self.make_move(each, [row, col], simulation=True)
-
-                            if True in bool_values:
-                                self.reset_simulation()
-                                self.set_active_p()
-                                return False
+    def get_stalemate_bool(self):
+        """This class method returns a boolean value for the
+        attribute self._stalemate."""
+        return self._stalemate
 
-                except AttributeError:
+    def has_insufficient_material(self):
+        """
+        ------------------------------------
+        This Board() Class method checks if neither player has enough pieces left
+        to ever checkmate: King against King, King and a single Bishop or Knight
+        against King, or Kings with only Bishops which are all on the same square
+        color.
+        ------------------------------------
+        :return: True if there is insufficient material, else False.
+        """
+        minor_pieces = []
+        for row in range(8):
+            for col in range(8):
+                piece = self._board[row][col].get_occupant()
+                if piece is None or piece.get_letter() == "K":
                     continue
+                if piece.get_letter() not in ("B", "N"):
+                    return False
+                minor_pieces.append((piece.get_letter(), self._board[row][col].get_square_color()))
 
-        self.reset_simulation()
-        self.set_active_p()
-        self._checkmate = True
-        return True
+        if len(minor_pieces) <= 1:
+            return True
+        square_colors = set(square_color for letter, square_color in minor_pieces)
+        return all(letter == "B" for letter, square_color in minor_pieces) and len(square_colors) == 1
 
     def scan_all_piece_moves(self, color):
         """
@@ -731,18 +1509,15 @@ class Board:
         :param color:
         :return:
         """
-        self.reset_covered_squares(self.get_active_p())
-        self.scan_all_piece_moves(self.get_active_p())
-        self.reset_covered_squares(self.get_inactive_p())
-        self.scan_all_piece_moves(self.get_inactive_p())
-
+        # Only the King's square needs to be checked, so instead of scanning the
+        #   moves of every opposing piece, we look outward from the King.
         if color == "B":
             b_king = self.get_b_king_location()
-            white_controlled_squares = self.get_white_covered_squares()
 
-            if b_king in white_controlled_squares:
+            if self.is_square_attacked(b_king[0], b_king[1], "W"):
                 self._black_king_in_check = True
-                print("BLACK KING IN CHECK!!!")
+                if self._verbose is True:
+                    print("BLACK KING IN CHECK!!!")
                 return True
             else:
                 self._black_king_in_check = False
@@ -750,11 +1525,11 @@ class Board:
 
         elif color == "W":
             w_king = self.get_w_king_location()
-            black_controlled_squares = self.get_black_covered_squares()
 
-            if w_king in black_controlled_squares:
+            if self.is_square_attacked(w_king[0], w_king[1], "B"):
                 self._white_king_in_check = True
-                print("WHITE KING IN CHECK!!!")
+                if self._verbose is True:
+                    print("WHITE KING IN CHECK!!!")
                 return True
             else:
                 self._white_king_in_check = False
@@ -762,6 +1537,61 @@ class Board:
         else:
             return False
 
+    def is_square_attacked(self, row, col, by_color):
+        """
+        ------------------------------------
+        This Board() Class method checks if a square is attacked by a piece of
+        the by_color player. Rather than scanning every piece's moves, it looks
+        outward from the square: a Knight's jump away for Knights, one
+        diagonal step for Pawns and one step in every direction for the King,
+        then along each row, column and diagonal until the first piece, which
+        attacks the square if it is a Rook/Queen (rows and columns) or a
+        Bishop/Queen (diagonals) of the by_color player.
+        ------------------------------------
+        :param row: row index of the square.
+        :param col: column index of the square.
+        :param by_color: string type, the attacking player's color, "B" or "W"
+        :return: True if the square is attacked, else False.
+        """
+        board = self._board
+
+        for row_step, col_step in knight_offsets:
+            x, y = row + row_step, col + col_step
+            if 0 <= x <= 7 and 0 <= y <= 7:
+                occupant = board[x][y].get_occupant()
+                if occupant is not None and occupant.get_letter() == "N" and occupant.get_color() == by_color:
+                    return True
+
+        # A white Pawn captures towards row 0, so it attacks the square from
+        #   the row below it (and a black Pawn from the row above it).
+        x = row + 1 if by_color == "W" else row - 1
+        if 0 <= x <= 7:
+            for y in (col - 1, col + 1):
+                if 0 <= y <= 7:
+                    occupant = board[x][y].get_occupant()
+                    if occupant is not None and occupant.get_letter() == "" and occupant.get_color() == by_color:
+                        return True
+
+        for row_step, col_step in king_offsets:
+            x, y = row + row_step, col + col_step
+            if 0 <= x <= 7 and 0 <= y <= 7:
+                occupant = board[x][y].get_occupant()
+                if occupant is not None and occupant.get_letter() == "K" and occupant.get_color() == by_color:
+                    return True
+
+        # Sliding pieces: each ray stops at the first occupied square.
+        for rays, letters in ((straight_rays, ("R", "Q")), (diagonal_rays, ("B", "Q"))):
+            for row_step, col_step in rays:
+                x, y = row + row_step, col + col_step
+                while 0 <= x <= 7 and 0 <= y <= 7:
+                    occupant = board[x][y].get_occupant()
+                    if occupant is not None:
+                        if occupant.get_color() == by_color and occupant.get_letter() in letters:
+                            return True
+                        break
+                    x, y = x + row_step, y + col_step
+        return False
+
     def castle_king_side(self, color):
         """
         ------------------------------------
@@ -1001,7 +1831,7 @@ class Board:
         #   if the King has not conducted a move. If determined
         #   that we can castle on 1 or both sides, then those
         #   moves are also appended to the King()'s moves list.
-        if piece.get_has_moved() is False:
+        if piece.get_has_moved() is False and scan_for_piece is True:
             self.check_king_side_castle(piece)
             self.check_queen_side_castle(piece)
 
@@ -1029,8 +1859,11 @@ class Board:
                     #   identical checks for the black king in the elif
                     #   block below, however the indices reference the
                     #   coordinates for the black pieces.
-                    if square_1 is None and square_2 is None:
-                        piece.add_move(7, 6)
+                    # The King may not castle out of check or through an attacked
+                    #   square (the destination square is checked by make_move()).
+                    if square_1 is None and square_2 is None and not self.is_square_attacked(7, 4, "B") \
+                            and not self.is_square_attacked(7, 5, "B"):
+                        piece.add_move(7, 6, FLAG_CASTLE)
 
             # elif statement if checking castle for black king.
             elif piece.get_color() == "B":
@@ -1041,8 +1874,9 @@ class Board:
                     square_1 = self._board[0][5].get_occupant()
                     square_2 = self._board[0][6].get_occupant()
 
-                    if square_1 is None and square_2 is None:
-                        piece.add_move(0, 6)
+                    if square_1 is None and square_2 is None and not self.is_square_attacked(0, 4, "W") \
+                            and not self.is_square_attacked(0, 5, "W"):
+                        piece.add_move(0, 6, FLAG_CASTLE)
 
         except AttributeError:
             return
@@ -1071,8 +1905,9 @@ class Board:
                     square_2 = self._board[7][2].get_occupant()
                     square_3 = self._board[7][3].get_occupant()
 
-                    if square_1 is None and square_2 is None and square_3 is None:
-                        piece.add_move(7, 2)
+                    if square_1 is None and square_2 is None and square_3 is None \
+                            and not self.is_square_attacked(7, 4, "B") and not self.is_square_attacked(7, 3, "B"):
+                        piece.add_move(7, 2, FLAG_CASTLE)
 
             elif piece.get_color() == "B":
                 letter = self._board[0][0].get_occupant().get_letter()
@@ -1083,8 +1918,9 @@ class Board:
                     square_2 = self._board[0][2].get_occupant()
                     square_3 = self._board[0][3].get_occupant()
 
-                    if square_1 is None and square_2 is None and square_3 is None:
-                        piece.add_move(0, 2)
+                    if square_1 is None and square_2 is None and square_3 is None \
+                            and not self.is_square_attacked(0, 4, "W") and not self.is_square_attacked(0, 3, "W"):
+                        piece.add_move(0, 2, FLAG_CASTLE)
 
         except AttributeError:
             return
@@ -1337,6 +2173,8 @@ class Board:
         while status and pawn_moves > 0:
             try:
                 row = row + y_dir
+                if row < 0:
+                    raise IndexError
                 next_square = self._board[row][col]
 
                 if next_square.get_occupant() is None:
@@ -1351,42 +2189,55 @@ class Board:
             except AttributeError:
                 status = False
 
-            # Checks for diagonal capture for Pawn Pieces
-            for square in range(2):
-                try:
-                    next_square_neg = self._board[y][x_neg]
-                except IndexError:
-                    next_square_neg = None
+        # Checks for diagonal capture for Pawn Pieces. (A negative index would
+        #   wrap around to the other side of the board, so it is skipped.)
+        for square in range(2):
+            if y < 0:
+                break
+            try:
+                next_square_neg = self._board[y][x_neg] if x_neg >= 0 else None
+            except IndexError:
+                next_square_neg = None
 
-                try:
-                    next_square_pos = self._board[y][x_pos]
-                except IndexError:
-                    next_square_pos = None
+            try:
+                next_square_pos = self._board[y][x_pos]
+            except IndexError:
+                next_square_pos = None
 
-                try:
-                    if square == 0:
-                        if next_square_neg.get_occupant().get_color() != piece.get_color():
-                            if scan_for_piece is True:
-                                piece.add_move(y, x_neg)
-                            else:
-                                self.add_covered_squares(y, x_neg, piece.get_color())
-
-                    if square == 1:
-                        if next_square_pos.get_occupant().get_color() != piece.get_color():
-                            if scan_for_piece is True:
-                                piece.add_move(y, x_pos)
-                            else:
-                                self.add_covered_squares(y, x_pos, piece.get_color())
+            # A diagonal move onto the en passant square is also a capture,
+            #   even though the square itself is empty.
+            if scan_for_piece is True and self._en_passant is not None:
+                if square == 0 and self._en_passant == [y, x_neg]:
+                    piece.add_move(y, x_neg, FLAG_EN_PASSANT)
+                elif square == 1 and self._en_passant == [y, x_pos]:
+                    piece.add_move(y, x_pos, FLAG_EN_PASSANT)
 
-                except AttributeError:
-                    continue
+            try:
+                if square == 0:
+                    if next_square_neg.get_occupant().get_color() != piece.get_color():
+                        if scan_for_piece is True:
+                            piece.add_move(y, x_neg)
+                        else:
+                            self.add_covered_squares(y, x_neg, piece.get_color())
+
+                if square == 1:
+                    if next_square_pos.get_occupant().get_color() != piece.get_color():
+                        if scan_for_piece is True:
+                            piece.add_move(y, x_pos)
+                        else:
+                            self.add_covered_squares(y, x_pos, piece.get_color())
+
+            except AttributeError:
+                continue
 
-    def generate_board(self):
+    def generate_board(self, fen=None):
         """
         ------------------------------------
         This Board() class method is used to generate a new board as a list.
-        Arguments: None
         ------------------------------------
+        :param fen: optional FEN string. If given, the pieces are set up as
+            described by the FEN, else they are set in their starting positions.
+        :return: None
         """
 
         # Creates an 8x8 list containing Square() objects which will
@@ -1409,7 +2260,150 @@ class Board:
                         new_row.append(Square(row, column, None, "W"))
 
             self._board.append(new_row)
-        self.set_board_pieces()
+
+        if fen is None:
+            self.set_board_pieces()
+        else:
+            self.set_fen(fen)
+
+    def set_fen(self, fen):
+        """
+        ------------------------------------
+        This Board() class method sets up the pieces (and whose turn it is) as
+        described by a FEN string. The existing Square() objects are reused.
+        ------------------------------------
+        :param fen: FEN string, i.e. start_fen. The half move clock and full
+            move number fields may be left out.
+        :return: None
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError("Invalid FEN: " + fen)
+        placement, active, castling, en_passant = fields[:4]
+        ranks = placement.split("/")
+        if len(ranks) != 8 or active not in ("w", "b"):
+            raise ValueError("Invalid FEN: " + fen)
+
+        self._white_king_loc = None
+        self._black_king_loc = None
+        for row in range(8):
+            col = 0
+            for char in ranks[row]:
+                if char.isdigit():
+                    # A rank which holds more than 8 squares is not valid.
+                    if col + int(char) > 8:
+                        raise ValueError("Invalid FEN: " + fen)
+                    for empty in range(int(char)):
+                        self._board[row][col + empty].set_occupant(None)
+                    col += int(char)
+                    continue
+                if col > 7 or char.upper() not in fen_piece_classes:
+                    raise ValueError("Invalid FEN: " + fen)
+
+                color = "W" if char.isupper() else "B"
+                piece = fen_piece_classes[char.upper()](row, col, color)
+                self._board[row][col].set_occupant(piece)
+
+                # Pawns which are not on their starting row have already moved,
+                #   so they may only move 1 square forward.
+                if char == "P" and row != 6 or char == "p" and row != 1:
+                    piece.set_pawn_range()
+                elif char.upper() == "K":
+                    self.set_king_location([row, col], color)
+                col += 1
+            if col != 8:
+                raise ValueError("Invalid FEN: " + fen)
+
+        if self._white_king_loc is None or self._black_king_loc is None:
+            raise ValueError("FEN is missing a King: " + fen)
+
+        # Castling rights are kept by the has_moved attribute of the King and
+        #   Rook pieces, so every King or Rook which has lost its right to castle
+        #   is simply marked as having moved.
+        rights = {"K": [7, 7], "Q": [7, 0], "k": [0, 7], "q": [0, 0]}
+        for row in range(8):
+            for col in range(8):
+                piece = self._board[row][col].get_occupant()
+                if piece is None or piece.get_letter() not in ("K", "R"):
+                    continue
+                home_row = 7 if piece.get_color() == "W" else 0
+                sides = "KQ" if piece.get_color() == "W" else "kq"
+                if piece.get_letter() == "K":
+                    can_castle = [row, col] == [home_row, 4] and (sides[0] in castling or sides[1] in castling)
+                else:
+                    can_castle = (sides[0] in castling and [row, col] == rights[sides[0]]) or \
+                                 (sides[1] in castling and [row, col] == rights[sides[1]])
+                if not can_castle:
+                    piece.set_has_moved()
+
+        self._en_passant = None if en_passant == "-" else parse_square(en_passant)
+        self._halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        self._fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        self._last_move = None
+        self._checkmate = False
+        self._stalemate = False
+
+        self._active_p, self._inactive_p = ("W", "B") if active == "w" else ("B", "W")
+        self.scan_for_king_check(self._active_p)
+        self.scan_for_king_check(self._inactive_p)
+        self.reset_history()
+
+    def get_castling_bits(self):
+        """
+        This Board() class method returns the castling rights as 4 bits, in the
+        order "KQkq" (i.e. 1 is white King side, 8 is black Queen side). These only
+        say that the King and Rook have not moved, not that castling is possible
+        right now.
+        """
+        bits = 0
+        for bit, color, row, rook_col in ((1, "W", 7, 7), (2, "W", 7, 0), (4, "B", 0, 7), (8, "B", 0, 0)):
+            king = self._board[row][4].get_occupant()
+            rook = self._board[row][rook_col].get_occupant()
+            if king is None or rook is None or king.get_color() != color or rook.get_color() != color:
+                continue
+            if king.get_letter() == "K" and rook.get_letter() == "R" and \
+                    king.get_has_moved() is False and rook.get_has_moved() is False:
+                bits |= bit
+        return bits
+
+    def get_castling_rights(self):
+        """This Board() class method returns the castling rights as they are written
+        in a FEN string, i.e. "KQkq", "Kq" or "-"."""
+        bits = self.get_castling_bits()
+        rights = ""
+        for bit, letter in ((1, "K"), (2, "Q"), (4, "k"), (8, "q")):
+            if bits & bit:
+                rights += letter
+        return rights or "-"
+
+    def to_fen(self):
+        """
+        ------------------------------------
+        This Board() class method returns the current position as a FEN string.
+        ------------------------------------
+        :return: FEN string
+        """
+        ranks = []
+        for row in range(8):
+            rank = ""
+            empty = 0
+            for col in range(8):
+                piece = self._board[row][col].get_occupant()
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                letter = piece.get_letter() or "P"
+                rank += letter if piece.get_color() == "W" else letter.lower()
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+
+        en_passant = "-" if self._en_passant is None else square_name(self._en_passant)
+        return "%s %s %s %s %d %d" % ("/".join(ranks), self._active_p.lower(), self.get_castling_rights(),
+                                      en_passant, self._halfmove_clock, self._fullmove_number)
 
     def set_board_pieces(self):
         """
@@ -1447,6 +2441,7 @@ class Board:
         self._board[7][2].set_occupant(Bishop(7, 2, "W"))
         self._board[7][5].set_occupant(Bishop(7, 5, "W"))
         self.set_w_king_location([7, 4])
+        self.reset_history()
 
     def print_board(self):
         """
@@ -1471,10 +2466,11 @@ class Board:
 
         pygame.display.set_caption("Chess by Chris")
         win.fill(blue)
+        square_size = self._square_size
 
         for row in range(rows):
             for col in range(row % 2, rows, 2):
-                pygame.draw.rect(win, white, (row * size, col * size, size, size))
+                pygame.draw.rect(win, white, (row * square_size, col * square_size, square_size, square_size))
 
     def draw_pieces(self, win):
         """
@@ -1488,38 +2484,17 @@ class Board:
         # Below, we iterate over each Square() object, and if the Square contains
         #   a Piece() object, then we get that piece's translated (x, y) coordinates
         #   so we can draw the appropriate piece at the corresponding (x, y) onto the
-        #   generated pygame window.
+        #   generated pygame window. The sprites are scaled for the current square
+        #   size by the SpriteCache, so this lookup does no rescaling per frame.
+        square_size = self._square_size
+        scaled_sprites = sprites.get_sprites(square_size)
         for row in range(8):
             for col in range(8):
                 try:
                     piece = self._board[row][col].get_occupant()
-                    player_color = piece.get_color()
-                    piece_type = piece.get_letter()
-                    # piece.get_x()
-                    if player_color == "B" and piece_type == "K":
-                        win.blit(black_king, (piece.get_x(), piece.get_y()))
-                    elif player_color == "B" and piece_type == "Q":
-                        win.blit(black_queen, (piece.get_x(), piece.get_y()))
-                    elif player_color == "B" and piece_type == "R":
-                        win.blit(black_rook, (piece.get_x(), piece.get_y()))
-                    elif player_color == "B" and piece_type == "B":
-                        win.blit(black_bishop, (piece.get_x(), piece.get_y()))
-                    elif player_color == "B" and piece_type == "N":
-                        win.blit(black_knight, (piece.get_x(), piece.get_y()))
-                    elif player_color == "B" and piece_type == "":
-                        win.blit(black_pawn, (piece.get_x(), piece.get_y()))
-                    elif player_color == "W" and piece_type == "K":
-                        win.blit(white_king, (piece.get_x(), piece.get_y()))
-                    elif player_color == "W" and piece_type == "Q":
-                        win.blit(white_queen, (piece.get_x(), piece.get_y()))
-                    elif player_color == "W" and piece_type == "R":
-                        win.blit(white_rook, (piece.get_x(), piece.get_y()))
-                    elif player_color == "W" and piece_type == "B":
-                        win.blit(white_bishop, (piece.get_x(), piece.get_y()))
-                    elif player_color == "W" and piece_type == "N":
-                        win.blit(white_knight, (piece.get_x(), piece.get_y()))
-                    elif player_color == "W" and piece_type == "":
-                        win.blit(white_pawn, (piece.get_x(), piece.get_y()))
+                    sprite = scaled_sprites[(piece.get_color(), piece.get_letter())]
+                    piece.calculate_location(square_size)
+                    win.blit(sprite, (piece.get_x(), piece.get_y()))
 
                 except AttributeError:
                     continue
@@ -1537,9 +2512,8 @@ class Board:
         """
         try:
             # First, we need to translate the pygame coordinates to list indices
-            mouse_coord = list(mouse_coord)
-            col = (mouse_coord[0] // 80)
-            row = (mouse_coord[1] // 80)
+            square_size = self._square_size
+            row, col = pixel_to_square(mouse_coord, square_size)
 
             # Then using the indices, we get the occupant at the location and
             #   scan for all possible moves for the corresponding piece.
@@ -1550,10 +2524,11 @@ class Board:
             # Next, we iterate through the list of possible moves, and draw them
             #   out as medium-sized red dots on squares which the piece object
             #   can potentially move to.
-            for square in range(len(moves)):
-                draw_on_board_y = (moves[square][0]) * 80 + 40
-                draw_on_board_x = (moves[square][1]) * 80 + 40
-                pygame.draw.circle(win, (255, 0, 0), (draw_on_board_x, draw_on_board_y), 10)
+            for code in moves:
+                end = decode_move(code)[1]
+                draw_on_board_y = end[0] * square_size + square_size // 2
+                draw_on_board_x = end[1] * square_size + square_size // 2
+                pygame.draw.circle(win, (255, 0, 0), (draw_on_board_x, draw_on_board_y), max(square_size // 8, 1))
 
         except AttributeError:
             return
@@ -1565,9 +2540,13 @@ class ChessGame:
     """
     Class ChessGame object is a class that represents a chess game.
     """
-    def __init__(self):
+    def __init__(self, log_path=None, fen=None):
         """
         Constructor method for class ChessGame.
+        :param log_path: optional file path. If given, each recorded move is
+            also streamed to this binary file (see class MoveLog).
+        :param fen: optional FEN string to start the game from, else the
+            game starts from the usual starting position.
         """
 
         # Note: There are some redundant class attributes as some of
@@ -1579,36 +2558,131 @@ class ChessGame:
         self._player_turn = "W"
         self._inactive_p = "B"
         self._game_state = True
+        self._start_fen = fen
         self._board = Board()
-        self._board.generate_board()
+        self._board.generate_board(fen)
+        self._player_turn = self._board.get_active_p()
+        self._inactive_p = self._board.get_inactive_p()
         self._white_check = False
         self._black_check = False
         self._move_num = 1
-        self._moves = []
+        self._moves = MoveLog(log_path)
+        self._game_result = None
+        self._snapshots = []
 
-    def record_move(self, start, destination):
+    def record_move(self, code):
         """
-        This method will be used to record each players move using
-        traditional chess move notation.
-        :param start:
-        :param destination:
-        :return:
+        This method records a player's move as a compact 16-bit move code
+        (see movelog.py). The Board() creates the code when it conducts the
+        move, since it knows whether the move was a castle, en passant or
+        pawn promotion.
+        :param code: the move code, i.e. from Board().get_last_move()
+        :return: None
         """
-        pass
+        self._moves.append(code)
+
+    def get_moves(self):
+        """This class method returns the MoveLog of recorded move codes."""
+        return self._moves
+
+    def get_start_fen(self):
+        """This class method returns the FEN string the game was started from, or
+        None if it started from the usual starting position."""
+        return self._start_fen
+
+    def flush_moves(self, asynchronous=True):
+        """This class method flushes the recorded moves to the move log file (if
+        any). By default the flush happens in a background thread."""
+        self._moves.flush(asynchronous)
+
+    def close_move_log(self):
+        """This class method marks the end of the game in the move log file and
+        closes it."""
+        self._moves.end_game()
+        self._moves.close()
 
-    def make_move(self, start, destination):
+    def make_move(self, start, destination, promotion="Q"):
         """
         This class method is used to conduct a Piece move.
-        :param start: starting pygame coordinates
-        :param destination: destination pygame coordinates.
-        :return: None
+        :param start: starting pygame coordinates (or [row, col] indices)
+        :param destination: destination pygame coordinates (or [row, col] indices).
+        :param promotion: the piece letter a Pawn is promoted to.
+        :return: True if the move was conducted, else False.
         """
         # There is not much functionality to this class's method
         #   since it calls on the Board() method to conduction
         #   the actual piece movement. To see how a piece move
         #   is conducted, please look at Class Board().
-        if self._board.make_move(start, destination) is True:
+        # A snapshot of the position is saved before each move so that any
+        #   number of moves can be taken back (see take_back()).
+        snapshot = self._board.snapshot()
+        if self._board.make_move(start, destination, promotion=promotion) is True:
+            self._snapshots.append(snapshot)
+            self.record_move(self._board.get_last_move())
             self.set_player_turn()
+            self.update_game_state()
+            return True
+        return False
+
+    def take_back(self):
+        """
+        This class method takes back the last move of the game, restoring the
+        position from the snapshot saved before the move. It can be called
+        again and again, back to the start of the game.
+        :return: True if a move was taken back, False if there are no moves
+            to take back.
+        """
+        if not self._snapshots:
+            return False
+
+        snapshot = self._snapshots.pop()
+        self._board.restore_snapshot(snapshot, [each.get_hash() for each in self._snapshots])
+        self._moves.pop()
+        self._player_turn = self._board.get_active_p()
+        self._inactive_p = self._board.get_inactive_p()
+        self._move_num -= 0.5
+        self._game_result = None
+        self._game_state = True
+        return True
+
+    def set_position(self, snapshot, history=(), codes=()):
+        """
+        This class method sets the game to a saved position, i.e. to bring a game
+        which was put aside back into play. Moves conducted before can no longer
+        be taken back.
+        :param snapshot: BoardSnapshot() of the position (see Board().snapshot()).
+        :param history: hashes of the positions which came before it (see
+            Board().restore_snapshot()).
+        :param codes: the move codes recorded so far in the game.
+        :return: None
+        """
+        self._board.restore_snapshot(snapshot, history)
+        self._snapshots = []
+        self._moves.clear()
+        for code in codes:
+            self._moves.append(code)
+        self._player_turn = self._board.get_active_p()
+        self._inactive_p = self._board.get_inactive_p()
+        self._move_num = 1 + len(codes) / 2
+        self.update_game_state()
+
+    def update_game_state(self):
+        """
+        This class method checks if the game has ended after a move, and why
+        (see Board().get_game_result()).
+        :return: the game result (see get_game_result())
+        """
+        self._game_result = self._board.get_game_result()
+        self._game_state = self._game_result is None
+        return self._game_result
+
+    def get_game_result(self):
+        """
+        This class method returns why the game has ended: "checkmate",
+        "stalemate", "insufficient material", "threefold repetition" or
+        "fifty move rule". Returns None while the game is still going.
+        """
+        return self._game_result
 
     def set_check(self, color):
         """
@@ -1643,6 +2717,16 @@ class ChessGame:
         """
         self._board.draw_pieces(win)
 
+    def set_window_size(self, window_size):
+        """
+        This class method rescales the board to fit the pygame window. The square
+        size is derived from the window size, and is used both for drawing and for
+        translating mouse coordinates into board indices.
+        :param window_size: (width, height) tuple of the pygame window.
+        :return: None
+        """
+        self._board.set_square_size(get_square_size(window_size))
+
     def draw_moves(self, win, mouse_coord):
         """
         This class method draws a Piece's possible moves onto the pygame window.
@@ -1659,8 +2743,7 @@ class ChessGame:
         #   the addition of the try/except, there has been no subsequent
         #   TypeErrors that have been raised.
         try:
-            square = list(mouse_coord)
-            start_col, start_row = square[0] // 80, square[1] // 80
+            start_row, start_col = pixel_to_square(mouse_coord, self._board.get_square_size())
 
             # This second try/except ensures (hopefully) that the program does
             #   not crash if the user selects/clicks on an empty square.
@@ -1679,6 +2762,10 @@ class ChessGame:
         except TypeError:
             pass
 
+    def get_board(self):
+        """This class method returns the Board() object for the game."""
+        return self._board
+
     def get_player_turn(self):
         """
         This class method is used to return the currently active player.
@@ -1689,9 +2776,9 @@ class ChessGame:
     def get_game_state(self):
         """
         This class method is used to get the current game state.
-        :return: self._game_state (either a True or False value)
+        :return: self._game_state (either a True or False value). It is set
+            to False once the game has ended (see update_game_state()).
         """
-        self._game_state = not (self._board.get_checkmate_bool())
         return self._game_state
 
     def set_player_turn(self):
@@ -1728,7 +2815,9 @@ class ChessGame:
 
 def main():
 
+    window = pygame.display.set_mode((width, height), pygame.RESIZABLE)
     game = ChessGame()
+    game.set_window_size(window.get_size())
 
     clock = pygame.time.Clock()
     game.draw_squares(window)
@@ -1747,10 +2836,26 @@ def main():
             if event.type == pygame.QUIT:
                 run = False
 
+            # The square size follows the window size, so resizing only
+            #   rescales the sprites once (see class SpriteCache).
+            if event.type == pygame.VIDEORESIZE:
+                window = pygame.display.get_surface()
+                game.set_window_size(window.get_size())
+                game.draw_squares(window)
+                game.draw_pieces(window)
+                pygame.display.update()
+
             if game.get_game_state() is False:
-                print('GAME OVER')
+                print('GAME OVER:', game.get_game_result())
                 run = False
 
+            # Backspace (or U) takes back the last move.
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_BACKSPACE, pygame.K_u):
+                game.take_back()
+                game.draw_squares(window)
+                game.draw_pieces(window)
+                pygame.display.update()
+
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_start_pos = pygame.mouse.get_pos()
                 # print(mouse_start_pos)
@@ -1773,6 +2878,7 @@ def main():
                 pygame.display.update()
                 # print(mouse_end_pos)
 
+    game.close_move_log()
     pygame.quit()
 
 
@@ -0,0 +1,257 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Compact move recording for Chess by Chris. Each move is stored as a
+#   single 16-bit code instead of text notation, so a whole game only takes a few
+#   hundred bytes in memory and on disk.
+#
+#   Move code layout (16 bits):
+#       bits 0-5   starting square (row * 8 + col)
+#       bits 6-11  destination square (row * 8 + col)
+#       bits 12-15 flags (see FLAG_* below)
+
+import os
+import sys
+import threading
+from array import array
+
+# Move flags. Promotion flags are FLAG_PROMOTION plus the index of the promoted
+#   piece letter in promotion_letters, i.e. 4 = Knight ... 7 = Queen.
+FLAG_NONE = 0
+FLAG_CASTLE = 1
+FLAG_EN_PASSANT = 2
+FLAG_PROMOTION = 4
+promotion_letters = "NBRQ"
+
+# A from-square equal to the to-square is never a legal move, so this code is
+#   used in the binary files to mark where one game ends and the next begins.
+END_OF_GAME = 0xFFFF
+
+# Number of codes held in memory before they are handed to the file object.
+write_chunk = 512
+
+
+def encode_move(start, end, flags=FLAG_NONE):
+    """
+    This function encodes a piece move as a 16-bit integer.
+    :param start: [row, col] indices of the starting square.
+    :param end: [row, col] indices of the destination square.
+    :param flags: one of the FLAG_* values.
+    :return: integer move code (0 - 65535)
+    """
+    return (start[0] * 8 + start[1]) | ((end[0] * 8 + end[1]) << 6) | (flags << 12)
+
+
+def decode_move(code):
+    """
+    This function decodes a 16-bit move code.
+    :param code: integer move code created by encode_move().
+    :return: ([start_row, start_col], [end_row, end_col], flags)
+    """
+    start = code & 63
+    end = (code >> 6) & 63
+    return [start >> 3, start & 7], [end >> 3, end & 7], code >> 12
+
+
+def get_start_square(code):
+    """This function returns the starting square (row * 8 + col) of a move code."""
+    return code & 63
+
+
+def get_end_square(code):
+    """This function returns the destination square (row * 8 + col) of a move code."""
+    return (code >> 6) & 63
+
+
+def get_promotion_flag(letter):
+    """This function returns the move flag for promoting a pawn to the piece letter."""
+    return FLAG_PROMOTION + promotion_letters.index(letter)
+
+
+def get_promotion_letter(flags):
+    """This function returns the promoted piece letter for a move flag, or None
+    if the flag is not a promotion."""
+    if flags & FLAG_PROMOTION:
+        return promotion_letters[flags - FLAG_PROMOTION]
+    return None
+
+
+def _to_little_endian(codes):
+    """Binary files are always little-endian, regardless of the machine."""
+    if sys.byteorder == "big":
+        codes = array("H", codes)
+        codes.byteswap()
+    return codes
+
+
+class MoveLog:
+    """
+    Class MoveLog represents the list of moves of a single game as 16-bit codes.
+    ----------------------------------
+    Codes are kept in an array('H') in memory. Optionally, the log can also stream
+    to an append-only binary file. Writes go through a buffered file object and
+    can be flushed to disk in a background thread, so recording a move never waits
+    on the disk.
+    """
+    def __init__(self, path=None):
+        """
+        Constructor method for class MoveLog.
+        ------------------------------------
+        :param path: optional file path. If given, every recorded move is also
+            appended to this file (see open()).
+        """
+        self._codes = array("H")
+        self._pending = array("H")
+        # Number of codes of the current game which went to the file (pending or
+        #   written), so pop() knows whether the file has to be cut back too.
+        self._streamed = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._flush_thread = None
+        if path is not None:
+            self.open(path)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __iter__(self):
+        return iter(self._codes)
+
+    def __getitem__(self, index):
+        return self._codes[index]
+
+    def get_codes(self):
+        """This class method returns the array of recorded move codes."""
+        return self._codes
+
+    def open(self, path):
+        """
+        This class method opens the binary file that moves are streamed to.
+        The file is only ever appended to, so many games can share one file.
+        :param path: file path
+        :return: None
+        """
+        self.close()
+        self._file = open(path, "ab")
+        self._streamed = 0
+
+    def append(self, code):
+        """
+        This class method records a move code.
+        :param code: integer move code (see encode_move())
+        :return: None
+        """
+        self._codes.append(code)
+        if self._file is not None:
+            with self._lock:
+                self._pending.append(code)
+                self._streamed += 1
+                if len(self._pending) >= write_chunk:
+                    self._write_pending()
+
+    def pop(self):
+        """This class method removes and returns the last recorded move code (i.e.
+        for a takeback). If the code was streamed to the file, it is removed from
+        the file as well."""
+        code = self._codes.pop()
+        with self._lock:
+            if self._file is not None and self._streamed > 0:
+                self._streamed -= 1
+                if self._pending:
+                    self._pending.pop()
+                else:
+                    # The code is already in the file: the file is append-only
+                    #   with 2 bytes per code, so it is simply cut 2 bytes short.
+                    self._file.flush()
+                    self._file.truncate(os.fstat(self._file.fileno()).st_size - 2)
+        return code
+
+    def end_game(self):
+        """This class method marks the end of the current game in the binary file.
+        The in-memory codes are kept until clear() is called."""
+        if self._file is not None:
+            with self._lock:
+                self._pending.append(END_OF_GAME)
+                self._write_pending()
+                self._streamed = 0
+
+    def clear(self):
+        """This class method clears the in-memory list of moves."""
+        self._codes = array("H")
+
+    def _write_pending(self):
+        """Hands the pending codes to the buffered file object. The lock must be held."""
+        if self._pending:
+            self._file.write(_to_little_endian(self._pending).tobytes())
+            self._pending = array("H")
+
+    def _flush_to_disk(self):
+        """Writes the pending codes and forces them onto the disk."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._write_pending()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def flush(self, asynchronous=False):
+        """
+        This class method flushes recorded moves to the binary file.
+        :param asynchronous: if True, the flush runs in a background thread and
+            this method returns right away. A following flush() or close() waits
+            for it to finish.
+        :return: None
+        """
+        if self._file is None:
+            return
+        self.wait()
+        if asynchronous is True:
+            self._flush_thread = threading.Thread(target=self._flush_to_disk, daemon=True)
+            self._flush_thread.start()
+        else:
+            self._flush_to_disk()
+
+    def wait(self):
+        """This class method waits for a background flush to finish."""
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+            self._flush_thread = None
+
+    def close(self):
+        """This class method flushes and closes the binary file (if any)."""
+        if self._file is None:
+            return
+        self.flush()
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+
+def read_games(path, chunk_size=65536):
+    """
+    This generator streams the games stored in a binary move file. The file is
+    read in chunks, so it is never loaded into memory all at once.
+    :param path: file path written by a MoveLog.
+    :param chunk_size: number of bytes to read at a time (must be even).
+    :return: yields one array('H') of move codes per game.
+    """
+    game = array("H")
+    with open(path, "rb") as file:
+        while True:
+            data = file.read(chunk_size)
+            if not data:
+                break
+            codes = array("H")
+            codes.frombytes(data[:len(data) - len(data) % 2])
+            codes = _to_little_endian(codes)
+
+            for code in codes:
+                if code == END_OF_GAME:
+                    yield game
+                    game = array("H")
+                else:
+                    game.append(code)
+
+    # A game which was not ended (i.e. still in progress when the file was
+    #   last flushed) is still returned.
+    if game:
+        yield game
@@ -0,0 +1,527 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: PGN (Portable Game Notation) import and export for Chess by Chris.
+#   Games are streamed out of PGN files one at a time by a generator, so very
+#   large files are never loaded into memory, and each game can be replayed
+#   through Board().make_move(). PGNWriter writes games (including ChessGame()
+#   sessions) back out through a buffered file.
+#
+#   Usage (reports replay throughput for a PGN file):
+#       python pgn.py games.pgn [--limit N]
+
+import re
+import sys
+import time
+import argparse
+from array import array
+
+from main import Board, start_fen, files, square_name, parse_square
+from movelog import decode_move, get_end_square, get_promotion_letter, FLAG_CASTLE, FLAG_EN_PASSANT
+
+results = ("1-0", "0-1", "1/2-1/2", "*")
+
+# The Seven Tag Roster is always written first, in this order.
+tag_roster = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+default_tags = {"Event": "?", "Site": "?", "Date": "????.??.??", "Round": "?",
+                "White": "?", "Black": "?", "Result": "*"}
+
+line_length = 79
+header_pattern = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+move_number_pattern = re.compile(r'\d+\.+')
+san_pattern = re.compile(r'^([KQRBN])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([QRBN]))?$')
+
+
+class PGNError(ValueError):
+    """Raised when a game's movetext cannot be replayed on the board."""
+
+
+class PGNGame:
+    """
+    Class PGNGame represents a single game read from a PGN file: its tag pairs,
+    its moves in Standard Algebraic Notation (SAN) and the game result.
+    """
+    def __init__(self, headers, moves, result):
+        """
+        Constructor method for class PGNGame.
+        ------------------------------------
+        :param headers: dictionary of tag pairs, i.e. {"White": "Castro"}
+        :param moves: list of SAN strings, i.e. ["e4", "e5", "Nf3"]
+        :param result: one of "1-0", "0-1", "1/2-1/2" or "*"
+        """
+        self._headers = headers
+        self._moves = moves
+        self._result = result
+
+    def get_headers(self):
+        """This class method returns the dictionary of tag pairs."""
+        return self._headers
+
+    def get_moves(self):
+        """This class method returns the list of SAN moves."""
+        return self._moves
+
+    def get_result(self):
+        """This class method returns the game result."""
+        return self._result
+
+
+def new_board(fen=None):
+    """This function returns a Board() set up at the starting position (or the
+    position of the FEN string), with the terminal messages turned off."""
+    board = Board()
+    board.generate_board(fen)
+    board.set_verbose(False)
+    return board
+
+
+def move_to_san(board, code):
+    """
+    This function returns the SAN for a move, without the check suffix. It must
+    be called before the move is made, since it looks at the board as it is.
+    ------------------------------------
+    :param board: the Board() object.
+    :param code: the move code (see movelog.py)
+    :return: SAN string, i.e. "Nbd2", "exd5", "e8=Q" or "O-O"
+    """
+    start, end, flags = decode_move(code)
+    grid = board.get_board()
+    piece = grid[start[0]][start[1]].get_occupant()
+    letter = piece.get_letter()
+
+    if flags == FLAG_CASTLE:
+        return "O-O" if end[1] == 6 else "O-O-O"
+
+    capture = grid[end[0]][end[1]].get_occupant() is not None or flags == FLAG_EN_PASSANT
+
+    if letter == "":
+        san = files[start[1]] + "x" if capture else ""
+        san += square_name(end)
+        promotion = get_promotion_letter(flags)
+        if promotion is not None:
+            san += "=" + promotion
+        return san
+
+    # If another piece of the same type can also reach the destination, then
+    #   the starting column (or row, or both) is added to tell them apart.
+    same_col, same_row, ambiguous = False, False, False
+    end_square = end[0] * 8 + end[1]
+    for row in range(8):
+        for col in range(8):
+            other = grid[row][col].get_occupant()
+            if other is None or other is piece or [row, col] == start:
+                continue
+            if other.get_letter() == letter and other.get_color() == piece.get_color():
+                if any(get_end_square(move) == end_square for move in board.scan_for_moves(row, col)):
+                    ambiguous = True
+                    same_col = same_col or col == start[1]
+                    same_row = same_row or row == start[0]
+
+    san = letter
+    if ambiguous:
+        if not same_col:
+            san += files[start[1]]
+        elif not same_row:
+            san += str(8 - start[0])
+        else:
+            san += square_name(start)
+    if capture:
+        san += "x"
+    return san + square_name(end)
+
+
+def get_check_suffix(board):
+    """This function returns "#", "+" or "" for the player to move on the board,
+    i.e. right after a move has been made."""
+    if board.get_checkmate_bool() is True:
+        return "#"
+    if board.get_king_check_status(board.get_active_p()) is True:
+        return "+"
+    return ""
+
+
+def play_san(board, san):
+    """
+    This function conducts a move given in SAN on the board.
+    ------------------------------------
+    :param board: the Board() object.
+    :param san: SAN string, i.e. "Nf3", "exd6", "O-O", "e8=Q+"
+    :return: the move code of the conducted move.
+    :raises PGNError: if the move is not legal on the board.
+    """
+    color = board.get_active_p()
+    text = san.rstrip("+#!?")
+    home_row = 7 if color == "W" else 0
+
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        end_col = 6 if len(text) == 3 else 2
+        if board.make_move([home_row, 4], [home_row, end_col]) is True:
+            return board.get_last_move()
+        raise PGNError("Illegal castle: " + san)
+
+    match = san_pattern.match(text)
+    if match is None:
+        raise PGNError("Unrecognized move: " + san)
+
+    letter, from_file, from_rank, destination, promotion = match.groups()
+    letter = letter or ""
+    end = parse_square(destination)
+
+    # Every piece of the right type and color which could move to the destination
+    #   is a candidate. SAN only disambiguates between legal moves, so when there
+    #   are several candidates we simply try them in turn, as make_move() refuses
+    #   (and resets) any move which leaves the King in check.
+    end_square = end[0] * 8 + end[1]
+    grid = board.get_board()
+    for row in range(8):
+        if from_rank is not None and row != 8 - int(from_rank):
+            continue
+        for col in range(8):
+            if from_file is not None and col != files.index(from_file):
+                continue
+            piece = grid[row][col].get_occupant()
+            if piece is None or piece.get_color() != color or piece.get_letter() != letter:
+                continue
+            if any(get_end_square(move) == end_square for move in board.scan_for_moves(row, col)):
+                if board.make_move([row, col], end, promotion=promotion or "Q") is True:
+                    return board.get_last_move()
+
+    raise PGNError("Illegal move: " + san)
+
+
+def tokenize_movetext(text):
+    """
+    This function splits PGN movetext into SAN moves and the game result.
+    Comments, variations, move numbers and annotation glyphs are skipped.
+    :param text: the movetext of a game.
+    :return: (list of SAN strings, result string or "*")
+    """
+    # Comments and (possibly nested) variations are removed first, one
+    #   character at a time, since regular expressions cannot count nesting.
+    cleaned = []
+    depth = 0
+    in_comment = False
+    in_line_comment = False
+    for char in text:
+        if in_comment:
+            in_comment = char != "}"
+        elif in_line_comment:
+            in_line_comment = char != "\n"
+        elif char == "{":
+            in_comment = True
+        elif char == ";":
+            in_line_comment = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            cleaned.append(char)
+
+    moves = []
+    result = "*"
+    for token in move_number_pattern.sub(" ", "".join(cleaned)).split():
+        if token in results:
+            result = token
+        elif token[0] == "$":
+            continue
+        else:
+            moves.append(token)
+    return moves, result
+
+
+def read_games(source):
+    """
+    This generator streams the games out of a PGN file, one game at a time.
+    Only a single game is held in memory, so files of any size can be read.
+    ------------------------------------
+    :param source: file path, or an open text file object.
+    :return: yields PGNGame() objects.
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8", errors="replace") as file:
+            yield from read_games(file)
+        return
+
+    headers = {}
+    movetext = []
+    open_comment = False
+
+    for line in source:
+        stripped = line.strip()
+
+        # A tag pair line after some movetext starts the next game. Lines inside
+        #   a comment which spans several lines are always movetext.
+        if stripped.startswith("[") and not open_comment:
+            if movetext:
+                moves, result = tokenize_movetext("".join(movetext))
+                yield PGNGame(headers, moves, headers.get("Result", result) if result == "*" else result)
+                headers = {}
+                movetext = []
+            match = header_pattern.match(stripped)
+            if match is not None:
+                headers[match.group(1)] = match.group(2).replace('\\"', '"')
+        elif stripped or movetext:
+            movetext.append(line if line.endswith("\n") else line + "\n")
+            for char in line:
+                if char == "{":
+                    open_comment = True
+                elif char == "}":
+                    open_comment = False
+
+    if movetext or headers:
+        moves, result = tokenize_movetext("".join(movetext))
+        yield PGNGame(headers, moves, headers.get("Result", result) if result == "*" else result)
+
+
+def replay_game(game, board=None):
+    """
+    This function replays a game's moves on a Board().
+    ------------------------------------
+    :param game: a PGNGame() object.
+    :param board: optional Board() at the starting position. A new one is
+        created if not given, set up from the game's FEN tag if it has one.
+    :return: (board, array('H') of move codes)
+    :raises PGNError: if one of the moves is not legal.
+    """
+    if board is None:
+        try:
+            board = new_board(game.get_headers().get("FEN"))
+        except ValueError as error:
+            raise PGNError(str(error))
+
+    codes = array("H")
+    for san in game.get_moves():
+        codes.append(play_san(board, san))
+    return board, codes
+
+
+def replay_games(source, skip_errors=True):
+    """
+    This generator replays every game of a PGN file.
+    :param source: file path or open text file object.
+    :param skip_errors: if True, games with an illegal or unreadable move are
+        skipped instead of raising PGNError.
+    :return: yields (PGNGame(), board, move codes)
+    """
+    for game in read_games(source):
+        try:
+            board, codes = replay_game(game)
+        except PGNError:
+            if skip_errors is True:
+                continue
+            raise
+        yield game, board, codes
+
+
+def codes_to_san(codes, board=None):
+    """
+    This function converts a list of move codes into SAN, conducting each move
+    on the board as it goes.
+    :param codes: iterable of move codes.
+    :param board: optional Board() at the starting position.
+    :return: list of SAN strings (including check suffixes)
+    """
+    if board is None:
+        board = new_board()
+
+    moves = []
+    for code in codes:
+        san = move_to_san(board, code)
+        start, end, flags = decode_move(code)
+        if board.make_move(start, end, promotion=get_promotion_letter(flags) or "Q") is not True:
+            raise PGNError("Illegal move: " + san)
+        moves.append(san + get_check_suffix(board))
+    return moves
+
+
+def get_chess_game_result(game):
+    """This function returns the PGN result for a ChessGame() session."""
+    result = game.get_game_result()
+    if result == "checkmate":
+        return "1-0" if game.get_player_turn() == "B" else "0-1"
+    elif result is not None:
+        return "1/2-1/2"
+    return "*"
+
+
+class PGNWriter:
+    """
+    Class PGNWriter writes games to a PGN file. The file is written through a
+    large buffer, so writing many games does not write to disk once per game.
+    """
+    def __init__(self, target, append=True, buffer_size=1 << 16):
+        """
+        Constructor method for class PGNWriter.
+        ------------------------------------
+        :param target: file path, or an open text file object.
+        :param append: if True, games are added to the end of an existing file.
+        :param buffer_size: size of the write buffer in bytes.
+        """
+        if isinstance(target, str):
+            self._file = open(target, "a" if append else "w", encoding="utf-8", buffering=buffer_size)
+            self._owns_file = True
+        else:
+            self._file = target
+            self._owns_file = False
+        self._games_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_games_written(self):
+        """This class method returns the number of games written so far."""
+        return self._games_written
+
+    def write_game(self, headers, moves, result="*"):
+        """
+        This class method writes a single game.
+        ------------------------------------
+        :param headers: dictionary of tag pairs.
+        :param moves: list of SAN strings. A move may be followed by a comment,
+            given as a (san, comment) tuple.
+        :param result: the game result.
+        :return: None
+        """
+        tags = dict(default_tags)
+        tags.update(headers)
+        tags["Result"] = result
+
+        lines = []
+        for name in tag_roster:
+            lines.append('[%s "%s"]' % (name, str(tags[name]).replace('"', '\\"')))
+        for name in tags:
+            if name not in tag_roster:
+                lines.append('[%s "%s"]' % (name, str(tags[name]).replace('"', '\\"')))
+        lines.append("")
+
+        # A game set up from a FEN string is numbered from the FEN's full move
+        #   number, and if black moves first its first move is written "12...".
+        first_number, black_first = 1, False
+        if "FEN" in tags:
+            fields = str(tags["FEN"]).split()
+            black_first = len(fields) > 1 and fields[1] == "b"
+            if len(fields) > 5 and fields[5].isdigit():
+                first_number = int(fields[5])
+
+        # Movetext lines are wrapped so they stay under 80 characters.
+        tokens = []
+        for ply in range(len(moves)):
+            move = moves[ply]
+            comment = None
+            if isinstance(move, tuple):
+                move, comment = move
+            half = ply + 1 if black_first else ply
+            if half % 2 == 0:
+                tokens.append(str(first_number + half // 2) + ".")
+            elif ply == 0:
+                tokens.append(str(first_number + half // 2) + "...")
+            tokens.append(move)
+            if comment:
+                tokens.extend(("{" + comment.replace("}", ")") + "}").split(" "))
+        tokens.append(result)
+
+        line = ""
+        for token in tokens:
+            if line and len(line) + 1 + len(token) > line_length:
+                lines.append(line)
+                line = token
+            else:
+                line = line + " " + token if line else token
+        lines.append(line)
+
+        self._file.write("\n".join(lines) + "\n\n")
+        self._games_written += 1
+
+    def write_codes(self, headers, codes, result="*", fen=None):
+        """
+        This class method writes a game given as a list of move codes.
+        :param headers: dictionary of tag pairs.
+        :param codes: the move codes.
+        :param result: the game result.
+        :param fen: optional FEN string of the position the game started from.
+            Unless it is the usual starting position, the SetUp and FEN tags
+            are written for it.
+        :return: None
+        """
+        if fen is not None and fen != start_fen:
+            headers = dict(headers)
+            headers["SetUp"] = "1"
+            headers["FEN"] = fen
+        self.write_game(headers, codes_to_san(codes, new_board(fen)), result)
+
+    def write_chess_game(self, game, headers=None):
+        """
+        This class method writes the moves recorded by a ChessGame() session,
+        from the position the game was started from.
+        :param game: ChessGame() object.
+        :param headers: optional dictionary of tag pairs.
+        :return: None
+        """
+        self.write_codes(headers or {}, game.get_moves(), get_chess_game_result(game), game.get_start_fen())
+
+    def flush(self):
+        """This class method flushes the write buffer."""
+        self._file.flush()
+
+    def close(self):
+        """This class method flushes the buffer and closes the file (if the writer
+        opened it)."""
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+def benchmark(source, limit=None):
+    """
+    This function replays the games of a PGN file and measures throughput.
+    ------------------------------------
+    :param source: file path of the PGN file.
+    :param limit: optional maximum number of games to replay.
+    :return: dictionary with games, errors, plies, seconds, games_per_sec
+        and plies_per_sec.
+    """
+    games = errors = plies = 0
+    start_time = time.perf_counter()
+
+    for game in read_games(source):
+        if limit is not None and games + errors >= limit:
+            break
+        try:
+            board, codes = replay_game(game)
+        except PGNError:
+            errors += 1
+            continue
+        games += 1
+        plies += len(codes)
+
+    seconds = time.perf_counter() - start_time
+    return {
+        "games": games,
+        "errors": errors,
+        "plies": plies,
+        "seconds": seconds,
+        "games_per_sec": games / seconds if seconds else 0.0,
+        "plies_per_sec": plies / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the games of a PGN file and report throughput.")
+    parser.add_argument("pgn", help="PGN file to replay")
+    parser.add_argument("--limit", type=int, default=None, help="maximum number of games")
+    args = parser.parse_args(argv)
+
+    stats = benchmark(args.pgn, args.limit)
+    print("games: %d (%d skipped)" % (stats["games"], stats["errors"]))
+    print("plies: %d" % stats["plies"])
+    print("time: %.2f s" % stats["seconds"])
+    print("games/sec: %.2f" % stats["games_per_sec"])
+    print("plies/sec: %.1f" % stats["plies_per_sec"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Position database for Chess by Chris. Every position reached in the
+#   imported games (PGN files and binary move logs) is stored in an SQLite file,
+#   so questions like "which of our games reached this position" or "what was
+#   played here, and how did it go" are answered straight from an index instead
+#   of replaying the archive.
+#
+#   Tables:
+#       games      one row per game: source file, number in the file, players,
+#                  result and length.
+#       positions  one row per position of a game: position hash, material
+#                  signature, game and ply. Its primary key starts with the hash,
+#                  so the rows of a position are stored side by side, and a
+#                  second index on the material signature finds every position
+#                  with a given set of pieces (i.e. all the KRPvKR endings).
+#       moves      one row per (position hash, move): how often the move was
+#                  played and the results of those games.
+#
+#   Hashes are the Board()'s Zobrist hashes (stored as signed 64-bit integers,
+#   the size of an SQLite integer). Games are imported in batches, each batch in
+#   one transaction, and a file which was imported before is carried on from the
+#   first game not yet in the database.
+#
+#   Usage:
+#       python posdb.py import positions.db games.pgn moves.bin [--batch 500]
+#       python posdb.py query positions.db [--fen FEN] [--material KRPvKR] [--limit 20]
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pgn
+from main import start_fen
+from annotate import read_directory, get_result_string
+from tablebase import make_signature
+from movelog import decode_move, get_promotion_letter, FLAG_EN_PASSANT
+from engine import move_to_coordinates
+
+# Games imported per transaction.
+default_batch_games = 500
+
+# Material keys hold 4 bits per piece count: the white Queens, Rooks, Bishops,
+#   Knights and Pawns in bits 0-19, and the black ones in bits 20-39. (Both
+#   sides always have one King, which is left out.)
+material_letters = ("Q", "R", "B", "N", "")
+material_shifts = {(color, letter): (index + (5 if color == "B" else 0)) * 4
+                   for color in ("W", "B") for index, letter in enumerate(material_letters)}
+
+schema = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    white TEXT,
+    black TEXT,
+    result TEXT,
+    plies INTEGER,
+    UNIQUE (source, number)
+);
+CREATE TABLE IF NOT EXISTS positions (
+    hash INTEGER NOT NULL,
+    material INTEGER NOT NULL,
+    game INTEGER NOT NULL,
+    ply INTEGER NOT NULL,
+    PRIMARY KEY (hash, game, ply)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS positions_material ON positions (material);
+CREATE TABLE IF NOT EXISTS moves (
+    hash INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    white_wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    black_wins INTEGER NOT NULL,
+    PRIMARY KEY (hash, move)
+) WITHOUT ROWID;
+"""
+
+
+def to_signed(position_hash):
+    """This function returns a 64-bit hash as a signed integer, which is how
+    SQLite stores it."""
+    return position_hash - (1 << 64) if position_hash >= 1 << 63 else position_hash
+
+
+def get_material_key(board):
+    """This function returns the material key (see material_shifts) of the
+    board's position."""
+    key = 0
+    for row in board.get_board():
+        for square in row:
+            piece = square.get_occupant()
+            if piece is not None and piece.get_letter() != "K":
+                key += 1 << material_shifts[(piece.get_color(), piece.get_letter())]
+    return key
+
+
+def get_material_change(board, code):
+    """This function returns how much a move changes the material key (the piece
+    it captures, and the Pawn it promotes). It must be called before the move
+    is made."""
+    start, end, flags = decode_move(code)
+    grid = board.get_board()
+    mover = grid[start[0]][start[1]].get_occupant()
+    change = 0
+    if flags == FLAG_EN_PASSANT:
+        victim = grid[start[0]][end[1]].get_occupant()
+    else:
+        victim = grid[end[0]][end[1]].get_occupant()
+    if victim is not None:
+        change -= 1 << material_shifts[(victim.get_color(), victim.get_letter())]
+    promotion = get_promotion_letter(flags)
+    if promotion is not None:
+        change += (1 << material_shifts[(mover.get_color(), promotion)]) - \
+            (1 << material_shifts[(mover.get_color(), "")])
+    return change
+
+
+def material_to_signature(key):
+    """This function returns the signature of a material key, i.e. "KRPvKR"."""
+    sides = []
+    for color in ("W", "B"):
+        letters = "K"
+        for letter in material_letters:
+            letters += (letter or "P") * (key >> material_shifts[(color, letter)] & 15)
+        sides.append(letters)
+    return make_signature(sides[0], sides[1])
+
+
+def signature_to_material(signature):
+    """This function returns the material key of a signature, i.e. "KRPvKR"."""
+    sides = signature.upper().split("V")
+    if len(sides) != 2:
+        raise ValueError("Invalid signature: " + signature)
+    key = 0
+    for color, letters in zip(("W", "B"), sides):
+        for letter in letters:
+            if letter == "K":
+                continue
+            if letter not in "QRBNP":
+                raise ValueError("Invalid signature: " + signature)
+            key += 1 << material_shifts[(color, "" if letter == "P" else letter)]
+    return key
+
+
+def expand_sources(paths):
+    """This function returns the game files of a list of files and directories."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if os.path.isfile(os.path.join(path, name)))
+        else:
+            files.append(path)
+    return files
+
+
+class PositionDatabase:
+    """
+    Class PositionDatabase represents an SQLite position database file.
+    ----------------------------------
+    The connection is opened in WAL mode, so queries can run while games are
+    being imported by another process.
+    """
+    def __init__(self, path):
+        """
+        Constructor method for class PositionDatabase.
+        :param path: path of the database file (created if it does not exist).
+        """
+        self._path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_path(self):
+        """This class method returns the path of the database file."""
+        return self._path
+
+    def get_game_count(self):
+        """This class method returns the number of games in the database."""
+        return self._connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def get_position_count(self):
+        """This class method returns the number of stored positions (one for every
+        ply of every game)."""
+        return self._connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def import_games(self, paths, batch_games=default_batch_games, callback=None):
+        """
+        ------------------------------------
+        This class method imports the games of PGN files and binary move logs.
+        The rows of a batch of games are collected in memory (the move counts
+        added up per position), sorted by hash so the B-tree pages are written
+        in order, and written in one transaction. Games already in the
+        database (by source file and number) are skipped, so an interrupted
+        import carries on where it stopped.
+        ------------------------------------
+        :param paths: list of files and/or directories of game files.
+        :param batch_games: games per transaction.
+        :param callback: optional function called as callback(games imported)
+            after each batch.
+        :return: dictionary with games, skipped, positions, seconds and
+            positions_per_sec.
+        """
+        start_time = time.perf_counter()
+        board = pgn.new_board()
+        imported = skipped = positions = 0
+        games, rows, moves = [], [], {}
+
+        def write_batch():
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT INTO games (id, source, number, white, black, result, plies) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", games)
+                rows.sort()
+                self._connection.executemany(
+                    "INSERT INTO positions (hash, game, ply, material) VALUES (?, ?, ?, ?)", rows)
+                self._connection.executemany(
+                    "INSERT INTO moves (hash, move, count, white_wins, draws, black_wins) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (hash, move) DO UPDATE SET "
+                    "count = count + excluded.count, white_wins = white_wins + excluded.white_wins, "
+                    "draws = draws + excluded.draws, black_wins = black_wins + excluded.black_wins",
+                    sorted(key + tuple(counts) for key, counts in moves.items()))
+            games.clear()
+            rows.clear()
+            moves.clear()
+
+        next_id = (self._connection.execute("SELECT MAX(id) FROM games").fetchone()[0] or 0) + 1
+        for path in expand_sources(paths):
+            source = os.path.abspath(path)
+            done = self._connection.execute("SELECT MAX(number) FROM games WHERE source = ?",
+                                            (source,)).fetchone()[0]
+            done = -1 if done is None else done
+            for number, (headers, fen, game_moves, result) in enumerate(read_directory(path)):
+                if number <= done:
+                    continue
+                game_rows, game_moves_played = [], []
+                try:
+                    board.set_fen(fen or start_fen)
+                    material = get_material_key(board)
+                    for ply, move in enumerate(game_moves):
+                        position_hash = to_signed(board.get_hash())
+                        game_rows.append((position_hash, next_id, ply, material))
+                        if isinstance(move, str):
+                            change = None
+                            code = pgn.play_san(board, move)
+                        else:
+                            code = move
+                            change = get_material_change(board, code)
+                            if board.make_encoded_move(code) is not True:
+                                raise ValueError("Illegal move: %d" % code)
+                        # A SAN move is only decoded by playing it, so the material
+                        #   of a capture or promotion is counted from the board.
+                        if change is not None:
+                            material += change
+                        elif "x" in move or "=" in move:
+                            material = get_material_key(board)
+                        game_moves_played.append((position_hash, code))
+                    game_rows.append((to_signed(board.get_hash()), next_id, len(game_moves), material))
+                except ValueError:
+                    skipped += 1
+                    continue
+
+                reached = get_result_string(board)
+                result = reached if reached != "*" else result or "*"
+                outcome = [1, 1 if result == "1-0" else 0, 1 if result == "1/2-1/2" else 0,
+                           1 if result == "0-1" else 0]
+                for key in game_moves_played:
+                    counts = moves.get(key)
+                    if counts is None:
+                        moves[key] = list(outcome)
+                    else:
+                        for index in range(4):
+                            counts[index] += outcome[index]
+                games.append((next_id, source, number, headers.get("White"), headers.get("Black"), result,
+                              len(game_moves)))
+                rows.extend(game_rows)
+                positions += len(game_rows)
+                imported += 1
+                next_id += 1
+                if len(games) >= batch_games:
+                    write_batch()
+                    if callback is not None:
+                        callback(imported)
+        if games:
+            write_batch()
+        self._connection.execute("ANALYZE")
+
+        seconds = time.perf_counter() - start_time
+        return {
+            "games": imported,
+            "skipped": skipped,
+            "positions": positions,
+            "seconds": seconds,
+            "positions_per_sec": positions / seconds if seconds else 0.0,
+        }
+
+    def get_games(self, position_hash, limit=100):
+        """
+        This class method returns the games which reached a position.
+        :param position_hash: the position's hash (Board().get_hash()).
+        :param limit: most games returned.
+        :return: list of (game id, ply, white, black, result, source) tuples.
+        """
+        return self._connection.execute(
+            "SELECT games.id, positions.ply, white, black, result, source FROM positions "
+            "JOIN games ON games.id = positions.game WHERE positions.hash = ? "
+            "ORDER BY games.id, positions.ply LIMIT ?", (to_signed(position_hash), limit)).fetchall()
+
+    def get_move_stats(self, position_hash):
+        """
+        This class method returns the moves played from a position.
+        :param position_hash: the position's hash (Board().get_hash()).
+        :return: list of (move code, count, white wins, draws, black wins)
+            tuples, the most played move first.
+        """
+        return self._connection.execute(
+            "SELECT move, count, white_wins, draws, black_wins FROM moves WHERE hash = ? "
+            "ORDER BY count DESC, move", (to_signed(position_hash),)).fetchall()
+
+    def get_material_games(self, signature, limit=100):
+        """
+        This class method returns the games which reached a material signature.
+        :param signature: i.e. "KRPvKR" (white's pieces first).
+        :param limit: most games returned.
+        :return: list of (game id, first ply with the material, white, black,
+            result, source) tuples.
+        """
+        return self._connection.execute(
+            "SELECT games.id, MIN(positions.ply), white, black, result, source FROM positions "
+            "JOIN games ON games.id = positions.game WHERE positions.material = ? "
+            "GROUP BY games.id ORDER BY games.id LIMIT ?", (signature_to_material(signature), limit)).fetchall()
+
+    def close(self):
+        """This class method closes the database connection."""
+        self._connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a database of the positions of recorded games.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("import", help="import games into the database")
+    load.add_argument("database", help="database file")
+    load.add_argument("sources", nargs="+", help="PGN files (.pgn), binary move logs, or directories of them")
+    load.add_argument("--batch", type=int, default=default_batch_games, help="games per transaction")
+    query = commands.add_parser("query", help="look up a position or material signature")
+    query.add_argument("database", help="database file")
+    query.add_argument("--fen", default=None, help="position (the starting position by default)")
+    query.add_argument("--material", default=None, help="material signature, i.e. KRPvKR")
+    query.add_argument("--limit", type=int, default=20, help="most games listed")
+    args = parser.parse_args(argv)
+
+    with PositionDatabase(args.database) as database:
+        if args.command == "import":
+            stats = database.import_games(args.sources, args.batch,
+                                          callback=lambda games: print("%d games imported" % games))
+            print("games: %d (%d skipped)  positions: %d  time: %.2f s (%.0f positions/sec)" % (
+                stats["games"], stats["skipped"], stats["positions"], stats["seconds"],
+                stats["positions_per_sec"]))
+            return
+
+        start_time = time.perf_counter()
+        if args.material is not None:
+            games = database.get_material_games(args.material, args.limit)
+            stats = []
+        else:
+            board = pgn.new_board(args.fen)
+            games = database.get_games(board.get_hash(), args.limit)
+            stats = database.get_move_stats(board.get_hash())
+        seconds = time.perf_counter() - start_time
+
+        for code, count, white_wins, draws, black_wins in stats:
+            print("%-6s %6d games  +%d =%d -%d" % (move_to_coordinates(code), count, white_wins, draws,
+                                                   black_wins))
+        for game, ply, white, black, result, source in games:
+            print("game %d ply %d: %s - %s %s (%s)" % (game, ply, white or "?", black or "?", result,
+                                                      os.path.basename(source)))
+        if not games:
+            print("no games found")
+        print("query time: %.2f ms" % (seconds * 1000))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,549 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Mate puzzle solver for Chess by Chris. Given a position and a number
+#   of moves N, it proves (or disproves) that the player to move can force mate in
+#   N moves, and returns the whole forced line.
+#
+#   The solver uses depth-first proof-number search (df-pn) instead of the
+#   engine's alpha-beta search. Every position has a proof number (how many more
+#   positions at least would have to be shown to be mate to prove the mate) and a
+#   disproof number (the same for showing the defender escapes). The search always
+#   goes into the position which is cheapest to settle, so it spends its time on
+#   the forcing lines (checks, and replies to them) rather than searching every
+#   move to the same depth. The numbers are kept in a table by position hash,
+#   moves left and attacker, which is bounded: when it is full the entries which
+#   took the least work to find are dropped.
+#
+#   Puzzles are given one per line as a FEN (the move counters may be left out)
+#   followed by the number of moves, EPD style, i.e.
+#       r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - dm 1;
+#   A batch of puzzles is shared out between worker processes.
+#
+#   Usage:
+#       python puzzles.py puzzles.epd [--output results.jsonl] [--workers 4]
+#       python puzzles.py --fen FEN --moves 2 [--nodes 200000] [--line-nodes 200000] [--memory 64]
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import Board, start_fen
+from engine import in_check, move_to_coordinates
+
+# Stands for an infinite proof or disproof number.
+infinity = 1 << 40
+
+# Default search limits: positions expanded per puzzle, and table memory in MB.
+default_node_limit = 200000
+default_memory = 64
+
+# Rough size of a table entry (the key tuple, the entry list and the dictionary
+#   slot), used to turn the memory limit into a number of entries.
+entry_bytes = 200
+
+# The MateSolver() and Board() of a worker process (see init_worker()).
+_worker_solver = None
+_worker_board = None
+
+
+class MateSolver:
+    """
+    Class MateSolver represents a df-pn mate search and its table.
+    ----------------------------------
+    The numbers of a position are kept as (phi, delta) from the side of the
+    player to move: at the attacker's moves phi is the proof number and delta
+    the disproof number, at the defender's moves the other way around. Then the
+    same code handles both kinds of positions, a position's phi being the
+    smallest delta of its moves, and its delta the sum of their phis.
+    """
+    def __init__(self, node_limit=default_node_limit, memory=default_memory, line_node_limit=None):
+        """
+        Constructor method for class MateSolver.
+        :param node_limit: most positions expanded per solve() to prove or disprove
+            the mate (None for no limit).
+        :param memory: table memory limit in MB (roughly, see entry_bytes).
+        :param line_node_limit: most positions searched again per solve() while
+            working out the line of a proven mate (node_limit by default).
+        """
+        self._node_limit = node_limit
+        self._line_node_limit = node_limit if line_node_limit is None else line_node_limit
+        self._limit = node_limit
+        self._max_entries = max(int(memory * (1 << 20) / entry_bytes), 1024)
+        self._table = {}
+        self._nodes = 0
+        self._stopped = False
+        self._board = None
+        self._attacker = None
+
+    def get_nodes(self):
+        """This class method returns the number of positions expanded by the last
+        search (the last solve()'s line, if it had one)."""
+        return self._nodes
+
+    def get_table_size(self):
+        """This class method returns the number of entries in the table."""
+        return len(self._table)
+
+    def get_max_entries(self):
+        """This class method returns the largest number of table entries."""
+        return self._max_entries
+
+    def clear(self):
+        """This class method empties the table."""
+        self._table = {}
+
+    def store(self, key, phi, delta, work):
+        """This class method saves the numbers of a position. If the table is full,
+        the half of the entries which took the least work are dropped first."""
+        if key not in self._table and len(self._table) >= self._max_entries:
+            works = sorted(entry[2] for entry in self._table.values())
+            limit = works[len(works) // 2]
+            self._table = {each: entry for each, entry in self._table.items() if entry[2] > limit}
+        self._table[key] = [phi, delta, work]
+
+    def expand(self, ply, left, attacker):
+        """
+        ------------------------------------
+        This class method lists the legal moves of the board's position, each
+        with the table key of the position it leads to and that position's
+        numbers if they are known, else a first guess. Moves the attacker makes
+        which do not give check are guessed to be harder to prove, and if they
+        are the attacker's last move they cannot mate at all.
+        ------------------------------------
+        :param ply: plies from the root (for the board's move buffers).
+        :param left: attacker moves left in the position.
+        :param attacker: True if the attacker is to move.
+        :return: list of [move code, key, phi, delta] lists.
+        """
+        board = self._board
+        buffer, count = board.generate_moves(board.get_active_p(), ply)
+        children = []
+        for index in range(count):
+            code = buffer[index]
+            if board.make_encoded_move(code, simulation=True) is not True:
+                continue
+            child_left = left - 1 if attacker else left
+            key = (board.get_hash(), child_left, self._attacker)
+            entry = self._table.get(key)
+            if entry is not None:
+                children.append([code, key, entry[0], entry[1]])
+            elif attacker and not in_check(board, board.get_active_p()):
+                # The defender is to move in the child (its delta is the proof
+                #   number). A quiet last move never mates.
+                children.append([code, key, 0, infinity] if child_left == 0 else [code, key, 1, 2])
+            else:
+                children.append([code, key, 1, 1])
+            board.undo_move()
+        return children
+
+    def search(self, key, ply, left, attacker, phi_limit, delta_limit):
+        """
+        ------------------------------------
+        This class method is the recursive part of the df-pn search. The moves
+        are searched until the position's phi or delta reaches its limit, each
+        time going into the move with the smallest delta, with limits which send
+        the search back up as soon as another move (or another part of the tree
+        higher up) becomes the better one to search.
+        ------------------------------------
+        :param key: the position's table key (hash, attacker moves left, attacker
+            color). The attacker's color is part of the key, since the same
+            position is an attacker's or a defender's depending on the puzzle.
+        :param ply: plies from the root.
+        :param left: attacker moves left.
+        :param attacker: True if the attacker is to move.
+        :param phi_limit: phi limit.
+        :param delta_limit: delta limit.
+        :return: (phi, delta) of the position.
+        """
+        board = self._board
+        self._nodes += 1
+        if self._limit is not None and self._nodes >= self._limit:
+            self._stopped = True
+        start_nodes = self._nodes
+
+        if not attacker and left == 0:
+            # The attacker has no moves left, so only a checkmate now counts.
+            color = board.get_active_p()
+            phi, delta = (infinity, 0) if in_check(board, color) and not board.has_legal_move(color) else \
+                (0, infinity)
+            self.store(key, phi, delta, 1)
+            return phi, delta
+
+        children = self.expand(ply, left, attacker)
+        if not children:
+            # Checkmate or stalemate. Only a checkmated defender is a win.
+            if not attacker and in_check(board, board.get_active_p()):
+                phi, delta = infinity, 0
+            else:
+                phi, delta = (0, infinity) if not attacker else (infinity, 0)
+            self.store(key, phi, delta, 1)
+            return phi, delta
+
+        while True:
+            phi = infinity
+            delta = 0
+            best = second = None
+            for child in children:
+                entry = self._table.get(child[1])
+                if entry is not None:
+                    child[2], child[3] = entry[0], entry[1]
+                delta = min(delta + child[2], infinity)
+                if child[3] < phi:
+                    phi = child[3]
+                if best is None or child[3] < best[3]:
+                    best, second = child, best
+                elif second is None or child[3] < second[3]:
+                    second = child
+
+            if phi >= phi_limit or delta >= delta_limit or self._stopped:
+                self.store(key, phi, delta, self._nodes - start_nodes + 1)
+                return phi, delta
+
+            second_delta = second[3] if second is not None else infinity
+            child_phi_limit = min(delta_limit - delta + best[2], infinity)
+            child_delta_limit = min(phi_limit, second_delta + 1)
+            board.make_encoded_move(best[0], simulation=True)
+            best[2], best[3] = self.search(best[1], ply + 1, left - 1 if attacker else left, not attacker,
+                                           child_phi_limit, child_delta_limit)
+            board.undo_move()
+
+    def prove(self, left, ply=0):
+        """
+        This class method searches the board's position (the attacker to move) to
+        the end: until it is proven or disproven, or the node limit is reached.
+        :param left: attacker moves left.
+        :param ply: plies from the root.
+        :return: True if mate in left moves is forced, False if it is not, None
+            if the node limit was reached first.
+        """
+        key = (self._board.get_hash(), left, self._attacker)
+        entry = self._table.get(key)
+        if entry is None or (entry[0] != 0 and entry[1] != 0):
+            self.search(key, ply, left, True, infinity, infinity)
+            entry = self._table.get(key)
+        if entry[0] == 0:
+            return True
+        if entry[1] == 0:
+            return False
+        return None
+
+    def get_mate_length(self, most, ply):
+        """This class method returns the fewest moves the attacker (to move) needs to
+        mate, up to most moves, else None. A return of False means the node limit
+        was reached."""
+        for left in range(1, most + 1):
+            proven = self.prove(left, ply)
+            if proven is None:
+                return False
+            if proven is True:
+                return left
+        return None
+
+    def get_proven_length(self, most):
+        """This class method returns the fewest moves (up to most) the table holds a
+        proven mate for, for the board's position (attacker to move), else None.
+        Nothing is searched."""
+        position_hash = self._board.get_hash()
+        for left in range(1, most + 1):
+            entry = self._table.get((position_hash, left, self._attacker))
+            if entry is not None and entry[0] == 0:
+                return left
+        return None
+
+    def choose_attack(self, left, ply):
+        """
+        ------------------------------------
+        This class method picks the attacker's move of a proven mate from the
+        table: a move whose position is proven for the defender (its proof number
+        is 0), with as few moves left as the table holds. Only if the proof's
+        entries were dropped from the table are the moves searched again.
+        ------------------------------------
+        :param left: the mate length of the board's position (attacker to move).
+        :param ply: plies from the root.
+        :return: (move code, mate length with the move), or (None, None) if the
+            line node limit was reached first.
+        """
+        board = self._board
+        buffer, count = board.generate_legal_moves(board.get_active_p(), ply)
+        codes = [buffer[index] for index in range(count)]
+        best = None
+        for code in codes:
+            board.make_encoded_move(code, simulation=True)
+            defender = board.get_active_p()
+            if in_check(board, defender) and not board.has_legal_move(defender):
+                board.undo_move()
+                return code, 1
+            position_hash = board.get_hash()
+            for length in range(2, left + 1 if best is None else best[1]):
+                entry = self._table.get((position_hash, length - 1, self._attacker))
+                if entry is not None and entry[1] == 0:
+                    best = (code, length)
+                    break
+            board.undo_move()
+        if best is not None:
+            return best
+
+        # The entries were dropped to make room: the moves are searched again,
+        #   until one is proven.
+        for code in codes:
+            board.make_encoded_move(code, simulation=True)
+            key = (board.get_hash(), left - 1, self._attacker)
+            entry = self._table.get(key)
+            if entry is None or (entry[0] != 0 and entry[1] != 0):
+                self.search(key, ply + 1, left - 1, False, infinity, infinity)
+                entry = self._table.get(key)
+            board.undo_move()
+            if entry[1] == 0:
+                return code, left
+            if self._stopped:
+                break
+        return None, None
+
+    def choose_defence(self, left, ply):
+        """
+        ------------------------------------
+        This class method picks the defender's move of a proven mate: the reply
+        which holds out longest, going by the shortest mate the table holds for
+        each reply. A reply whose entries were dropped from the table is searched
+        again, for mates in 1, 2, ... moves.
+        ------------------------------------
+        :param left: attacker moves left in the board's position (defender to move).
+        :param ply: plies from the root.
+        :return: (move code, mate length after the move), or (None, None) if the
+            line node limit was reached first.
+        """
+        board = self._board
+        buffer, count = board.generate_legal_moves(board.get_active_p(), ply)
+        best = None
+        for code in [buffer[index] for index in range(count)]:
+            board.make_encoded_move(code, simulation=True)
+            length = self.get_proven_length(left)
+            if length is None:
+                # Searched again from 1 move up, so the length is the fewest.
+                length = self.get_mate_length(left, ply + 1)
+            board.undo_move()
+            if not length:
+                return None, None
+            if best is None or length > best[1]:
+                best = (code, length)
+                if length == left:
+                    break
+        return best
+
+    def get_line(self, left, ply=0):
+        """
+        ------------------------------------
+        This class method returns the forced line of a proven mate, read from the
+        proof in the table. The attacker plays a move which mates fastest, and
+        the defender the move which holds out longest.
+        ------------------------------------
+        :param left: the mate length of the board's position (attacker to move).
+        :param ply: plies from the root.
+        :return: (list of move codes, True if the line goes all the way to the
+            mate, or False if the line node limit was reached first).
+        """
+        board = self._board
+        line = []
+        complete = False
+        while True:
+            code, length = self.choose_attack(left, ply)
+            if code is None:
+                break
+            board.make_encoded_move(code, simulation=True)
+            line.append(code)
+            if length == 1:
+                complete = True
+                break
+            code, left = self.choose_defence(length - 1, ply + 1)
+            if code is None:
+                break
+            board.make_encoded_move(code, simulation=True)
+            line.append(code)
+            ply += 2
+        for code in line:
+            board.undo_move()
+        return line, complete
+
+    def solve(self, board, moves):
+        """
+        ------------------------------------
+        This class method looks for a forced mate in the board's position. Mates
+        in 1, 2, ... moves are tried in turn, so the mate found is the
+        shortest. The table is kept between puzzles, but the node limits count
+        from the start of each one. The line of a proven mate is worked out
+        under its own node limit, so a mate is never reported as unknown because
+        of it (only its line may be cut short).
+        ------------------------------------
+        :param board: Board() object (left as it was found).
+        :param moves: most moves (of the player to move) the mate may take.
+        :return: dictionary with result ("mate", "no mate" or "unknown" if the
+            node limit was reached), moves (the mate length), line (move codes),
+            line_complete, nodes, line_nodes and seconds.
+        """
+        start_time = time.perf_counter()
+        self._board = board
+        self._attacker = board.get_active_p()
+        self._limit = self._node_limit
+        self._nodes = 0
+        self._stopped = False
+        length = self.get_mate_length(moves, 0)
+        nodes = self._nodes
+
+        line, complete = [], True
+        self._limit = self._line_node_limit
+        self._nodes = 0
+        self._stopped = False
+        if length:
+            line, complete = self.get_line(length)
+        if length is False:
+            result, length = "unknown", None
+        elif length is None:
+            result = "no mate"
+        else:
+            result = "mate"
+        return {"result": result, "moves": length, "line": line, "line_complete": complete, "nodes": nodes,
+                "line_nodes": self._nodes, "seconds": time.perf_counter() - start_time}
+
+
+def parse_puzzle(line, default_moves=None):
+    """
+    This function reads a puzzle line: a FEN (or the first 4 FEN fields), then
+    optional EPD operations, of which "dm N" gives the number of moves.
+    :param line: the puzzle line.
+    :param default_moves: moves to use if the line has no "dm" operation.
+    :return: (FEN string, number of moves). Raises ValueError if the line has
+        no number of moves.
+    """
+    fields = line.split()
+    fen = fields[:4]
+    rest = fields[4:]
+    if len(rest) >= 2 and rest[0].isdigit() and rest[1].isdigit():
+        fen += rest[:2]
+        rest = rest[2:]
+    moves = default_moves
+    for operation in " ".join(rest).split(";"):
+        parts = operation.split()
+        if len(parts) == 2 and parts[0] == "dm":
+            moves = int(parts[1])
+    if moves is None:
+        raise ValueError("No number of moves for puzzle: " + line.strip())
+    return " ".join(fen), moves
+
+
+def init_worker(node_limit, memory, line_node_limit=None):
+    """This function is run once in each worker process. It creates the Board()
+    and MateSolver() the worker solves all of its puzzles with."""
+    global _worker_solver, _worker_board
+    _worker_solver = MateSolver(node_limit, memory, line_node_limit)
+    _worker_board = Board.from_fen(start_fen)
+    _worker_board.set_verbose(False)
+
+
+def solve_puzzle(line, default_moves=None):
+    """This function solves one puzzle line in a worker process, and returns its
+    answer (see MateSolver().solve()) with the FEN string and the line in
+    coordinate notation, or an error."""
+    try:
+        fen, moves = parse_puzzle(line, default_moves)
+        _worker_board.set_fen(fen)
+    except ValueError as error:
+        return {"puzzle": line.strip(), "error": str(error)}
+    answer = _worker_solver.solve(_worker_board, moves)
+    answer["fen"] = fen
+    answer["line"] = [move_to_coordinates(code) for code in answer["line"]]
+    return answer
+
+
+def solve_batch(lines, workers=None, node_limit=default_node_limit, memory=default_memory, default_moves=None,
+                callback=None, line_node_limit=None):
+    """
+    ------------------------------------
+    This function solves a batch of puzzle lines in a pool of worker processes
+    (one puzzle at a time per worker, as puzzles take very different times).
+    ------------------------------------
+    :param lines: list of puzzle lines.
+    :param workers: number of worker processes (default: one per CPU core).
+    :param node_limit: most positions expanded per puzzle.
+    :param memory: table memory limit per worker in MB.
+    :param default_moves: moves for lines without a "dm" operation.
+    :param callback: optional function called with each answer, in order.
+    :param line_node_limit: most positions searched again per puzzle for the
+        line of a proven mate (node_limit by default).
+    :return: dictionary with puzzles, solved, unknown, seconds and
+        puzzles_per_sec.
+    """
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    counts = {"mate": 0, "no mate": 0, "unknown": 0, "error": 0}
+
+    def handle(answer):
+        counts[answer.get("result", "error")] += 1
+        if callback is not None:
+            callback(answer)
+
+    if workers == 1:
+        init_worker(node_limit, memory, line_node_limit)
+        for line in lines:
+            handle(solve_puzzle(line, default_moves))
+    else:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(node_limit, memory, line_node_limit)) as pool:
+            for answer in pool.map(solve_puzzle, lines, [default_moves] * len(lines)):
+                handle(answer)
+
+    seconds = time.perf_counter() - start_time
+    return {
+        "puzzles": len(lines),
+        "solved": counts["mate"],
+        "no_mate": counts["no mate"],
+        "unknown": counts["unknown"],
+        "errors": counts["error"],
+        "seconds": seconds,
+        "puzzles_per_sec": len(lines) / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve mate-in-N puzzles with proof-number search.")
+    parser.add_argument("puzzles", nargs="?", help="file of puzzles, one per line (FEN; dm N)")
+    parser.add_argument("--fen", default=None, help="solve a single position")
+    parser.add_argument("--moves", type=int, default=None, help="mate length for puzzles without dm")
+    parser.add_argument("--output", default=None, help="file the answers are written to (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--nodes", type=int, default=default_node_limit, help="node limit per puzzle")
+    parser.add_argument("--line-nodes", type=int, default=None,
+                        help="node limit per puzzle for the line of a proven mate (default: --nodes)")
+    parser.add_argument("--memory", type=float, default=default_memory, help="table memory per worker (MB)")
+    args = parser.parse_args(argv)
+
+    if args.fen is not None:
+        lines, workers = [args.fen], 1
+    elif args.puzzles is not None:
+        with open(args.puzzles) as file:
+            lines = [line for line in file if line.strip() and not line.startswith("#")]
+        workers = args.workers
+    else:
+        parser.error("a puzzle file (or --fen) is needed")
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        stats = solve_batch(lines, workers, args.nodes, args.memory, args.moves,
+                            callback=lambda answer: output.write(json.dumps(answer) + "\n"),
+                            line_node_limit=args.line_nodes)
+    finally:
+        if args.output:
+            output.close()
+    print("puzzles: %d  mate: %d  no mate: %d  unknown: %d  errors: %d  time: %.2f s (%.1f puzzles/sec)" % (
+        stats["puzzles"], stats["solved"], stats["no_mate"], stats["unknown"], stats["errors"], stats["seconds"],
+        stats["puzzles_per_sec"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
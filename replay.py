@@ -0,0 +1,175 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Seekable replay of recorded games for Chess by Chris. A GameReplay
+#   keeps the game's move codes along with a snapshot of the board every few
+#   plies (a keyframe), so jumping to any ply restores the nearest keyframe and
+#   only conducts the few moves after it, instead of replaying the whole game.
+#
+#   Usage (reports the slowest seek for each game of a PGN file):
+#       python replay.py games.pgn [--interval K]
+
+import sys
+import time
+import random
+import argparse
+from array import array
+
+from main import Board
+from movelog import decode_move, get_promotion_letter
+
+default_interval = 4
+
+# A viewer redrawing at 60 frames per second has about 16.7 ms per frame.
+frame_budget = 1.0 / 60
+
+
+class GameReplay:
+    """
+    Class GameReplay represents a recorded game which can be stepped through or
+    jumped around in, ply by ply.
+    ----------------------------------
+    A keyframe (a BoardSnapshot() of the position) is stored every keyframe_interval
+    plies. Seeking to a ply restores the keyframe at or before it and conducts at
+    most keyframe_interval - 1 moves. Stepping forward by one ply conducts a
+    single move on the current board. The position hash of every ply is kept as
+    well, so a restored keyframe gets the positions before it back and counts
+    repetitions the same as a board which played through the whole game.
+    """
+    def __init__(self, codes, keyframe_interval=default_interval, fen=None):
+        """
+        Constructor method for class GameReplay. The game is replayed once here
+        to record the keyframes.
+        ------------------------------------
+        :param codes: iterable of move codes (see movelog.py), i.e. the MoveLog
+            of a ChessGame() or the codes returned by pgn.replay_game().
+        :param keyframe_interval: number of plies between keyframes.
+        :param fen: optional FEN string of the starting position.
+        """
+        self._codes = array("H", codes)
+        self._interval = max(int(keyframe_interval), 1)
+        self._keyframes = []
+        self._hashes = []
+        self._board = Board()
+        self._board.generate_board(fen)
+        self._board.set_verbose(False)
+
+        self._keyframes.append(self._board.snapshot())
+        self._hashes.append(self._board.get_hash())
+        for ply in range(len(self._codes)):
+            self.apply_move(self._codes[ply])
+            self._hashes.append(self._board.get_hash())
+            if (ply + 1) % self._interval == 0:
+                self._keyframes.append(self._board.snapshot())
+        self._ply = len(self._codes)
+
+    def apply_move(self, code):
+        """
+        This class method conducts a recorded move on the replay board. The move
+        was already checked when it was recorded, so it is conducted as a
+        simulation, which skips the checkmate scan.
+        :param code: the move code.
+        :return: None
+        """
+        start, end, flags = decode_move(code)
+        if self._board.make_move(start, end, simulation=True, promotion=get_promotion_letter(flags) or "Q") \
+                is not True:
+            raise ValueError("Recorded move cannot be replayed: %d" % code)
+
+    def get_board(self):
+        """This class method returns the Board() at the current ply."""
+        return self._board
+
+    def get_ply(self):
+        """This class method returns the current ply (0 is the starting position)."""
+        return self._ply
+
+    def get_length(self):
+        """This class method returns the number of plies in the game."""
+        return len(self._codes)
+
+    def get_codes(self):
+        """This class method returns the array of move codes."""
+        return self._codes
+
+    def get_keyframe_interval(self):
+        """This class method returns the number of plies between keyframes."""
+        return self._interval
+
+    def seek(self, ply):
+        """
+        ------------------------------------
+        This class method sets the board to the position after the given ply.
+        ------------------------------------
+        :param ply: the ply to jump to, from 0 to get_length(). Values outside
+            of this range are clamped.
+        :return: the Board() object.
+        """
+        ply = min(max(ply, 0), len(self._codes))
+
+        # Moving forward to a ply before the next keyframe is cheapest from the
+        #   current board. Everything else restores the nearest keyframe.
+        keyframe = ply // self._interval
+        if not (self._ply <= ply and self._ply >= keyframe * self._interval):
+            self._ply = keyframe * self._interval
+            self._board.restore_snapshot(self._keyframes[keyframe], self._hashes[:self._ply])
+
+        while self._ply < ply:
+            self.apply_move(self._codes[self._ply])
+            self._ply += 1
+        return self._board
+
+    def step_forward(self):
+        """This class method moves the board forward one ply."""
+        return self.seek(self._ply + 1)
+
+    def step_back(self):
+        """This class method moves the board back one ply."""
+        return self.seek(self._ply - 1)
+
+
+def measure_seeks(replay, seeks=200, seed=0):
+    """
+    This function measures how long seeking takes for a replay, by jumping to
+    random plies and then scrubbing back to the start one ply at a time.
+    :param replay: GameReplay() object.
+    :param seeks: number of random seeks.
+    :param seed: random seed for the plies to seek to.
+    :return: (worst seek in seconds, average seek in seconds)
+    """
+    generator = random.Random(seed)
+    targets = [generator.randint(0, replay.get_length()) for index in range(seeks)]
+    targets.extend(range(replay.get_length(), -1, -1))
+
+    worst = total = 0.0
+    for ply in targets:
+        start_time = time.perf_counter()
+        replay.seek(ply)
+        elapsed = time.perf_counter() - start_time
+        worst = max(worst, elapsed)
+        total += elapsed
+    return worst, total / len(targets)
+
+
+def main(argv=None):
+    import pgn
+
+    parser = argparse.ArgumentParser(description="Measure seek times for the games of a PGN file.")
+    parser.add_argument("pgn", help="PGN file")
+    parser.add_argument("--interval", type=int, default=default_interval, help="plies between keyframes")
+    parser.add_argument("--limit", type=int, default=None, help="maximum number of games")
+    args = parser.parse_args(argv)
+
+    count = 0
+    for game, board, codes in pgn.replay_games(args.pgn):
+        if args.limit is not None and count >= args.limit:
+            break
+        replay = GameReplay(codes, args.interval, game.get_headers().get("FEN"))
+        worst, average = measure_seeks(replay)
+        print("%4d plies  worst %.2f ms  average %.2f ms  %s" % (
+            replay.get_length(), worst * 1000, average * 1000,
+            "ok" if worst <= frame_budget else "over frame budget"))
+        count += 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,583 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Game server for Chess by Chris. A single asyncio process hosts many
+#   games at once, for players connecting over TCP or a Unix socket. Every move is
+#   checked by ChessGame()/Board() just like a move made in the pygame window.
+#
+#   To host thousands of games, only the most recently used games are kept as
+#   ChessGame() objects. Every other game is kept in a compact form: a 64-byte
+#   BoardSnapshot() plus its move codes and position hashes. Games nobody has
+#   touched for a while are written to disk and dropped from memory, and are read
+#   back in when a player returns to them.
+#
+#   Protocol: one JSON object per line in each direction, i.e.
+#       {"op": "new"}                                -> {"ok": true, "game": "1", "fen": ...}
+#       {"op": "move", "game": "1", "move": "e2e4"}  -> {"ok": true, "fen": ..., "result": null}
+#       {"op": "moves", "game": "1"}                 -> {"ok": true, "moves": ["a2a3", ...]}
+#       {"op": "state", "game": "1"}                 -> {"ok": true, "fen": ..., "moves": [...], ...}
+#       {"op": "close", "game": "1"}                 -> {"ok": true}
+#       {"op": "stats"} or {"op": "stats", "game": "1"}
+#       {"op": "watch", "game": "1"}                 -> {"ok": true}, then broadcast frames
+#       {"op": "validate", "requests": [{"fen": ..., "move": "e2e4"}, ...]}
+#                                                    -> {"ok": true, "results": [...]}
+#   Failed requests answer {"ok": false, "error": "..."}. A "watch" request turns
+#   the connection into a spectator stream (see broadcast.py): a snapshot of the
+#   position, then one small delta line per move, until the game is closed. A
+#   "validate" request checks a batch of moves which do not belong to any game
+#   (see validate.py).
+#
+#   Usage:
+#       python server.py --port 8765
+#       python server.py --unix /tmp/chess.sock
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from array import array
+from collections import OrderedDict
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import ChessGame, start_fen
+from engine import move_to_coordinates, coordinates_to_move
+from movelog import decode_move, get_promotion_letter
+from broadcast import GamePublisher
+from validate import MoveValidator
+
+# Number of games kept as ChessGame() objects (the rest are kept compact).
+default_live_games = 256
+
+# Games which have not been used for this many seconds are written to disk.
+default_idle_timeout = 300.0
+
+# How often (in seconds) the server looks for idle games.
+sweep_interval = 5.0
+
+# Number of recent request latencies kept per game for its p50/p99.
+latency_samples = 64
+
+
+def percentile(values, fraction):
+    """This function returns the value below which the fraction (0 - 1) of the
+    values fall (nearest rank)."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+class UnknownGameError(KeyError):
+    """Raised when a request names a game the server does not have."""
+
+
+class Session:
+    """
+    Class Session represents a hosted game in its compact form.
+    ----------------------------------
+    The moves are kept as 16-bit codes and the position hashes (for the
+    repetition rule) as 64-bit integers. The position itself is a BoardSnapshot()
+    which is only brought up to date when the game's ChessGame() object is
+    dropped from memory, so it may be None while the game is live.
+    """
+    __slots__ = ("_id", "_fen", "_codes", "_snapshot", "_history", "_result", "_last_active",
+                 "_requests", "_total_time", "_max_time", "_latencies")
+
+    def __init__(self, session_id, fen=None):
+        """
+        Constructor method for class Session.
+        :param session_id: the game id (a string).
+        :param fen: optional FEN string of the starting position.
+        """
+        self._id = session_id
+        self._fen = fen or start_fen
+        self._codes = array("H")
+        self._snapshot = None
+        self._history = array("Q")
+        self._result = None
+        self._last_active = time.monotonic()
+        self._requests = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+        self._latencies = array("d")
+
+    def get_id(self):
+        """This class method returns the game id."""
+        return self._id
+
+    def get_fen(self):
+        """This class method returns the FEN string of the starting position."""
+        return self._fen
+
+    def get_codes(self):
+        """This class method returns the array of move codes played so far."""
+        return self._codes
+
+    def get_snapshot(self):
+        """This class method returns the saved BoardSnapshot(), or None."""
+        return self._snapshot
+
+    def get_history(self):
+        """This class method returns the hashes of the positions before the saved
+        snapshot."""
+        return self._history
+
+    def set_position(self, snapshot, history):
+        """This class method saves the current position of the game."""
+        self._snapshot = snapshot
+        self._history = array("Q", history)
+
+    def get_result(self):
+        """This class method returns why the game ended, or None."""
+        return self._result
+
+    def set_result(self, result):
+        self._result = result
+
+    def get_last_active(self):
+        """This class method returns the time (time.monotonic()) of the last request."""
+        return self._last_active
+
+    def add_latency(self, seconds):
+        """This class method records how long a request for the game took."""
+        self._last_active = time.monotonic()
+        self._requests += 1
+        self._total_time += seconds
+        self._max_time = max(self._max_time, seconds)
+        if len(self._latencies) < latency_samples:
+            self._latencies.append(seconds)
+        else:
+            self._latencies[self._requests % latency_samples] = seconds
+
+    def get_metrics(self):
+        """This class method returns the game's request count and latencies (in
+        milliseconds) as a dictionary."""
+        return {
+            "requests": self._requests,
+            "mean_ms": self._total_time / self._requests * 1000 if self._requests else 0.0,
+            "p50_ms": percentile(self._latencies, 0.50) * 1000,
+            "p99_ms": percentile(self._latencies, 0.99) * 1000,
+            "max_ms": self._max_time * 1000,
+        }
+
+    def to_bytes(self):
+        """This class method returns the game as bytes for saving to disk: a JSON
+        header line followed by the move codes (little-endian)."""
+        header = {"id": self._id, "fen": self._fen, "result": self._result}
+        codes = array("H", self._codes)
+        if sys.byteorder == "big":
+            codes.byteswap()
+        return json.dumps(header).encode("utf-8") + b"\n" + codes.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """This class method creates a Session() from bytes written by to_bytes().
+        The position is not restored (see GameServer().load_session())."""
+        header, separator, data = data.partition(b"\n")
+        header = json.loads(header.decode("utf-8"))
+        session = cls(header["id"], header["fen"])
+        session._result = header["result"]
+        session._codes.frombytes(data)
+        if sys.byteorder == "big":
+            session._codes.byteswap()
+        return session
+
+
+class GameServer:
+    """
+    Class GameServer represents the games hosted by the server, and handles the
+    requests for them.
+    ----------------------------------
+    Every game has a Session(). Recently used games also have a ChessGame() in
+    an LRU cache of live_games entries (the same approach as class SpriteCache).
+    A game which drops out of the cache has its position saved in its Session().
+    """
+    def __init__(self, directory, live_games=default_live_games, idle_timeout=default_idle_timeout):
+        """
+        Constructor method for class GameServer.
+        ------------------------------------
+        :param directory: the directory idle games are written to.
+        :param live_games: number of games kept as ChessGame() objects.
+        :param idle_timeout: seconds after which an unused game is written to disk.
+        """
+        self._directory = directory
+        self._live_limit = live_games
+        self._idle_timeout = idle_timeout
+        self._sessions = {}
+        self._live = OrderedDict()
+        self._publishers = {}
+        self._validator = MoveValidator()
+        self._next_id = 1
+        self._evicted = 0
+        self._loaded = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get_session_count(self):
+        """This class method returns the number of games held in memory."""
+        return len(self._sessions)
+
+    def get_live_count(self):
+        """This class method returns the number of games held as ChessGame() objects."""
+        return len(self._live)
+
+    def get_publisher(self, session_id):
+        """This class method returns the GamePublisher() of a game, or None if
+        nobody has watched it."""
+        return self._publishers.get(session_id)
+
+    def get_position(self, session_id):
+        """This class method returns (ply, position hash, FEN string) of a game's
+        current position, for the snapshots sent to spectators."""
+        session = self.get_session(session_id)
+        board = self.get_game(session).get_board()
+        return len(session.get_codes()), board.get_hash(), board.to_fen()
+
+    def watch(self, session_id):
+        """
+        This class method adds a spectator to a game.
+        :param session_id: the game id.
+        :return: the spectator's Subscriber(). Raises UnknownGameError for an
+            unknown game.
+        """
+        self.get_session(session_id)
+        publisher = self._publishers.get(session_id)
+        if publisher is None:
+            publisher = GamePublisher(lambda: self.get_position(session_id))
+            self._publishers[session_id] = publisher
+        return publisher.subscribe()
+
+    def unwatch(self, session_id, subscriber):
+        """This class method removes a spectator from a game."""
+        publisher = self._publishers.get(session_id)
+        if publisher is not None:
+            publisher.unsubscribe(subscriber)
+            if publisher.get_subscriber_count() == 0:
+                del self._publishers[session_id]
+
+    def get_path(self, session_id):
+        """This class method returns the file path an idle game is written to."""
+        return os.path.join(self._directory, "%s.game" % session_id)
+
+    def new_game(self, fen=None):
+        """
+        This class method starts a new game.
+        :param fen: optional FEN string of the starting position.
+        :return: the new game id.
+        """
+        session_id = str(self._next_id)
+        while os.path.exists(self.get_path(session_id)):
+            self._next_id += 1
+            session_id = str(self._next_id)
+        self._next_id += 1
+
+        session = Session(session_id, fen)
+        game = ChessGame(fen=session.get_fen())
+        game.get_board().set_verbose(False)
+        self._sessions[session_id] = session
+        self.add_live(session, game)
+        return session_id
+
+    def get_session(self, session_id):
+        """This class method returns a game's Session(), reading it back from disk
+        if it was idle. Raises UnknownGameError for an unknown game."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self.load_session(session_id)
+        return session
+
+    def get_game(self, session):
+        """This class method returns the ChessGame() of a session, creating it from
+        the session's compact form if it is not in the cache."""
+        game = self._live.get(session.get_id())
+        if game is not None:
+            self._live.move_to_end(session.get_id())
+            return game
+
+        game = ChessGame(fen=session.get_fen())
+        game.get_board().set_verbose(False)
+        if session.get_snapshot() is not None:
+            game.set_position(session.get_snapshot(), session.get_history(), session.get_codes())
+        self.add_live(session, game)
+        return game
+
+    def add_live(self, session, game):
+        """This class method adds a ChessGame() to the cache. The least recently used
+        game is dropped if the cache is full, after saving its position."""
+        self._live[session.get_id()] = game
+        while len(self._live) > self._live_limit:
+            session_id, old_game = self._live.popitem(last=False)
+            self.save_position(self._sessions[session_id], old_game)
+
+    def save_position(self, session, game):
+        """This class method saves the position of a ChessGame() in its Session()."""
+        board = game.get_board()
+        session.set_position(board.snapshot(), board.get_hash_history()[:-1])
+
+    def load_session(self, session_id):
+        """
+        This class method reads an idle game back from disk. Its moves are
+        replayed to get back to the position.
+        :param session_id: the game id.
+        :return: the Session(). Raises UnknownGameError if there is no such game.
+        """
+        # Game ids come from clients, so only ids the server could have given out
+        #   (whole numbers) are turned into a path. Anything else, i.e. "../game",
+        #   could name a file outside the save directory.
+        if not (session_id.isascii() and session_id.isdigit()):
+            raise UnknownGameError(session_id)
+        path = self.get_path(session_id)
+        if not os.path.exists(path):
+            raise UnknownGameError(session_id)
+        with open(path, "rb") as file:
+            session = Session.from_bytes(file.read())
+
+        game = ChessGame(fen=session.get_fen())
+        game.get_board().set_verbose(False)
+        for code in session.get_codes():
+            start, end, flags = decode_move(code)
+            if game.make_move(start, end, get_promotion_letter(flags) or "Q") is not True:
+                raise UnknownGameError(session_id)
+        self._sessions[session_id] = session
+        self.add_live(session, game)
+        os.remove(path)
+        self._loaded += 1
+        return session
+
+    def evict_idle(self, now=None):
+        """
+        This class method writes the games which have not been used for
+        idle_timeout seconds to disk, and drops them from memory.
+        :param now: optional current time.monotonic().
+        :return: the number of games written to disk.
+        """
+        if now is None:
+            now = time.monotonic()
+        # Games with spectators are kept, since they are still being watched.
+        idle = [session for session in self._sessions.values()
+                if now - session.get_last_active() >= self._idle_timeout
+                and session.get_id() not in self._publishers]
+        for session in idle:
+            with open(self.get_path(session.get_id()), "wb") as file:
+                file.write(session.to_bytes())
+            self._live.pop(session.get_id(), None)
+            del self._sessions[session.get_id()]
+        self._evicted += len(idle)
+        return len(idle)
+
+    def close_game(self, session_id):
+        """This class method ends a game and removes it from memory and disk."""
+        self.get_session(session_id)
+        self._live.pop(session_id, None)
+        del self._sessions[session_id]
+        publisher = self._publishers.pop(session_id, None)
+        if publisher is not None:
+            publisher.close()
+
+    def handle(self, request):
+        """
+        ------------------------------------
+        This class method handles a single request (see the protocol at the top
+        of this file). Requests for a game are timed for the game's metrics.
+        ------------------------------------
+        :param request: dictionary decoded from the request line.
+        :return: the response dictionary.
+        """
+        start_time = time.perf_counter()
+        op = request.get("op")
+        try:
+            if op == "new":
+                session_id = self.new_game(request.get("fen"))
+                session = self._sessions[session_id]
+                response = {"ok": True, "game": session_id,
+                            "fen": self.get_game(session).get_board().to_fen()}
+            elif op == "stats" and "game" not in request:
+                return {"ok": True, "games": len(self._sessions), "live": len(self._live),
+                        "evicted": self._evicted, "loaded": self._loaded,
+                        "validated": self._validator.get_requests(),
+                        "validated_per_sec": self._validator.get_requests_per_sec()}
+            elif op == "validate":
+                requests = request.get("requests")
+                if not isinstance(requests, list):
+                    return {"ok": False, "error": "validate needs a list of requests"}
+                return {"ok": True, "results": self._validator.validate(requests)}
+            elif op in ("move", "moves", "state", "stats", "close"):
+                session = self.get_session(str(request.get("game")))
+                response = getattr(self, "handle_" + op)(session, request)
+            else:
+                return {"ok": False, "error": "unknown op: %s" % op}
+        except UnknownGameError:
+            return {"ok": False, "error": "unknown game: %s" % request.get("game")}
+        except ValueError as error:
+            response = {"ok": False, "error": str(error)}
+            session = self._sessions.get(str(request.get("game")))
+            if session is None:
+                return response
+
+        session.add_latency(time.perf_counter() - start_time)
+        return response
+
+    def handle_move(self, session, request):
+        """This class method conducts a move ({"move": "e2e4"}) in a game."""
+        if session.get_result() is not None:
+            raise ValueError("game is over: " + session.get_result())
+        game = self.get_game(session)
+        board = game.get_board()
+        code = coordinates_to_move(board, str(request.get("move", "")))
+        start, end, flags = decode_move(code)
+        if game.make_move(start, end, get_promotion_letter(flags) or "Q") is not True:
+            raise ValueError("illegal move: %s" % request.get("move"))
+        session.get_codes().append(code)
+        session.set_result(game.get_game_result())
+
+        # Spectators are sent the move once as a delta, not the whole board.
+        publisher = self._publishers.get(session.get_id())
+        if publisher is not None:
+            publisher.publish(len(session.get_codes()), code, board.get_hash())
+        return {"ok": True, "fen": board.to_fen(), "result": session.get_result()}
+
+    def handle_moves(self, session, request):
+        """This class method returns the legal moves of a game's player to move."""
+        board = self.get_game(session).get_board()
+        buffer, count = board.generate_legal_moves(board.get_active_p())
+        return {"ok": True, "moves": [move_to_coordinates(buffer[index]) for index in range(count)]}
+
+    def handle_state(self, session, request):
+        """This class method returns a game's position, moves and result."""
+        board = self.get_game(session).get_board()
+        return {"ok": True, "fen": board.to_fen(), "result": session.get_result(),
+                "moves": [move_to_coordinates(code) for code in session.get_codes()]}
+
+    def handle_stats(self, session, request):
+        """This class method returns a game's latency metrics."""
+        response = {"ok": True}
+        response.update(session.get_metrics())
+        return response
+
+    def handle_close(self, session, request):
+        """This class method ends a game."""
+        self.close_game(session.get_id())
+        return {"ok": True}
+
+
+async def handle_connection(server, reader, writer):
+    """
+    This coroutine serves one client connection: it reads request lines and
+    writes a response line for each. After a "watch" request, the connection
+    only carries the game's broadcast.
+    :param server: GameServer() object.
+    :param reader: asyncio StreamReader.
+    :param writer: asyncio StreamWriter.
+    :return: None
+    """
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError
+                if request.get("op") == "watch":
+                    session_id = str(request.get("game"))
+                    try:
+                        subscriber = server.watch(session_id)
+                    except UnknownGameError:
+                        response = {"ok": False, "error": "unknown game: %s" % request.get("game")}
+                    else:
+                        writer.write(b'{"ok": true}\n')
+                        await stream_broadcast(server, session_id, subscriber, writer)
+                        break
+                else:
+                    response = server.handle(request)
+            except ValueError:
+                response = {"ok": False, "error": "bad request"}
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def stream_broadcast(server, session_id, subscriber, writer):
+    """
+    This coroutine writes a game's broadcast frames to a spectator until the game
+    is closed or the spectator disconnects. Frames queued while the spectator's
+    socket was busy are written together.
+    :param server: GameServer() object.
+    :param session_id: the game id.
+    :param subscriber: the spectator's Subscriber().
+    :param writer: asyncio StreamWriter.
+    :return: None
+    """
+    try:
+        while True:
+            await subscriber.wait()
+            writer.write(subscriber.drain())
+            await writer.drain()
+            if subscriber.get_closed():
+                break
+    finally:
+        server.unwatch(session_id, subscriber)
+
+
+async def sweep(server):
+    """This coroutine writes idle games to disk every sweep_interval seconds."""
+    while True:
+        await asyncio.sleep(sweep_interval)
+        server.evict_idle()
+
+
+async def serve(server, host="127.0.0.1", port=8765, unix_path=None, ready=None):
+    """
+    This coroutine runs the server until it is cancelled.
+    :param server: GameServer() object.
+    :param host: TCP host.
+    :param port: TCP port.
+    :param unix_path: if given, a Unix socket is used instead of TCP.
+    :param ready: optional asyncio.Event() set once the server is listening.
+    :return: None
+    """
+    def connected(reader, writer):
+        return handle_connection(server, reader, writer)
+
+    if unix_path is not None:
+        listener = await asyncio.start_unix_server(connected, path=unix_path)
+    else:
+        listener = await asyncio.start_server(connected, host, port)
+    sweeper = asyncio.ensure_future(sweep(server))
+    if ready is not None:
+        ready.set()
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many chess games for players over TCP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port")
+    parser.add_argument("--unix", default=None, help="Unix socket path (instead of TCP)")
+    parser.add_argument("--directory", default="games", help="directory idle games are written to")
+    parser.add_argument("--live-games", type=int, default=default_live_games, help="games kept as ChessGame objects")
+    parser.add_argument("--idle-timeout", type=float, default=default_idle_timeout,
+                        help="seconds before an unused game is written to disk")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.directory, args.live_games, args.idle_timeout)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Headless games for Chess by Chris. Games are played between
+#   random, scripted or engine players entirely through ChessGame() and Board(),
+#   without opening a pygame window, as fast as the rules engine allows. Every
+#   move goes through the same checks as a move made with the mouse, so this is
+#   used to load test the rules engine: it reports games/sec, moves/sec and the
+#   p50/p99 time taken to conduct a single move.
+#
+#   Usage:
+#       python simulate.py --games 100 --white random --black engine --depth 1
+#       python simulate.py --games 10 --script "e2e4 e7e5 g1f3 b8c6"
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import ChessGame
+from engine import Engine, coordinates_to_move
+from movelog import decode_move, get_promotion_letter
+from pgn import get_chess_game_result
+
+# Games which are not over after this many plies are stopped (and counted as
+#   unfinished, "*").
+default_max_plies = 300
+
+
+class RandomPlayer:
+    """
+    Class RandomPlayer represents a player which picks one of its legal moves
+    at random.
+    """
+    def __init__(self, seed=None):
+        """
+        Constructor method for class RandomPlayer.
+        :param seed: optional random seed, so the same games are played again.
+        """
+        self._random = random.Random(seed)
+
+    def choose_move(self, board):
+        """This class method returns a random legal move code, or None if there
+        are no legal moves."""
+        buffer, count = board.generate_legal_moves(board.get_active_p())
+        if count == 0:
+            return None
+        return buffer[self._random.randrange(count)]
+
+
+class ScriptedPlayer:
+    """
+    Class ScriptedPlayer represents a player which plays a fixed list of moves
+    (i.e. an opening), and hands over to another player once the list runs out
+    or a scripted move is not legal in the position.
+    """
+    def __init__(self, moves, fallback=None):
+        """
+        Constructor method for class ScriptedPlayer.
+        ------------------------------------
+        :param moves: list of moves in coordinate notation for both players, in
+            the order they are played, i.e. ["e2e4", "e7e5", "g1f3"]. The player
+            plays the move of the current ply.
+        :param fallback: the player which chooses the moves after the script,
+            a RandomPlayer() by default.
+        """
+        self._moves = list(moves)
+        self._fallback = fallback if fallback is not None else RandomPlayer()
+
+    def choose_move(self, board):
+        """This class method returns the scripted move for the current ply, or the
+        fallback player's move once the script has run out."""
+        ply = len(board.get_hash_history()) - 1
+        if ply < len(self._moves):
+            try:
+                code = coordinates_to_move(board, self._moves[ply])
+            except ValueError:
+                code = None
+            buffer, count = board.generate_legal_moves(board.get_active_p())
+            if code is not None and code in buffer[:count]:
+                return code
+        return self._fallback.choose_move(board)
+
+
+class EnginePlayer:
+    """
+    Class EnginePlayer represents a player which chooses its moves with the
+    alpha-beta search of class Engine (see engine.py).
+    """
+    def __init__(self, depth=1):
+        """
+        Constructor method for class EnginePlayer.
+        :param depth: search depth in plies.
+        """
+        self._engine = Engine(depth)
+
+    def choose_move(self, board):
+        """This class method returns the engine's best move code, or None if there
+        are no legal moves."""
+        return self._engine.choose_move(board)
+
+
+def play_game(white, black, max_plies=default_max_plies, fen=None):
+    """
+    ------------------------------------
+    This function plays a single game between two players through ChessGame().
+    Only the time taken by ChessGame().make_move() is measured, not the time
+    the players take to choose their moves.
+    ------------------------------------
+    :param white: the white player (any object with a choose_move(board) method).
+    :param black: the black player.
+    :param max_plies: the game is stopped after this many plies.
+    :param fen: optional FEN string of the starting position.
+    :return: (ChessGame() object, list of move latencies in seconds)
+    """
+    game = ChessGame(fen=fen)
+    board = game.get_board()
+    board.set_verbose(False)
+    latencies = []
+
+    for ply in range(max_plies):
+        player = white if game.get_player_turn() == "W" else black
+        code = player.choose_move(board)
+        if code is None:
+            break
+
+        start, end, flags = decode_move(code)
+        start_time = time.perf_counter()
+        conducted = game.make_move(start, end, get_promotion_letter(flags) or "Q")
+        latencies.append(time.perf_counter() - start_time)
+
+        if conducted is not True:
+            raise RuntimeError("Rules engine refused a legal move: %d" % code)
+        if game.get_game_state() is False:
+            break
+
+    return game, latencies
+
+
+def percentile(values, fraction):
+    """This function returns the value below which the fraction (0 - 1) of the
+    sorted values fall (nearest rank)."""
+    if not values:
+        return 0.0
+    index = min(int(fraction * len(values)), len(values) - 1)
+    return values[index]
+
+
+def make_player(kind, seed=None, depth=1, script=None):
+    """
+    This function creates a player by name.
+    :param kind: "random", "engine" or "scripted".
+    :param seed: random seed for random players (and a scripted player's fallback).
+    :param depth: search depth for engine players.
+    :param script: list of moves for scripted players.
+    :return: the player object.
+    """
+    if kind == "random":
+        return RandomPlayer(seed)
+    elif kind == "engine":
+        return EnginePlayer(depth)
+    elif kind == "scripted":
+        return ScriptedPlayer(script or [], RandomPlayer(seed))
+    raise ValueError("Unknown player: " + kind)
+
+
+def run(games, white="random", black="random", depth=1, script=None, seed=0,
+        max_plies=default_max_plies, fen=None):
+    """
+    ------------------------------------
+    This function plays a number of games and measures throughput.
+    ------------------------------------
+    :param games: number of games to play.
+    :param white: kind of the white player (see make_player()).
+    :param black: kind of the black player.
+    :param depth: search depth for engine players.
+    :param script: list of moves for scripted players.
+    :param seed: random seed. Each game uses a different seed derived from it.
+    :param max_plies: the games are stopped after this many plies.
+    :param fen: optional FEN string of the starting position.
+    :return: dictionary with games, moves, seconds, games_per_sec,
+        moves_per_sec, p50_ms, p99_ms and results (PGN result counts).
+    """
+    latencies = []
+    results = {"1-0": 0, "0-1": 0, "1/2-1/2": 0, "*": 0}
+    start_time = time.perf_counter()
+
+    for index in range(games):
+        white_player = make_player(white, seed * 1000 + 2 * index, depth, script)
+        black_player = make_player(black, seed * 1000 + 2 * index + 1, depth, script)
+        game, game_latencies = play_game(white_player, black_player, max_plies, fen)
+        latencies.extend(game_latencies)
+        results[get_chess_game_result(game)] += 1
+
+    seconds = time.perf_counter() - start_time
+    latencies.sort()
+    return {
+        "games": games,
+        "moves": len(latencies),
+        "seconds": seconds,
+        "games_per_sec": games / seconds if seconds else 0.0,
+        "moves_per_sec": len(latencies) / seconds if seconds else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    players = ("random", "engine", "scripted")
+    parser = argparse.ArgumentParser(description="Play headless games and report rules engine throughput.")
+    parser.add_argument("--games", type=int, default=10, help="number of games")
+    parser.add_argument("--white", choices=players, default=None, help="white player (default random)")
+    parser.add_argument("--black", choices=players, default=None, help="black player (default random)")
+    parser.add_argument("--depth", type=int, default=1, help="search depth of engine players")
+    parser.add_argument("--script", default=None,
+                        help='moves for scripted players, i.e. "e2e4 e7e5" (players are then scripted '
+                             'by default)')
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--max-plies", type=int, default=default_max_plies, help="maximum plies per game")
+    parser.add_argument("--fen", default=None, help="starting position")
+    args = parser.parse_args(argv)
+
+    script = args.script.split() if args.script else None
+    default_player = "scripted" if script else "random"
+    white = args.white or default_player
+    black = args.black or default_player
+
+    stats = run(args.games, white, black, args.depth, script, args.seed, args.max_plies, args.fen)
+    print("games: %d  (1-0: %d, 0-1: %d, 1/2-1/2: %d, unfinished: %d)" % (
+        stats["games"], stats["results"]["1-0"], stats["results"]["0-1"],
+        stats["results"]["1/2-1/2"], stats["results"]["*"]))
+    print("moves: %d" % stats["moves"])
+    print("time: %.2f s" % stats["seconds"])
+    print("games/sec: %.2f" % stats["games_per_sec"])
+    print("moves/sec: %.1f" % stats["moves_per_sec"])
+    print("move latency p50: %.3f ms  p99: %.3f ms" % (stats["p50_ms"], stats["p99_ms"]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
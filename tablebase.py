@@ -0,0 +1,811 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Endgame tablebases for Chess by Chris. For endings with only a few
+#   pieces (i.e. King and Queen against King), every position is solved ahead of
+#   time by retrograde analysis: starting from the checkmates, the positions one
+#   move before a mate are found, then the positions two moves before, and so on.
+#   The engine can then play these endings perfectly by looking the position up.
+#
+#   A table holds one byte per position:
+#       0    draw
+#       255  not a legal position (i.e. two pieces on one square)
+#       n    mate in n - 1 plies. An odd number of plies is a win for the player
+#            to move, an even number a loss (0 plies: the player is checkmated).
+#   Positions are numbered by the player to move, the pair of King squares (only
+#   the 3612 pairs where the Kings do not touch) and the square of every other
+#   piece (Pawns only have the 48 squares of rows 1 - 6).
+#
+#   The moves follow the same rules as Board(): the Kings, Knights and sliding
+#   pieces move by the offsets and rays of main.py, and white Pawns move towards
+#   row 0. Pawn captures en passant are not included (positions where one is
+#   possible are not probed), and there is no castling.
+#
+#   Tables are written to <directory>/<signature>.tb, i.e. tablebases/KQvK.tb, and
+#   are memory-mapped by Tablebase() when probed. Generation is split over a
+#   process pool: the moves of every position are found in parallel, and the
+#   retrograde analysis then runs over the collected moves.
+#
+#   Usage:
+#       python tablebase.py generate [KQvK KRvK KPvK ...] [--directory tablebases] [--workers N]
+#       python tablebase.py probe "8/8/8/3k4/8/8/2Q5/4K3 w - - 0 1" [--directory tablebases]
+
+import os
+import sys
+import mmap
+import time
+import struct
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import Board, knight_offsets, king_offsets, straight_rays, diagonal_rays, square_name
+from movelog import encode_move, decode_move, get_promotion_letter, FLAG_EN_PASSANT
+
+default_directory = "tablebases"
+
+# The 3 piece endings which are not a draw by insufficient material. Tables a
+#   table depends on (i.e. KPvK on KQvK and KRvK, for promotions) come first.
+default_signatures = ("KQvK", "KRvK", "KPvK")
+
+# File header: magic bytes and the number of positions.
+header = struct.Struct("<4sI")
+magic = b"CBTB"
+
+draw_value = 0
+invalid_value = 255
+
+# Order the pieces of a side are written in a signature.
+piece_order = "KQRBNP"
+promotion_pieces = ("Q", "R", "B", "N")
+
+# Positions handed to each worker at a time.
+chunk_size = 8192
+
+
+def build_step_masks(offsets):
+    """This function returns, for each square, a bitmask of the squares one step
+    (of the offsets) away."""
+    masks = []
+    for square in range(64):
+        row, col = square >> 3, square & 7
+        mask = 0
+        for row_step, col_step in offsets:
+            x, y = row + row_step, col + col_step
+            if 0 <= x <= 7 and 0 <= y <= 7:
+                mask |= 1 << (x * 8 + y)
+        masks.append(mask)
+    return masks
+
+
+def build_rays(directions):
+    """This function returns, for each square, the list of rays (lists of squares
+    in order of distance) in each of the directions."""
+    rays = []
+    for square in range(64):
+        row, col = square >> 3, square & 7
+        square_rays = []
+        for row_step, col_step in directions:
+            ray = []
+            x, y = row + row_step, col + col_step
+            while 0 <= x <= 7 and 0 <= y <= 7:
+                ray.append(x * 8 + y)
+                x, y = x + row_step, y + col_step
+            if ray:
+                square_rays.append(ray)
+        rays.append(square_rays)
+    return rays
+
+
+knight_masks = build_step_masks(knight_offsets)
+king_masks = build_step_masks(king_offsets)
+straight_ray_table = build_rays(straight_rays)
+diagonal_ray_table = build_rays(diagonal_rays)
+slider_rays = {"R": straight_ray_table, "B": diagonal_ray_table,
+               "Q": [straight_ray_table[square] + diagonal_ray_table[square] for square in range(64)]}
+
+# between[a * 64 + b] is the bitmask of the squares between a and b, for each
+#   ray type, or None if a and b are not on a ray of that type.
+straight_between = [None] * 4096
+diagonal_between = [None] * 4096
+for between_table, ray_table in ((straight_between, straight_ray_table), (diagonal_between, diagonal_ray_table)):
+    for from_square in range(64):
+        for ray in ray_table[from_square]:
+            mask = 0
+            for to_square in ray:
+                between_table[from_square * 64 + to_square] = mask
+                mask |= 1 << to_square
+
+# Squares a Pawn of each color attacks (white Pawns capture towards row 0).
+pawn_attack_masks = {"W": build_step_masks(((-1, -1), (-1, 1))), "B": build_step_masks(((1, -1), (1, 1)))}
+
+# The pairs of King squares where the Kings do not stand on or next to each other.
+king_pairs = []
+king_pair_index = [-1] * 4096
+for white_king in range(64):
+    for black_king in range(64):
+        if white_king != black_king and not king_masks[white_king] >> black_king & 1:
+            king_pair_index[white_king * 64 + black_king] = len(king_pairs)
+            king_pairs.append((white_king, black_king))
+
+
+def get_result(value):
+    """
+    This function returns the meaning of a table byte.
+    :param value: the table byte.
+    :return: (result, plies): result is 1 if the player to move wins, -1 if they
+        lose, 0 for a draw and None for an invalid position. plies is the
+        number of plies to mate (0 for a draw).
+    """
+    if value == draw_value:
+        return 0, 0
+    if value == invalid_value:
+        return None, 0
+    plies = value - 1
+    return (1 if plies % 2 == 1 else -1), plies
+
+
+def make_signature(white, black):
+    """This function returns the signature of a table from the letters of the
+    white and black pieces, i.e. ("KQ", "K") is "KQvK"."""
+    return "".join(sorted(white, key=piece_order.index)) + "v" + "".join(sorted(black, key=piece_order.index))
+
+
+def flip_signature(signature):
+    """This function returns the signature with the colors swapped."""
+    white, black = signature.split("v")
+    return black + "v" + white
+
+
+def is_insufficient_material(pieces):
+    """This function returns True if neither side can ever checkmate with the pieces
+    (the same rule as Board().has_insufficient_material()).
+    :param pieces: list of (color, letter, square)."""
+    minor_pieces = []
+    for color, letter, square in pieces:
+        if letter == "K":
+            continue
+        if letter not in ("B", "N"):
+            return False
+        minor_pieces.append((letter, ((square >> 3) + (square & 7)) % 2))
+    if len(minor_pieces) <= 1:
+        return True
+    return all(letter == "B" for letter, square_color in minor_pieces) and \
+        len(set(square_color for letter, square_color in minor_pieces)) == 1
+
+
+def has_en_passant_capture(board):
+    """
+    This function checks if the player to move can capture en passant. A Pawn
+    which has just moved 2 squares leaves an en passant square behind, but in
+    most positions no Pawn can actually take it.
+    :param board: Board() object.
+    :return: True if there is a legal en passant capture, else False.
+    """
+    en_passant = board.get_en_passant()
+    if en_passant is None:
+        return False
+    color = board.get_active_p()
+    # The capturing Pawn stands next to the Pawn which moved, one row past the
+    #   en passant square (white Pawns move towards row 0).
+    row = en_passant[0] + 1 if color == "W" else en_passant[0] - 1
+    grid = board.get_board()
+    for col in (en_passant[1] - 1, en_passant[1] + 1):
+        if not 0 <= col <= 7:
+            continue
+        piece = grid[row][col].get_occupant()
+        if piece is None or piece.get_color() != color or piece.get_letter() != "":
+            continue
+        if board.make_encoded_move(encode_move([row, col], en_passant, FLAG_EN_PASSANT), simulation=True) is True:
+            board.undo_move()
+            return True
+    return False
+
+
+class TableLayout:
+    """
+    Class TableLayout represents the numbering of the positions of a table.
+    ----------------------------------
+    The pieces of a table are kept in a fixed order: the white King, the black
+    King, the other white pieces and then the other black pieces. A position is
+    the player to move plus a square for each piece, in that order.
+    """
+    def __init__(self, signature):
+        """
+        Constructor method for class TableLayout.
+        :param signature: the table's signature, i.e. "KQvK".
+        """
+        white, black = signature.split("v")
+        if white.count("K") != 1 or black.count("K") != 1 or white[0] != "K" or black[0] != "K":
+            raise ValueError("Invalid signature: " + signature)
+        self._signature = signature
+        self._pieces = [("W", "K"), ("B", "K")] + [("W", letter) for letter in white[1:]] + \
+            [("B", letter) for letter in black[1:]]
+        self._sizes = [48 if letter == "P" else 64 for color, letter in self._pieces[2:]]
+        self._size = 2 * len(king_pairs)
+        for size in self._sizes:
+            self._size *= size
+
+    def get_signature(self):
+        """This class method returns the table's signature."""
+        return self._signature
+
+    def get_pieces(self):
+        """This class method returns the list of (color, letter) of the pieces."""
+        return self._pieces
+
+    def get_size(self):
+        """This class method returns the number of positions in the table."""
+        return self._size
+
+    def get_index(self, side, squares):
+        """
+        This class method returns the number of a position.
+        :param side: the player to move, "W" or "B".
+        :param squares: list of the square (row * 8 + col) of each piece.
+        :return: int, or -1 if the Kings touch.
+        """
+        pair = king_pair_index[squares[0] * 64 + squares[1]]
+        if pair < 0:
+            return -1
+        index = (0 if side == "W" else 1) * len(king_pairs) + pair
+        for slot in range(2, len(squares)):
+            if self._sizes[slot - 2] == 48:
+                index = index * 48 + squares[slot] - 8
+            else:
+                index = index * 64 + squares[slot]
+        return index
+
+    def get_position(self, index):
+        """This class method returns (side, squares) of a position number."""
+        squares = [0] * len(self._pieces)
+        for slot in range(len(self._pieces) - 1, 1, -1):
+            size = self._sizes[slot - 2]
+            squares[slot] = index % size + (8 if size == 48 else 0)
+            index //= size
+        side = "W" if index < len(king_pairs) else "B"
+        squares[0], squares[1] = king_pairs[index % len(king_pairs)]
+        return side, squares
+
+
+def is_attacked(target, pieces, squares, by_color, occupied):
+    """
+    This function returns True if a square is attacked by a piece of the by_color
+    player (the same idea as Board().is_square_attacked()).
+    :param target: the square.
+    :param pieces: list of (color, letter) of the pieces.
+    :param squares: list of the square of each piece (-1 for a captured piece).
+    :param by_color: the attacking player, "W" or "B".
+    :param occupied: bitmask of the occupied squares.
+    :return: True or False
+    """
+    for slot in range(len(pieces)):
+        square = squares[slot]
+        color, letter = pieces[slot]
+        if square < 0 or color != by_color:
+            continue
+        if letter == "K":
+            if king_masks[square] >> target & 1:
+                return True
+        elif letter == "N":
+            if knight_masks[square] >> target & 1:
+                return True
+        elif letter == "P":
+            if pawn_attack_masks[color][square] >> target & 1:
+                return True
+        else:
+            if letter != "B":
+                between = straight_between[square * 64 + target]
+                if between is not None and not between & occupied:
+                    return True
+            if letter != "R":
+                between = diagonal_between[square * 64 + target]
+                if between is not None and not between & occupied:
+                    return True
+    return False
+
+
+def generate_piece_moves(pieces, squares, slot, occupied, own):
+    """
+    This generator yields the moves of one piece as (to square, promotion letter),
+    whether or not they leave the King in check.
+    :param pieces: list of (color, letter) of the pieces.
+    :param squares: list of the square of each piece.
+    :param slot: the moving piece.
+    :param occupied: bitmask of the occupied squares.
+    :param own: bitmask of the squares of the moving player's pieces.
+    """
+    color, letter = pieces[slot]
+    square = squares[slot]
+    if letter == "K" or letter == "N":
+        mask = (king_masks if letter == "K" else knight_masks)[square] & ~own
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1, None
+            mask ^= low
+    elif letter == "P":
+        step = -8 if color == "W" else 8
+        last_row = 0 if color == "W" else 7
+        targets = []
+        forward = square + step
+        if not occupied >> forward & 1:
+            targets.append(forward)
+            start_row = 6 if color == "W" else 1
+            if square >> 3 == start_row and not occupied >> (forward + step) & 1:
+                targets.append(forward + step)
+        mask = pawn_attack_masks[color][square] & occupied & ~own
+        while mask:
+            low = mask & -mask
+            targets.append(low.bit_length() - 1)
+            mask ^= low
+        for target in targets:
+            if target >> 3 == last_row:
+                for promotion in promotion_pieces:
+                    yield target, promotion
+            else:
+                yield target, None
+    else:
+        for ray in slider_rays[letter][square]:
+            for target in ray:
+                if own >> target & 1:
+                    break
+                yield target, None
+                if occupied >> target & 1:
+                    break
+
+
+class Tablebase:
+    """
+    Class Tablebase represents a directory of tables. Each table is memory-mapped
+    the first time it is needed, so processes probing the same tables share
+    their pages.
+    """
+    def __init__(self, directory=default_directory):
+        """
+        Constructor method for class Tablebase.
+        :param directory: the directory the .tb files are in.
+        """
+        self._directory = directory
+        self._tables = {}
+        self._layouts = {}
+
+    def get_directory(self):
+        """This class method returns the tables' directory."""
+        return self._directory
+
+    def get_path(self, signature):
+        """This class method returns the file path of a table."""
+        return os.path.join(self._directory, signature + ".tb")
+
+    def get_layout(self, signature):
+        """This class method returns the TableLayout() of a signature."""
+        layout = self._layouts.get(signature)
+        if layout is None:
+            layout = self._layouts[signature] = TableLayout(signature)
+        return layout
+
+    def get_table(self, signature):
+        """This class method returns the mapped table of a signature, or None if
+        there is no such table."""
+        if signature in self._tables:
+            return self._tables[signature]
+        table = None
+        path = self.get_path(signature)
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            file_magic, count = header.unpack_from(table, 0)
+            if file_magic != magic or count != self.get_layout(signature).get_size():
+                table.close()
+                raise ValueError("Not a table for %s: %s" % (signature, path))
+        self._tables[signature] = table
+        return table
+
+    def has_table(self, signature):
+        """This class method returns True if the table (or the one with the colors
+        swapped) is available."""
+        return self.get_table(signature) is not None or self.get_table(flip_signature(signature)) is not None
+
+    def probe_pieces(self, side, pieces):
+        """
+        ------------------------------------
+        This class method looks up a position given as a list of pieces. If the
+        table only exists for the colors swapped, the board is turned around (the
+        rows are mirrored and the colors swapped) first.
+        ------------------------------------
+        :param side: the player to move, "W" or "B".
+        :param pieces: list of (color, letter, square).
+        :return: the table byte, or None if there is no table.
+        """
+        if is_insufficient_material(pieces):
+            return draw_value
+
+        white = [letter for color, letter, square in pieces if color == "W"]
+        black = [letter for color, letter, square in pieces if color == "B"]
+        signature = make_signature(white, black)
+        if self.get_table(signature) is None:
+            signature = flip_signature(signature)
+            if self.get_table(signature) is None:
+                return None
+            side = "B" if side == "W" else "W"
+            pieces = [("B" if color == "W" else "W", letter, square ^ 56) for color, letter, square in pieces]
+
+        # Pieces are matched to the layout's slots in order.
+        layout = self.get_layout(signature)
+        remaining = list(pieces)
+        squares = []
+        for color, letter in layout.get_pieces():
+            for entry in remaining:
+                if entry[0] == color and entry[1] == letter:
+                    squares.append(entry[2])
+                    remaining.remove(entry)
+                    break
+        index = layout.get_index(side, squares)
+        if index < 0:
+            return invalid_value
+        return self.get_table(signature)[header.size + index]
+
+    def probe(self, board):
+        """
+        This class method looks up the position of a Board().
+        :param board: Board() object.
+        :return: (result, plies) as get_result() returns them, or None if there
+            is no table for the position (or an en passant capture is possible,
+            which the tables leave out). An en passant square which no Pawn can
+            take makes no difference, and is ignored.
+        """
+        if has_en_passant_capture(board):
+            return None
+        pieces = []
+        grid = board.get_board()
+        for row in range(8):
+            for col in range(8):
+                piece = grid[row][col].get_occupant()
+                if piece is not None:
+                    pieces.append((piece.get_color(), piece.get_letter() or "P", row * 8 + col))
+        value = self.probe_pieces(board.get_active_p(), pieces)
+        if value is None:
+            return None
+        return get_result(value)
+
+    def best_move(self, board):
+        """
+        ------------------------------------
+        This class method finds the best move of a position in the tables: the
+        fastest mate when winning, any drawing move when drawn and the slowest
+        mate when losing.
+        ------------------------------------
+        :param board: Board() object.
+        :return: (move code, result, plies) for the position before the move,
+            or None if there is no table or no legal move.
+        """
+        if self.probe(board) is None:
+            return None
+        best = None
+        buffer, count = board.generate_legal_moves(board.get_active_p())
+        for code in list(buffer[:count]):
+            board.make_encoded_move(code, simulation=True)
+            probed = self.probe(board)
+            board.undo_move()
+            if probed is None:
+                continue
+            # The child's result is from the opponent's side.
+            result, plies = probed
+            if result == -1:
+                key = (2, -plies)
+            elif result == 0:
+                key = (1, 0)
+            else:
+                key = (0, plies)
+            if best is None or key > best[0]:
+                best = (key, code, -result, plies + 1 if result != 0 else 0)
+        if best is None:
+            return None
+        return best[1], best[2], best[3]
+
+    def close(self):
+        """This class method unmaps every table."""
+        for table in self._tables.values():
+            if table is not None:
+                table.close()
+        self._tables = {}
+
+
+# Tablebase() of the finished tables, in each worker process.
+_worker_tables = None
+
+
+def init_worker(directory):
+    """This function runs once in each worker process."""
+    global _worker_tables
+    _worker_tables = Tablebase(directory)
+
+
+def scan_positions(signature, start, stop, tables=None):
+    """
+    ------------------------------------
+    This function finds the legal moves of a range of positions of a table.
+    Moves staying in the table are listed by the position they lead to. Moves
+    leaving it (captures and promotions) are looked up in the finished tables
+    right away.
+    ------------------------------------
+    :param signature: the table's signature.
+    :param start: first position number.
+    :param stop: position number after the last.
+    :param tables: Tablebase() of the finished tables (the worker's by default).
+    :return: (status, offsets, children, outside) where for each position
+        status is "n" (normal), "m" (checkmated), "s" (stalemate) or "x"
+        (invalid), children[offsets[i]:offsets[i + 1]] are the positions its moves
+        lead to, and outside is the list of (position, table byte) of the moves
+        leaving the table.
+    """
+    if tables is None:
+        tables = _worker_tables
+    layout = tables.get_layout(signature)
+    pieces = layout.get_pieces()
+    status = bytearray(stop - start)
+    offsets = array("I", [0])
+    children = array("I")
+    outside = []
+
+    for index in range(start, stop):
+        side, squares = layout.get_position(index)
+        other = "B" if side == "W" else "W"
+        occupied = 0
+        own = 0
+        for slot in range(len(squares)):
+            occupied |= 1 << squares[slot]
+            if pieces[slot][0] == side:
+                own |= 1 << squares[slot]
+
+        # Two pieces on one square, or the player who just moved left their King
+        #   in check.
+        if bin(occupied).count("1") != len(squares) or \
+                is_attacked(squares[1 if side == "W" else 0], pieces, squares, side, occupied):
+            status[index - start] = ord("x")
+            offsets.append(len(children))
+            continue
+
+        king_slot = 0 if side == "W" else 1
+        moves = 0
+        for slot in range(len(squares)):
+            if pieces[slot][0] != side:
+                continue
+            from_square = squares[slot]
+            for to_square, promotion in generate_piece_moves(pieces, squares, slot, occupied, own):
+                captured = -1
+                if occupied >> to_square & 1:
+                    captured = squares.index(to_square)
+                new_squares = list(squares)
+                new_squares[slot] = to_square
+                if captured >= 0:
+                    new_squares[captured] = -1
+                new_occupied = (occupied & ~(1 << from_square)) | 1 << to_square
+                if is_attacked(new_squares[king_slot], pieces, new_squares, other, new_occupied):
+                    continue
+                moves += 1
+
+                if captured < 0 and promotion is None:
+                    children.append(layout.get_index(other, new_squares))
+                else:
+                    child = [(pieces[each][0], promotion if each == slot and promotion else pieces[each][1],
+                              new_squares[each]) for each in range(len(squares)) if new_squares[each] >= 0]
+                    value = tables.probe_pieces(other, child)
+                    if value is None:
+                        raise ValueError("A table for %s is needed first" % make_signature(
+                            [letter for color, letter, square in child if color == "W"],
+                            [letter for color, letter, square in child if color == "B"]))
+                    outside.append((index, value))
+
+        if moves == 0:
+            in_check = is_attacked(squares[king_slot], pieces, squares, other, occupied)
+            status[index - start] = ord("m" if in_check else "s")
+        else:
+            status[index - start] = ord("n")
+        offsets.append(len(children))
+
+    return bytes(status), offsets, children, outside
+
+
+def solve(size, status, offsets, children, outside):
+    """
+    ------------------------------------
+    This function runs the retrograde analysis over the moves of every position
+    of a table. The positions are solved in order of their distance to mate:
+    a position with a move to a lost position is won (in one ply more than the
+    fastest such move), and a position whose moves all lead to won positions is
+    lost (in one ply more than the slowest). To go backwards, the moves are
+    turned around into a list of the predecessors of each position, stored the
+    same way (offsets into one array).
+    ------------------------------------
+    :param size: number of positions.
+    :param status: bytes of "n", "m", "s" or "x" per position.
+    :param offsets: array of offsets into children, size + 1 entries.
+    :param children: array of the positions each move leads to.
+    :param outside: list of (position, table byte) of the moves leaving the table.
+    :return: bytearray of the table bytes.
+    """
+    predecessor_offsets = array("I", bytes(4 * (size + 1)))
+    for child in children:
+        predecessor_offsets[child + 1] += 1
+    for index in range(size):
+        predecessor_offsets[index + 1] += predecessor_offsets[index]
+    predecessors = array("I", bytes(4 * len(children)))
+    fill = array("I", predecessor_offsets)
+    for index in range(size):
+        for child in children[offsets[index]:offsets[index + 1]]:
+            predecessors[fill[child]] = index
+            fill[child] += 1
+    del fill
+
+    remaining = array("H", bytes(2 * size))
+    for index in range(size):
+        remaining[index] = offsets[index + 1] - offsets[index]
+
+    # buckets[plies] holds the positions which may be solved at that distance.
+    buckets = [[]]
+    values = bytearray(size)
+    solved = bytearray(size)
+    can_draw = bytearray(size)
+    slowest_loss = array("H", bytes(2 * size))
+    outside_win = bytearray(size)
+
+    def schedule(plies, index):
+        while len(buckets) <= plies:
+            buckets.append([])
+        buckets[plies].append(index)
+
+    for index, value in outside:
+        result, plies = get_result(value)
+        if result == 0:
+            can_draw[index] = 1
+        elif result == -1:
+            outside_win[index] = 1
+            schedule(plies + 1, index)
+        elif result == 1:
+            slowest_loss[index] = max(slowest_loss[index], plies + 1)
+
+    for index in range(size):
+        if status[index] == ord("x"):
+            values[index] = invalid_value
+            solved[index] = 1
+        elif status[index] == ord("s"):
+            solved[index] = 1
+        elif status[index] == ord("m"):
+            schedule(0, index)
+        elif remaining[index] == 0 and not can_draw[index] and not outside_win[index]:
+            # Every move leaves the table into a lost position.
+            schedule(slowest_loss[index], index)
+
+    plies = 0
+    while plies < len(buckets):
+        for index in buckets[plies]:
+            if solved[index]:
+                continue
+            solved[index] = 1
+            values[index] = plies + 1
+            for predecessor in predecessors[predecessor_offsets[index]:predecessor_offsets[index + 1]]:
+                if solved[predecessor]:
+                    continue
+                if plies % 2 == 0:
+                    schedule(plies + 1, predecessor)
+                else:
+                    remaining[predecessor] -= 1
+                    if remaining[predecessor] == 0 and not can_draw[predecessor] and not outside_win[predecessor]:
+                        schedule(max(plies + 1, slowest_loss[predecessor]), predecessor)
+        buckets[plies] = None
+        plies += 1
+        if plies >= invalid_value - 1 and plies < len(buckets):
+            raise ValueError("Mates are too long for a byte table")
+
+    return values
+
+
+def generate_table(signature, directory=default_directory, workers=None):
+    """
+    ------------------------------------
+    This function generates a table and writes it to the directory. The tables
+    of the endings its captures and promotions lead to must be there already.
+    ------------------------------------
+    :param signature: the table's signature, i.e. "KQvK".
+    :param directory: the directory of the tables.
+    :param workers: number of worker processes (os.cpu_count() by default).
+    :return: dictionary with signature, positions, wins, losses, draws,
+        invalid, longest (plies) and seconds.
+    """
+    start_time = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    size = TableLayout(signature).get_size()
+    chunks = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+    if workers == 1:
+        tables = Tablebase(directory)
+        parts = [scan_positions(signature, start, stop, tables) for start, stop in chunks]
+        tables.close()
+    else:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(directory,)) as pool:
+            parts = list(pool.map(scan_positions, [signature] * len(chunks),
+                                  [start for start, stop in chunks], [stop for start, stop in chunks]))
+
+    status = bytearray()
+    offsets = array("I", [0])
+    children = array("I")
+    outside = []
+    for part_status, part_offsets, part_children, part_outside in parts:
+        status += part_status
+        base = len(children)
+        offsets.extend(base + offset for offset in part_offsets[1:])
+        children.extend(part_children)
+        outside.extend(part_outside)
+    del parts
+
+    values = solve(size, status, offsets, children, outside)
+
+    path = os.path.join(directory, signature + ".tb")
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(header.pack(magic, size))
+        file.write(values)
+    os.replace(temporary_path, path)
+
+    counts = [0, 0, 0, 0]
+    longest = 0
+    for value in values:
+        result, plies = get_result(value)
+        counts[{1: 0, -1: 1, 0: 2, None: 3}[result]] += 1
+        longest = max(longest, plies)
+    return {
+        "signature": signature,
+        "positions": size,
+        "wins": counts[0],
+        "losses": counts[1],
+        "draws": counts[2],
+        "invalid": counts[3],
+        "longest": longest,
+        "seconds": time.perf_counter() - start_time,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate or probe endgame tablebases.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="generate tables")
+    generate.add_argument("signatures", nargs="*", default=list(default_signatures),
+                          help="tables to generate, in order (default: %s)" % " ".join(default_signatures))
+    generate.add_argument("--directory", default=default_directory, help="directory of the tables")
+    generate.add_argument("--workers", type=int, default=None, help="worker processes")
+    probe = commands.add_parser("probe", help="look up a position")
+    probe.add_argument("fen", help="FEN string of the position")
+    probe.add_argument("--directory", default=default_directory, help="directory of the tables")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        for signature in args.signatures:
+            stats = generate_table(signature, args.directory, args.workers)
+            print("%s: %d positions (%d won, %d lost, %d drawn, %d invalid), longest mate %d plies, %.1f s" % (
+                stats["signature"], stats["positions"], stats["wins"], stats["losses"], stats["draws"],
+                stats["invalid"], stats["longest"], stats["seconds"]))
+        return
+
+    board = Board()
+    board.generate_board(args.fen)
+    board.set_verbose(False)
+    tables = Tablebase(args.directory)
+    best = tables.best_move(board)
+    if best is None:
+        print("position not in the tables")
+        return
+    code, result, plies = best
+    start, end, flags = decode_move(code)
+    print("%s, mate in %d plies, best move %s%s%s" % (
+        {1: "win", 0: "draw", -1: "loss"}[result], plies, square_name(start), square_name(end),
+        (get_promotion_letter(flags) or "").lower()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
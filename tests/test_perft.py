@@ -0,0 +1,50 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Perft regression test for the move generation of Chess by Chris. Perft
+#   counts every legal move sequence to a fixed depth, and the counts of these
+#   positions are well known, so any change to the move generation, check
+#   detection or castling rules which makes a move legal or illegal by mistake
+#   changes a count.
+#
+#   Usage:
+#       python -m pytest tests
+
+import os
+import sys
+
+# No window is ever opened, so pygame does not need a real display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Board, start_fen
+
+# "Kiwipete", a position with castling, en passant, promotions and pins.
+kiwipete_fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def perft(board, depth, ply=0):
+    """This function returns the number of legal move sequences of the given
+    depth from the board's position."""
+    buffer, count = board.generate_legal_moves(board.get_active_p(), ply)
+    if depth == 1:
+        return count
+    total = 0
+    for index in range(count):
+        board.make_encoded_move(buffer[index], simulation=True)
+        total += perft(board, depth - 1, ply + 1)
+        board.undo_move()
+    return total
+
+
+def test_perft_start_position():
+    board = Board.from_fen(start_fen)
+    assert [perft(board, depth) for depth in (1, 2, 3)] == [20, 400, 8902]
+    # The position is the same after every move has been taken back.
+    assert board.to_fen() == start_fen
+
+
+def test_perft_kiwipete():
+    board = Board.from_fen(kiwipete_fen)
+    assert [perft(board, depth) for depth in (1, 2, 3)] == [48, 2039, 97862]
+    assert board.to_fen() == kiwipete_fen
@@ -0,0 +1,62 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: PGN round-trip test for Chess by Chris. A ChessGame() started from a
+#   FEN string is written out with PGNWriter().write_chess_game() and read back
+#   with read_games(), which must give the same moves and the same position.
+#
+#   Usage:
+#       python -m pytest tests
+
+import io
+import os
+import sys
+
+# No window is ever opened, so pygame does not need a real display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pgn
+from main import ChessGame, parse_square
+
+
+def round_trip(fen, moves):
+    """This function plays moves (i.e. "a1a8") in a ChessGame() started from the
+    FEN, writes the game as PGN and reads it back.
+    :return: (the game, PGNGame() read back, board and move codes replayed)."""
+    game = ChessGame(fen=fen)
+    game.get_board().set_verbose(False)
+    for move in moves:
+        assert game.make_move(parse_square(move[:2]), parse_square(move[2:4])) is True
+    text = io.StringIO()
+    writer = pgn.PGNWriter(text)
+    writer.write_chess_game(game)
+    writer.close()
+    read = list(pgn.read_games(io.StringIO(text.getvalue())))
+    assert len(read) == 1
+    board, codes = pgn.replay_game(read[0])
+    return game, read[0], board, codes
+
+
+def test_round_trip_from_fen():
+    fen = "4k3/8/8/8/8/8/8/R3K3 w Q - 0 1"
+    game, read, board, codes = round_trip(fen, ["e1c1", "e8e7", "d1d7"])
+    assert read.get_headers()["SetUp"] == "1"
+    assert read.get_headers()["FEN"] == fen
+    assert read.get_moves() == ["O-O-O", "Ke7", "Rd7+"]
+    assert list(codes) == list(game.get_moves())
+    assert board.to_fen() == game.get_board().to_fen()
+
+
+def test_round_trip_black_to_move():
+    fen = "4k3/8/8/8/8/8/8/R3K3 b Q - 3 20"
+    game, read, board, codes = round_trip(fen, ["e8d7", "a1a7"])
+    assert read.get_moves() == ["Kd7", "Ra7+"]
+    assert list(codes) == list(game.get_moves())
+    assert board.to_fen() == game.get_board().to_fen()
+
+
+def test_standard_start_has_no_fen_tag():
+    game, read, board, codes = round_trip(None, ["e2e4", "e7e5"])
+    assert "FEN" not in read.get_headers()
+    assert read.get_moves() == ["e4", "e5"]
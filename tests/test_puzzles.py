@@ -0,0 +1,45 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Mate solver test for Chess by Chris. The line of a proven mate is
+#   read from the proof in the table, so it costs no more search and a proven
+#   mate is never reported as unknown.
+#
+#   Usage:
+#       python -m pytest tests
+
+import os
+import sys
+
+# No window is ever opened, so pygame does not need a real display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Board
+from engine import in_check
+from puzzles import MateSolver
+
+# Black mates in 3: Bc5+ Kxc5 Qb6+ Kd5 Qd6#. The proof takes about 1600 nodes.
+mate_in_3_fen = "r1b1kb1r/pppp1ppp/5q2/4n3/3KP3/2N3PN/PPP4P/R1BQ1B1R b kq - 0 1"
+
+
+def test_line_is_read_from_the_proof():
+    board = Board.from_fen(mate_in_3_fen)
+    answer = MateSolver(node_limit=3000).solve(board, 3)
+    assert answer["result"] == "mate" and answer["moves"] == 3
+    assert answer["line_complete"] is True
+    assert answer["line_nodes"] == 0
+    assert len(answer["line"]) == 5
+
+    # The line ends in checkmate, and the board is left as it was found.
+    assert board.to_fen() == mate_in_3_fen
+    for code in answer["line"]:
+        assert board.make_encoded_move(code, simulation=True) is True
+    defender = board.get_active_p()
+    assert in_check(board, defender) and not board.has_legal_move(defender)
+
+
+def test_no_mate():
+    board = Board.from_fen(mate_in_3_fen)
+    answer = MateSolver().solve(board, 1)
+    assert answer["result"] == "no mate" and answer["line"] == []
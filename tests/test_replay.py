@@ -0,0 +1,50 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Seek test for the game replay of Chess by Chris. The board a
+#   GameReplay() seeks to must be the same, repetitions included, whichever
+#   ply it was reached from.
+#
+#   Usage:
+#       python -m pytest tests
+
+import io
+import os
+import sys
+
+# No window is ever opened, so pygame does not need a real display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pgn
+from replay import GameReplay
+
+# The Knights go out and back twice, so the starting position occurs 3 times.
+repetition_pgn = "1. Nf3 Nf6 2. Ng1 Ng8 3. Nf3 Nf6 4. Ng1 Ng8 *\n"
+
+
+def get_codes():
+    game = next(pgn.read_games(io.StringIO(repetition_pgn)))
+    return pgn.replay_game(game)[1]
+
+
+def test_seek_keeps_repetitions():
+    for interval in (1, 3, 4, 5):
+        replay = GameReplay(get_codes(), interval)
+        assert replay.seek(8).get_game_result() == "threefold repetition"
+        replay.seek(0)
+        assert replay.seek(8).get_game_result() == "threefold repetition"
+        replay.seek(3)
+        assert replay.seek(8).get_game_result() == "threefold repetition"
+
+
+def test_seek_gives_the_same_board_from_any_ply():
+    codes = get_codes()
+    replay = GameReplay(codes, 3)
+    for target in range(len(codes) + 1):
+        expected = GameReplay(codes[:target], 3).get_board()
+        for start in range(len(codes) + 1):
+            replay.seek(start)
+            board = replay.seek(target)
+            assert board.to_fen() == expected.to_fen()
+            assert board.get_repetition_count() == expected.get_repetition_count()
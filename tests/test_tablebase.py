@@ -0,0 +1,91 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Regression test for the endgame tablebases of Chess by Chris. A won
+#   position is played out with Tablebase().best_move() for both sides, which
+#   must end in checkmate after exactly the number of plies the table promises.
+#   The tables are generated once for the test (about a minute).
+#
+#   Usage:
+#       python -m pytest tests
+
+import os
+import sys
+import random
+
+import pytest
+
+# No window is ever opened, so pygame does not need a real display.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import Board
+from tablebase import Tablebase, generate_table, default_signatures
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("tablebases"))
+    for signature in default_signatures:
+        generate_table(signature, directory, workers=1)
+    tables = Tablebase(directory)
+    yield tables
+    tables.close()
+
+
+def play_out(tables, fen):
+    """This function plays a position out with best_move() for both sides.
+    :return: (probed plies, plies played, game result)."""
+    board = Board.from_fen(fen)
+    result, plies = tables.probe(board)
+    assert result == 1
+    played = 0
+    while played <= plies:
+        move = tables.best_move(board)
+        if move is None:
+            break
+        board.make_encoded_move(move[0], simulation=True)
+        played += 1
+    return plies, played, board.get_game_result()
+
+
+def test_pawn_double_step_win(tables):
+    # The win starts with h2h4, which leaves an en passant square that no
+    #   black Pawn can take.
+    assert play_out(tables, "8/K7/8/1k6/8/8/7P/8 w - - 0 1") == (27, 27, "checkmate")
+
+
+def make_fen(pieces):
+    """This function returns the FEN string (white to move) of a list of (FEN
+    letter, square) tuples, squares numbered row * 8 + col."""
+    grid = [["1"] * 8 for row in range(8)]
+    for letter, square in pieces:
+        grid[square >> 3][square & 7] = letter
+    ranks = []
+    for row in grid:
+        rank = ""
+        for char in row:
+            if char == "1" and rank[-1:].isdigit():
+                rank = rank[:-1] + str(int(rank[-1]) + 1)
+            else:
+                rank += char
+        ranks.append(rank)
+    return "/".join(ranks) + " w - - 0 1"
+
+
+def test_random_pawn_wins(tables):
+    # Random King and Pawn against King wins, many of which start with a Pawn
+    #   double step.
+    generator = random.Random(0)
+    tested = 0
+    while tested < 20:
+        kings = generator.sample(range(64), 2)
+        pawn = generator.randrange(8, 56)
+        if pawn in kings:
+            continue
+        fen = make_fen([("K", kings[0]), ("k", kings[1]), ("P", pawn)])
+        if tables.probe(Board.from_fen(fen))[0] != 1:
+            continue
+        plies, played, result = play_out(tables, fen)
+        assert (played, result) == (plies, "checkmate"), fen
+        tested += 1
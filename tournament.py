@@ -0,0 +1,410 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Self-play tournaments for Chess by Chris. Two players (i.e. two
+#   engine settings) play many games against each other, spread across a pool of
+#   worker processes. Each worker keeps one headless Board() and plays its games
+#   on it. Results stream back as games finish, and are used to work out the Elo
+#   difference between the players and a SPRT (sequential probability ratio
+#   test), which can stop the tournament as soon as the result is clear. The games
+#   are saved as PGN and/or a binary move log (see movelog.py).
+#
+#   Players are given as "random" or "engine:DEPTH", i.e.
+#       python tournament.py engine:2 engine:1 --games 1000 --pgn games.pgn
+
+import os
+import sys
+import math
+import time
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import Board, start_fen
+from movelog import MoveLog, decode_move, get_promotion_letter
+from simulate import RandomPlayer, make_player, default_max_plies
+import pgn
+
+# Each game starts with this many random plies, so that two deterministic
+#   engines do not play the same game over and over.
+default_opening_plies = 4
+
+# A crashed worker pool is started again at most this many times.
+max_restarts = 3
+
+# The Board() of a worker process (see init_worker()).
+_worker_board = None
+
+
+def init_worker():
+    """This function is run once in each worker process. It creates the headless
+    Board() which the worker plays all of its games on."""
+    global _worker_board
+    _worker_board = Board()
+    _worker_board.generate_board()
+    _worker_board.set_verbose(False)
+
+
+def parse_player(spec, seed=None):
+    """
+    This function creates a player from its name.
+    :param spec: "random" or "engine:DEPTH" (i.e. "engine:2").
+    :param seed: random seed for random players.
+    :return: the player object (see simulate.py).
+    """
+    kind, separator, depth = spec.partition(":")
+    if kind == "engine":
+        return make_player("engine", depth=int(depth or 1))
+    elif kind == "random" and not separator:
+        return make_player("random", seed)
+    raise ValueError("Unknown player: " + spec)
+
+
+def play_tournament_game(index, white, black, seed, fen=None, opening_plies=default_opening_plies,
+                         max_plies=default_max_plies):
+    """
+    ------------------------------------
+    This function plays a single game on the worker's Board(). Every move is
+    checked by Board().make_move() as in a normal game.
+    ------------------------------------
+    :param index: the game number.
+    :param white: name of the white player (see parse_player()).
+    :param black: name of the black player.
+    :param seed: random seed for the opening (and random players).
+    :param fen: optional FEN string of the starting position.
+    :param opening_plies: number of random plies the game starts with.
+    :param max_plies: the game is stopped after this many plies.
+    :return: (index, PGN result, reason the game ended or None, move codes as bytes)
+    """
+    if _worker_board is None:
+        init_worker()
+    board = _worker_board
+    board.set_fen(fen or start_fen)
+
+    opening = RandomPlayer(seed)
+    players = {"W": parse_player(white, seed + 1), "B": parse_player(black, seed + 2)}
+    codes = array("H")
+    reason = None
+
+    for ply in range(max_plies):
+        player = opening if ply < opening_plies else players[board.get_active_p()]
+        code = player.choose_move(board)
+        if code is None:
+            break
+
+        start, end, flags = decode_move(code)
+        if board.make_move(start, end, promotion=get_promotion_letter(flags) or "Q") is not True:
+            raise RuntimeError("Rules engine refused a legal move: %d" % code)
+        codes.append(code)
+
+        reason = board.get_game_result()
+        if reason is not None:
+            break
+
+    if reason == "checkmate":
+        result = "1-0" if board.get_active_p() == "B" else "0-1"
+    elif reason is not None:
+        result = "1/2-1/2"
+    else:
+        result = "*"
+    return index, result, reason, codes.tobytes()
+
+
+def elo_to_score(elo):
+    """This function returns the expected score (0 - 1) of a player who is elo
+    points stronger than the opponent."""
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def score_to_elo(score):
+    """This function returns the Elo difference for an expected score (0 - 1)."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+class TournamentStats:
+    """
+    Class TournamentStats represents the results of a tournament so far, from the
+    first player's side: wins, draws and losses.
+    ----------------------------------
+    The SPRT tests H0 (the first player is elo0 stronger) against H1 (it is elo1
+    stronger). Once the log likelihood ratio leaves the bounds given by alpha
+    and beta (the error rates), one of the hypotheses is accepted.
+    """
+    def __init__(self, elo0=0.0, elo1=5.0, alpha=0.05, beta=0.05):
+        """
+        Constructor method for class TournamentStats.
+        ------------------------------------
+        :param elo0: Elo difference of hypothesis H0.
+        :param elo1: Elo difference of hypothesis H1.
+        :param alpha: the chance of accepting H1 when H0 is true.
+        :param beta: the chance of accepting H0 when H1 is true.
+        """
+        self._wins = 0
+        self._draws = 0
+        self._losses = 0
+        self._unfinished = 0
+        self._elo0 = elo0
+        self._elo1 = elo1
+        self._lower_bound = math.log(beta / (1 - alpha))
+        self._upper_bound = math.log((1 - beta) / alpha)
+
+    def add_result(self, result, first_is_white):
+        """
+        This class method adds a game result.
+        :param result: PGN result, i.e. "1-0".
+        :param first_is_white: True if the first player had the white pieces.
+        :return: None
+        """
+        if result == "1/2-1/2":
+            self._draws += 1
+        elif result == "*":
+            self._unfinished += 1
+        elif (result == "1-0") == first_is_white:
+            self._wins += 1
+        else:
+            self._losses += 1
+
+    def get_counts(self):
+        """This class method returns (wins, draws, losses, unfinished) for the first
+        player. Unfinished games are not counted by the statistics."""
+        return self._wins, self._draws, self._losses, self._unfinished
+
+    def get_score(self):
+        """This class method returns the first player's score (0 - 1), a draw
+        counting as half a win."""
+        games = self._wins + self._draws + self._losses
+        if games == 0:
+            return 0.5
+        return (self._wins + 0.5 * self._draws) / games
+
+    def get_variance(self):
+        """This class method returns the variance of the score of a single game."""
+        games = self._wins + self._draws + self._losses
+        if games == 0:
+            return 0.0
+        score = self.get_score()
+        return (self._wins + 0.25 * self._draws) / games - score * score
+
+    def get_elo(self):
+        """
+        This class method returns the Elo difference between the players.
+        :return: (Elo difference, 95% error margin)
+        """
+        games = self._wins + self._draws + self._losses
+        score = self.get_score()
+        elo = score_to_elo(score)
+        if games == 0:
+            return elo, float("inf")
+        error = 1.96 * math.sqrt(self.get_variance() / games)
+        margin = (score_to_elo(min(score + error, 1.0)) - score_to_elo(max(score - error, 0.0))) / 2
+        return elo, margin
+
+    def get_llr(self):
+        """This class method returns the SPRT log likelihood ratio of H1 against H0
+        (using the normal approximation of the score)."""
+        games = self._wins + self._draws + self._losses
+        variance = self.get_variance()
+        if games == 0 or variance <= 0:
+            return 0.0
+        score0 = elo_to_score(self._elo0)
+        score1 = elo_to_score(self._elo1)
+        return (score1 - score0) * (2 * self.get_score() - score0 - score1) / (2 * variance / games)
+
+    def get_sprt_bounds(self):
+        """This class method returns the (lower, upper) bounds of the SPRT."""
+        return self._lower_bound, self._upper_bound
+
+    def get_sprt_status(self):
+        """This class method returns "H1" or "H0" once the SPRT has accepted that
+        hypothesis, else None."""
+        llr = self.get_llr()
+        if llr >= self._upper_bound:
+            return "H1"
+        elif llr <= self._lower_bound:
+            return "H0"
+        return None
+
+
+def run_tournament(first, second, games, workers=None, fen=None, opening_plies=default_opening_plies,
+                   max_plies=default_max_plies, seed=0, pgn_path=None, log_path=None, stats=None,
+                   stop_on_sprt=False, callback=None):
+    """
+    ------------------------------------
+    This function plays a tournament between two players in a pool of worker
+    processes. The players swap colors every game. Games are handed out one at
+    a time, so a worker which finishes early simply picks up the next game.
+
+    Finished games are counted and written out as soon as they come back. If a
+    worker process crashes, the pool is started again and only the games which
+    have not finished are played again. A game which fails with an exception
+    (i.e. an engine bug) is not counted, its game number and error are recorded
+    and the tournament carries on.
+    ------------------------------------
+    :param first: name of the first player (see parse_player()).
+    :param second: name of the second player.
+    :param games: number of games.
+    :param workers: number of worker processes (default: one per CPU core).
+    :param fen: optional FEN string of the starting position.
+    :param opening_plies: number of random plies each game starts with.
+    :param max_plies: the games are stopped after this many plies.
+    :param seed: random seed. Game i uses seed * 1000003 + 3 * i.
+    :param pgn_path: optional PGN file the games are added to.
+    :param log_path: optional binary move log file the games are added to.
+    :param stats: optional TournamentStats() object, i.e. with other SPRT bounds.
+    :param stop_on_sprt: if True, the tournament stops once the SPRT is decided.
+    :param callback: optional function called as callback(stats, index, result)
+        after each game.
+    :return: dictionary with games, seconds, games_per_sec, restarts, errors (list
+        of (game number, error message) tuples) and stats.
+    """
+    if stats is None:
+        stats = TournamentStats()
+    writer = pgn.PGNWriter(pgn_path) if pgn_path is not None else None
+    log = MoveLog(log_path) if log_path is not None else None
+
+    pending = set(range(games))
+    errors = []
+    finished = restarts = 0
+    start_time = time.perf_counter()
+    stopped = False
+
+    try:
+        while pending and not stopped:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+            futures = {}
+            for index in sorted(pending):
+                white, black = (first, second) if index % 2 == 0 else (second, first)
+                futures[executor.submit(play_tournament_game, index, white, black,
+                                        seed * 1000003 + 3 * index, fen, opening_plies, max_plies)] = index
+
+            broken = False
+            try:
+                for future in as_completed(futures):
+                    try:
+                        index, result, reason, data = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        continue
+                    except Exception as error:
+                        # Only this game is lost, the other games go on.
+                        index = futures[future]
+                        pending.discard(index)
+                        errors.append((index, "%s: %s" % (type(error).__name__, error)))
+                        continue
+
+                    pending.discard(index)
+                    finished += 1
+                    stats.add_result(result, index % 2 == 0)
+                    save_game(writer, log, index, first, second, result, reason, data, fen)
+                    if callback is not None:
+                        callback(stats, index, result)
+                    if stop_on_sprt is True and stats.get_sprt_status() is not None:
+                        stopped = True
+                        break
+            finally:
+                executor.shutdown(wait=not broken, cancel_futures=True)
+
+            if broken and pending:
+                restarts += 1
+                if restarts > max_restarts:
+                    raise RuntimeError("Worker processes crashed %d times, %d games not played"
+                                       % (restarts, len(pending)))
+    finally:
+        if writer is not None:
+            writer.close()
+        if log is not None:
+            log.close()
+
+    seconds = time.perf_counter() - start_time
+    return {
+        "games": finished,
+        "seconds": seconds,
+        "games_per_sec": finished / seconds if seconds else 0.0,
+        "restarts": restarts,
+        "errors": errors,
+        "stats": stats,
+    }
+
+
+def save_game(writer, log, index, first, second, result, reason, data, fen=None):
+    """
+    This function writes a finished tournament game to the PGN writer and/or the
+    binary move log.
+    :param writer: PGNWriter() object or None.
+    :param log: MoveLog() object or None.
+    :param index: the game number.
+    :param first: name of the first player.
+    :param second: name of the second player.
+    :param result: PGN result.
+    :param reason: why the game ended, or None.
+    :param data: the move codes as bytes.
+    :param fen: optional FEN string of the starting position.
+    :return: None
+    """
+    codes = array("H")
+    codes.frombytes(data)
+
+    if writer is not None:
+        white, black = (first, second) if index % 2 == 0 else (second, first)
+        headers = {"Event": "Chess by Chris tournament", "Round": str(index + 1),
+                   "White": white, "Black": black}
+        if reason is not None:
+            headers["Termination"] = reason
+        if fen is not None:
+            headers["FEN"] = fen
+            headers["SetUp"] = "1"
+        writer.write_game(headers, pgn.codes_to_san(codes, pgn.new_board(fen)), result)
+
+    if log is not None:
+        for code in codes:
+            log.append(code)
+        log.end_game()
+        log.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a self-play tournament between two players.")
+    parser.add_argument("first", help='first player, i.e. "engine:2"')
+    parser.add_argument("second", help='second player, i.e. "engine:1" or "random"')
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU cores)")
+    parser.add_argument("--fen", default=None, help="starting position")
+    parser.add_argument("--opening-plies", type=int, default=default_opening_plies, help="random plies per game")
+    parser.add_argument("--max-plies", type=int, default=default_max_plies, help="maximum plies per game")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--pgn", default=None, help="PGN file to add the games to")
+    parser.add_argument("--log", default=None, help="binary move log to add the games to")
+    parser.add_argument("--elo0", type=float, default=0.0, help="SPRT H0 Elo difference")
+    parser.add_argument("--elo1", type=float, default=5.0, help="SPRT H1 Elo difference")
+    parser.add_argument("--sprt", action="store_true", help="stop once the SPRT is decided")
+    args = parser.parse_args(argv)
+
+    def report(stats, index, result):
+        wins, draws, losses, unfinished = stats.get_counts()
+        elo, margin = stats.get_elo()
+        print("game %5d %-7s  +%d =%d -%d  elo %+.1f +/- %.1f  llr %.2f" % (
+            index + 1, result, wins, draws, losses, elo, margin, stats.get_llr()))
+
+    stats = TournamentStats(args.elo0, args.elo1)
+    summary = run_tournament(args.first, args.second, args.games, args.workers, args.fen, args.opening_plies,
+                             args.max_plies, args.seed, args.pgn, args.log, stats, args.sprt, report)
+
+    elo, margin = stats.get_elo()
+    lower, upper = stats.get_sprt_bounds()
+    print("games: %d  time: %.2f s  games/sec: %.2f  restarts: %d" % (
+        summary["games"], summary["seconds"], summary["games_per_sec"], summary["restarts"]))
+    for index, error in summary["errors"]:
+        print("game %5d failed: %s" % (index + 1, error))
+    print("%s vs %s: elo %+.1f +/- %.1f" % (args.first, args.second, elo, margin))
+    print("SPRT [%.1f, %.1f]: llr %.2f (%.2f, %.2f) %s" % (
+        args.elo0, args.elo1, stats.get_llr(), lower, upper, stats.get_sprt_status() or "undecided"))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Evaluation tuning for Chess by Chris ("Texel" tuning). The weights of
+#   engine.evaluate() are fitted to the results of real games: every position is
+#   scored, the score is turned into an expected result with a logistic curve,
+#   and the weights are moved to bring the expected results closer to the actual
+#   ones (1 for a white win, 0.5 for a draw, 0 for a black win).
+#
+#   The evaluation is a sum of weights (piece values, piece-square table entries
+#   and pawn structure terms) times how often each one occurs in the position,
+#   so the whole position set becomes one feature matrix, built once. The loss
+#   and its gradient are then a couple of matrix products per step.
+#
+#   Positions come from the training data shards written by export.py. The tuned
+#   weights are written to evaluation.json next to engine.py, which the engine
+#   reads when it starts.
+#
+#   Needs NumPy (pip install numpy).
+#
+#   Usage:
+#       python tune.py shards [--epochs 300] [--limit 500000] [--output evaluation.json]
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import numpy
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import engine
+from batch import plane_pieces, count_pawn_structure
+
+# The piece letters in the order of the planes of one color.
+feature_letters = [letter for color, letter in plane_pieces[:6]]
+
+# Feature matrix columns: the piece count (white minus black) of each letter,
+#   then each letter's 64 piece-square entries, then the doubled and isolated
+#   Pawn counts and the passed Pawn counts by rows moved.
+material_columns = slice(0, 6)
+table_columns = slice(6, 6 + 6 * 64)
+doubled_column = 6 + 6 * 64
+isolated_column = doubled_column + 1
+passed_columns = slice(isolated_column + 1, isolated_column + 9)
+feature_count = isolated_column + 9
+
+# Rows of the feature matrix handled at a time, so the float copies stay small.
+chunk_rows = 65536
+
+
+def build_features(planes):
+    """
+    ------------------------------------
+    This function builds the feature matrix of a batch of positions. A row
+    times the weight vector (see get_weight_vector()) is the position's
+    engine.evaluate() score from white's side.
+    ------------------------------------
+    :param planes: (N, 12, 8, 8) piece planes (see batch.py).
+    :return: int8 array of shape (N, feature_count).
+    """
+    count = len(planes)
+    white = planes[:, :6].astype(numpy.int8)
+    # Black pieces use the tables flipped over, and count against white.
+    black = planes[:, 6:, ::-1, :].astype(numpy.int8)
+    features = numpy.zeros((count, feature_count), dtype=numpy.int8)
+    tables = (white - black).reshape(count, 6 * 64)
+    features[:, table_columns] = tables
+    features[:, material_columns] = tables.reshape(count, 6, 64).sum(axis=2)
+    doubled, isolated, passed = count_pawn_structure(planes[:, 5], planes[:, 11])
+    features[:, doubled_column] = doubled
+    features[:, isolated_column] = isolated
+    features[:, passed_columns] = passed
+    return features
+
+
+def get_weight_vector(parameters):
+    """This function returns the evaluation weights (engine.get_parameters()) as a
+    vector matching the feature matrix columns."""
+    weights = numpy.zeros(feature_count, dtype=numpy.float64)
+    for index, letter in enumerate(feature_letters):
+        weights[index] = parameters["piece_values"][letter]
+        weights[6 + index * 64:6 + (index + 1) * 64] = parameters["piece_square_tables"][letter]
+    weights[doubled_column] = -parameters["doubled_pawn_penalty"]
+    weights[isolated_column] = -parameters["isolated_pawn_penalty"]
+    weights[passed_columns] = parameters["passed_pawn_bonus"]
+    return weights
+
+
+def get_parameters(weights):
+    """This function turns a weight vector back into evaluation weights (rounded to
+    whole centipawns), the format of engine.get_parameters()."""
+    weights = numpy.rint(weights).astype(int).tolist()
+    return {
+        "piece_values": {letter: weights[index] for index, letter in enumerate(feature_letters)},
+        "piece_square_tables": {letter: weights[6 + index * 64:6 + (index + 1) * 64]
+                                for index, letter in enumerate(feature_letters)},
+        "doubled_pawn_penalty": -weights[doubled_column],
+        "isolated_pawn_penalty": -weights[isolated_column],
+        "passed_pawn_bonus": weights[passed_columns],
+    }
+
+
+def load_positions(paths, limit=None):
+    """
+    This function loads labeled positions from export.py shards and builds their
+    feature matrix.
+    :param paths: shard files, or directories of shard files.
+    :param limit: optional maximum number of positions.
+    :return: (features, labels): int8 (N, feature_count) and float32 (N,) of
+        the game results, 1 for a white win, 0.5 for a draw and 0 for a loss.
+    """
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.npz"))) if os.path.isdir(path) else [path])
+
+    features = []
+    labels = []
+    total = 0
+    for path in files:
+        if limit is not None and total >= limit:
+            break
+        with numpy.load(path) as shard:
+            planes = shard["planes"]
+            results = shard["results"]
+        if limit is not None:
+            planes = planes[:limit - total]
+            results = results[:limit - total]
+        features.append(build_features(planes))
+        labels.append((results.astype(numpy.float32) + 1) / 2)
+        total += len(planes)
+
+    if not features:
+        return numpy.zeros((0, feature_count), dtype=numpy.int8), numpy.zeros(0, dtype=numpy.float32)
+    return numpy.concatenate(features), numpy.concatenate(labels)
+
+
+def get_loss(features, labels, weights, scale, gradient=False):
+    """
+    ------------------------------------
+    This function returns the mean squared error between the game results and
+    the expected results 1 / (1 + 10 ** (-scale * score / 400)), and
+    optionally its gradient with respect to the weights.
+    ------------------------------------
+    :param features: feature matrix from build_features().
+    :param labels: game results.
+    :param weights: weight vector.
+    :param scale: the scale of the logistic curve (the "K" of Texel tuning).
+    :param gradient: if True, the gradient is returned as well.
+    :return: the loss, or (loss, gradient vector).
+    """
+    weights32 = weights.astype(numpy.float32)
+    total = 0.0
+    slope = numpy.zeros(feature_count, dtype=numpy.float64)
+    for start in range(0, len(features), chunk_rows):
+        rows = features[start:start + chunk_rows].astype(numpy.float32)
+        expected = 1 / (1 + numpy.power(numpy.float32(10), -scale * (rows @ weights32) / 400))
+        error = expected - labels[start:start + chunk_rows]
+        total += float(numpy.dot(error, error))
+        if gradient:
+            slope += rows.T @ (error * expected * (1 - expected))
+    count = max(len(features), 1)
+    if not gradient:
+        return total / count
+    return total / count, slope * (2 * scale * numpy.log(10) / 400 / count)
+
+
+def fit_scale(features, labels, weights, low=0.1, high=4.0, steps=40):
+    """This function finds the logistic scale which gives the lowest loss for the
+    starting weights (golden section search)."""
+    ratio = (5 ** 0.5 - 1) / 2
+    for step in range(steps):
+        first = high - ratio * (high - low)
+        second = low + ratio * (high - low)
+        if get_loss(features, labels, weights, first) < get_loss(features, labels, weights, second):
+            high = second
+        else:
+            low = first
+    return (low + high) / 2
+
+
+def tune(features, labels, weights, scale, epochs=300, learning_rate=2.0, callback=None):
+    """
+    ------------------------------------
+    This function fits the weights with the Adam gradient method. The King's
+    piece value is left alone (both sides always have one King).
+    ------------------------------------
+    :param features: feature matrix from build_features().
+    :param labels: game results.
+    :param weights: starting weight vector.
+    :param scale: the logistic scale from fit_scale().
+    :param epochs: number of gradient steps (each over every position).
+    :param learning_rate: largest step of a weight per epoch, in centipawns.
+    :param callback: optional function called as callback(epoch, loss).
+    :return: the tuned weight vector.
+    """
+    weights = weights.astype(numpy.float64).copy()
+    frozen = numpy.zeros(feature_count, dtype=bool)
+    frozen[feature_letters.index("K")] = True
+    first_moment = numpy.zeros(feature_count)
+    second_moment = numpy.zeros(feature_count)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-12
+
+    for epoch in range(1, epochs + 1):
+        loss, slope = get_loss(features, labels, weights, scale, gradient=True)
+        slope[frozen] = 0
+        first_moment = beta1 * first_moment + (1 - beta1) * slope
+        second_moment = beta2 * second_moment + (1 - beta2) * slope * slope
+        step = (first_moment / (1 - beta1 ** epoch)) / (numpy.sqrt(second_moment / (1 - beta2 ** epoch)) + epsilon)
+        weights -= learning_rate * step
+        if callback is not None:
+            callback(epoch, loss)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune the evaluation weights to game results.")
+    parser.add_argument("shards", nargs="+", help="shard files or directories (see export.py)")
+    parser.add_argument("--epochs", type=int, default=300, help="number of gradient steps")
+    parser.add_argument("--learning-rate", type=float, default=2.0, help="largest step per epoch (centipawns)")
+    parser.add_argument("--limit", type=int, default=None, help="maximum number of positions")
+    parser.add_argument("--output", default=engine.parameters_path, help="file the tuned weights are written to")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    features, labels = load_positions(args.shards, args.limit)
+    if len(features) == 0:
+        print("no positions found")
+        return 1
+    print("positions: %d, feature matrix %.1f MB built in %.2f s" % (
+        len(features), features.nbytes / 1e6, time.perf_counter() - start_time))
+
+    weights = get_weight_vector(engine.get_parameters())
+    scale = fit_scale(features, labels, weights)
+    print("scale: %.3f  starting loss: %.6f" % (scale, get_loss(features, labels, weights, scale)))
+
+    def report(epoch, loss):
+        if epoch % 25 == 0 or epoch == args.epochs:
+            print("epoch %d: loss %.6f" % (epoch, loss))
+
+    start_time = time.perf_counter()
+    weights = tune(features, labels, weights, scale, args.epochs, args.learning_rate, report)
+    seconds = time.perf_counter() - start_time
+    parameters = get_parameters(weights)
+    print("final loss: %.6f (%.1f ms per epoch)" % (
+        get_loss(features, labels, get_weight_vector(parameters), scale), seconds / max(args.epochs, 1) * 1000))
+
+    temporary_path = args.output + ".tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(parameters, file, indent=1)
+    os.replace(temporary_path, args.output)
+    print("weights written to %s" % args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
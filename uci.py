@@ -0,0 +1,264 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: UCI (Universal Chess Interface) front end for Chess by Chris, so
+#   the engine can be driven by chess GUIs and tools like any other engine.
+#   Commands are read from stdin by an asyncio loop, while a search runs in its
+#   own thread. That way "stop", "isready" and "quit" are answered right away,
+#   even in the middle of a search.
+#
+#   Usage:
+#       python uci.py [--book book.bin] [--tablebases tablebases]
+
+import os
+import sys
+import asyncio
+import argparse
+import threading
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message would also go to stdout, where a GUI would read it as a UCI command.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import Board, start_fen
+from engine import Engine, mate_score, move_to_coordinates, coordinates_to_move
+from book import OpeningBook
+from tablebase import Tablebase
+
+engine_name = "Chess by Chris"
+engine_author = "Christian Castro"
+
+# Deepest search when a "go" command gives no depth (time or "stop" ends it).
+max_depth = 64
+
+# Share of the remaining clock time used for a move, when "go" gives no
+#   movestogo. A move also never uses more than half of the remaining time.
+default_moves_to_go = 30
+
+
+def get_time_limit(options, color):
+    """
+    This function works out how long to search for from the "go" options.
+    :param options: dictionary of the "go" command's options, i.e.
+        {"wtime": 60000, "winc": 1000}. Times are in milliseconds.
+    :param color: the player to move, "W" or "B".
+    :return: number of seconds, or None to search without a time limit.
+    """
+    if "movetime" in options:
+        return options["movetime"] / 1000.0
+
+    time_left = options.get("wtime" if color == "W" else "btime")
+    if time_left is None:
+        return None
+    increment = options.get("winc" if color == "W" else "binc", 0)
+    moves_to_go = options.get("movestogo") or default_moves_to_go
+    budget = time_left / moves_to_go + increment / 2
+    return max(min(budget, time_left / 2), 1) / 1000.0
+
+
+def format_score(score):
+    """This function returns a search score as UCI "cp N" or "mate N" (in moves)."""
+    if abs(score) >= mate_score - max_depth * 2:
+        plies = mate_score - abs(score)
+        moves = (plies + 1) // 2
+        return "mate %d" % (moves if score > 0 else -moves)
+    return "cp %d" % score
+
+
+class UCIEngine:
+    """
+    Class UCIEngine represents a UCI session: the Board() set up by "position"
+    commands and the search started by "go" commands.
+    ----------------------------------
+    Only one search runs at a time. It runs in a separate thread and stops when
+    its stop event is set, printing "bestmove" when it is done.
+    """
+    def __init__(self, output=None, book=None, tablebase=None):
+        """
+        Constructor method for class UCIEngine.
+        :param output: file object the responses are written to (stdout by default).
+        :param book: optional OpeningBook() the engine plays from.
+        :param tablebase: optional Tablebase() the engine plays endings from.
+        """
+        self._output = output if output is not None else sys.stdout
+        self._output_lock = threading.Lock()
+        self._board = Board()
+        self._board.generate_board()
+        self._board.set_verbose(False)
+        self._engine = Engine(book=book, tablebase=tablebase)
+        self._search_thread = None
+        self._stop_event = threading.Event()
+
+    def send(self, line):
+        """This class method writes a response line (the search thread and the
+        command loop both write, so the lines are never mixed up)."""
+        with self._output_lock:
+            self._output.write(line + "\n")
+            self._output.flush()
+
+    def get_board(self):
+        """This class method returns the Board() object."""
+        return self._board
+
+    def is_searching(self):
+        """This class method returns True while a search is running."""
+        return self._search_thread is not None and self._search_thread.is_alive()
+
+    def handle(self, line):
+        """
+        ------------------------------------
+        This class method handles a single UCI command.
+        ------------------------------------
+        :param line: the command line.
+        :return: False once the session should end ("quit"), else True.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command = tokens[0]
+
+        if command == "uci":
+            self.send("id name " + engine_name)
+            self.send("id author " + engine_author)
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self._board.set_fen(start_fen)
+            self._engine.get_pawn_table().clear()
+        elif command == "position":
+            self.stop()
+            self.set_position(tokens[1:])
+        elif command == "go":
+            self.stop()
+            self.go(tokens[1:])
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def set_position(self, tokens):
+        """
+        This class method handles "position [startpos | fen FEN] [moves ...]".
+        :param tokens: the command's tokens after "position".
+        :return: None
+        """
+        if "moves" in tokens:
+            moves = tokens[tokens.index("moves") + 1:]
+            tokens = tokens[:tokens.index("moves")]
+        else:
+            moves = []
+
+        try:
+            if tokens and tokens[0] == "fen":
+                self._board.set_fen(" ".join(tokens[1:]))
+            else:
+                self._board.set_fen(start_fen)
+            for move in moves:
+                if self._board.make_encoded_move(coordinates_to_move(self._board, move)) is not True:
+                    raise ValueError("Illegal move: " + move)
+        except ValueError as error:
+            self.send("info string " + str(error))
+
+    def go(self, tokens):
+        """
+        This class method handles "go" and starts the search thread.
+        :param tokens: the command's tokens after "go", i.e. ["wtime", "60000",
+            "btime", "60000"] or ["depth", "4"] or ["infinite"].
+        :return: None
+        """
+        options = {}
+        for index in range(len(tokens)):
+            if tokens[index] in ("wtime", "btime", "winc", "binc", "movestogo", "movetime", "depth", "nodes"):
+                try:
+                    options[tokens[index]] = int(tokens[index + 1])
+                except (IndexError, ValueError):
+                    pass
+
+        if "infinite" in tokens:
+            time_limit = None
+        else:
+            time_limit = get_time_limit(options, self._board.get_active_p())
+        depth = options.get("depth")
+        if depth is None:
+            depth = max_depth if time_limit is not None or "infinite" in tokens or "nodes" in options \
+                else self._engine.get_depth()
+
+        self._stop_event = threading.Event()
+        self._search_thread = threading.Thread(
+            target=self.search, args=(depth, time_limit, options.get("nodes"), self._stop_event), daemon=True)
+        self._search_thread.start()
+
+    def search(self, depth, time_limit, node_limit, stop_event):
+        """This class method runs in the search thread. It sends an "info" line
+        after each finished depth and "bestmove" at the end."""
+        def report(current_depth, score, nodes, seconds, code):
+            nps = int(nodes / seconds) if seconds > 0 else 0
+            self.send("info depth %d score %s nodes %d nps %d time %d pv %s" % (
+                current_depth, format_score(score), nodes, nps, int(seconds * 1000), move_to_coordinates(code)))
+
+        code, score = self._engine.search(self._board, depth, time_limit, node_limit, stop_event, report)
+        pawn_table = self._engine.get_pawn_table()
+        self.send("info string pawn hash hits %d misses %d (%.1f%%)" % (
+            pawn_table.get_hits(), pawn_table.get_misses(), 100 * pawn_table.get_hit_rate()))
+        self.send("bestmove " + (move_to_coordinates(code) if code is not None else "0000"))
+
+    def wait(self):
+        """This class method waits for a running search to finish by itself."""
+        if self._search_thread is not None:
+            self._search_thread.join()
+            self._search_thread = None
+
+    def stop(self):
+        """This class method stops a running search and waits for it to send its
+        "bestmove"."""
+        if self._search_thread is not None:
+            self._stop_event.set()
+            self._search_thread.join()
+            self._search_thread = None
+
+
+async def read_commands(session):
+    """
+    This coroutine reads commands from stdin and hands them to the session until
+    "quit" or the end of the input. Reading happens in the event loop's default
+    thread pool, so the loop never blocks on stdin.
+    :param session: UCIEngine() object.
+    :return: None
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        if session.handle(line.strip()) is False:
+            return
+
+    # At the end of the input, a search that is still running (i.e. "go depth
+    #   5" piped in from a file) is allowed to finish.
+    await loop.run_in_executor(None, session.wait)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the engine as a UCI engine on stdin/stdout.")
+    parser.add_argument("--book", default=None, help="opening book file (see book.py)")
+    parser.add_argument("--tablebases", default=None, help="directory of endgame tables (see tablebase.py)")
+    args = parser.parse_args(argv)
+
+    book = OpeningBook(args.book) if args.book is not None else None
+    tablebase = Tablebase(args.tablebases) if args.tablebases is not None else None
+    session = UCIEngine(book=book, tablebase=tablebase)
+    try:
+        asyncio.run(read_commands(session))
+    finally:
+        if book is not None:
+            book.close()
+        if tablebase is not None:
+            tablebase.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
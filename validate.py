@@ -0,0 +1,275 @@
+# Author: Christian Castro (Github: gvmmybear)
+# Date of Last Modification: 10/19/2026
+# Description: Bulk move validation for Chess by Chris. Front ends send batches of
+#   (position, move) requests, and each one is answered with whether the move is
+#   legal and, if it is, the position it leads to:
+#       {"fen": "rnbqkbnr/... w KQkq - 0 1", "move": "e2e4"}
+#           -> {"legal": true, "fen": "rnbqkbnr/... b KQkq e3 0 1"}
+#       {"fen": "rnbqkbnr/... w KQkq - 0 1", "move": "e2e5"}
+#           -> {"legal": false, "error": "illegal move: e2e5"}
+#   A request's "id" (if it has one) is copied into its answer.
+#
+#   Instead of a new Board() and a full make_move() per request, one Board() is
+#   reused for every request: the position is only set up again when it differs
+#   from the one before (batches often hold many moves for the same position),
+#   only the moving piece's moves are scanned, the move is made as a simulation
+#   (which leaves out the checkmate scan) and then taken back with undo_move().
+#   Large batches can be shared out between worker processes.
+#
+#   Usage:
+#       python validate.py requests.jsonl [--output results.jsonl] [--workers 4]
+#       python validate.py --benchmark 20000
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# No window is ever opened, so pygame does not need a real display. Its welcome
+#   message is hidden as well, so it does not end up in the output.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from main import Board, start_fen
+from engine import coordinates_to_move, move_to_coordinates
+from movelog import decode_move, get_promotion_letter
+
+# Requests handed to a worker at a time. Chunks are cut from the batch in
+#   order, so requests for the same position mostly stay together.
+chunk_requests = 2048
+
+# The MoveValidator() of a worker process (see init_worker()).
+_worker_validator = None
+
+
+class MoveValidator:
+    """
+    Class MoveValidator represents a reusable Board() for validating moves, and
+    the number of requests it has answered.
+    """
+    def __init__(self):
+        """Constructor method for class MoveValidator."""
+        self._board = Board.from_fen(start_fen)
+        self._board.set_verbose(False)
+        self._fen = start_fen
+        self._requests = 0
+        self._seconds = 0.0
+
+    def get_requests(self):
+        """This class method returns the number of requests validated."""
+        return self._requests
+
+    def get_seconds(self):
+        """This class method returns the time spent validating, in seconds."""
+        return self._seconds
+
+    def get_requests_per_sec(self):
+        """This class method returns the number of requests validated per second."""
+        return self._requests / self._seconds if self._seconds else 0.0
+
+    def validate_move(self, fen, move):
+        """
+        ------------------------------------
+        This class method checks a single move. A move is legal if the active
+        player's piece stands on the starting square, the move is one of the
+        piece's moves, and it does not leave the player's own King in check.
+        ------------------------------------
+        :param fen: FEN string of the position.
+        :param move: the move in coordinate notation, i.e. "e2e4" or "e7e8q".
+        :return: the resulting FEN string if the move is legal. Raises
+            ValueError (with the reason) if it is not.
+        """
+        board = self._board
+        if fen != self._fen:
+            # The FEN is forgotten first, so a FEN which cannot be set up is not
+            #   taken for the board's position by the next request.
+            self._fen = None
+            board.set_fen(fen)
+            self._fen = fen
+
+        code = coordinates_to_move(board, move)
+        start, end, flags = decode_move(code)
+        piece = board.get_board()[start[0]][start[1]].get_occupant()
+        if piece is None or piece.get_color() != board.get_active_p() or \
+                code not in board.scan_for_moves(start[0], start[1]):
+            raise ValueError("illegal move: " + move)
+        if board.make_move(start, end, True, get_promotion_letter(flags) or "Q") is not True:
+            raise ValueError("illegal move: " + move)
+        result = board.to_fen()
+        board.undo_move()
+        return result
+
+    def validate(self, requests):
+        """
+        This class method validates a batch of requests.
+        :param requests: list of {"fen": ..., "move": ...} dictionaries.
+        :return: list of answers, in the same order (see the top of this file).
+        """
+        start_time = time.perf_counter()
+        answers = []
+        for request in requests:
+            # A request which is not a dictionary (i.e. a list or a number in a
+            #   JSON batch) is answered like any other bad request.
+            if not isinstance(request, dict):
+                answers.append({"legal": False, "error": "invalid request"})
+                continue
+            try:
+                answer = {"legal": True, "fen": self.validate_move(str(request.get("fen", "")),
+                                                                   str(request.get("move", "")))}
+            except (ValueError, IndexError, KeyError) as error:
+                answer = {"legal": False, "error": str(error) or "invalid request"}
+            if "id" in request:
+                answer["id"] = request["id"]
+            answers.append(answer)
+        self._requests += len(requests)
+        self._seconds += time.perf_counter() - start_time
+        return answers
+
+
+def init_worker():
+    """This function is run once in each worker process. It creates the
+    MoveValidator() the worker answers all of its requests with."""
+    global _worker_validator
+    _worker_validator = MoveValidator()
+
+
+def validate_chunk(requests):
+    """This function validates a chunk of requests in a worker process."""
+    return _worker_validator.validate(requests)
+
+
+def validate_batch(requests, workers=1, validator=None):
+    """
+    ------------------------------------
+    This function validates a batch of requests, either on one MoveValidator()
+    or shared out between a pool of worker processes.
+    ------------------------------------
+    :param requests: list of {"fen": ..., "move": ...} dictionaries.
+    :param workers: number of worker processes (1 validates in this process).
+    :param validator: optional MoveValidator() to use when workers is 1.
+    :return: (list of answers, dictionary with requests, legal, seconds and
+        requests_per_sec).
+    """
+    start_time = time.perf_counter()
+    if workers <= 1 or len(requests) <= chunk_requests:
+        answers = (validator or MoveValidator()).validate(requests)
+    else:
+        chunks = [requests[index:index + chunk_requests] for index in range(0, len(requests), chunk_requests)]
+        answers = []
+        with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+            for chunk_answers in pool.map(validate_chunk, chunks):
+                answers.extend(chunk_answers)
+    seconds = time.perf_counter() - start_time
+    return answers, {
+        "requests": len(requests),
+        "legal": sum(1 for answer in answers if answer["legal"]),
+        "seconds": seconds,
+        "requests_per_sec": len(requests) / seconds if seconds else 0.0,
+    }
+
+
+def random_requests(count, seed=0, max_plies=80):
+    """This function returns requests from the positions of random games: for each
+    position a few legal moves, and a move which is not legal."""
+    generator = random.Random(seed)
+    board = Board.from_fen(start_fen)
+    board.set_verbose(False)
+    requests = []
+    plies = 0
+    while len(requests) < count:
+        buffer, moves = board.generate_legal_moves(board.get_active_p())
+        if moves == 0 or plies >= max_plies:
+            board.set_fen(start_fen)
+            plies = 0
+            continue
+        fen = board.to_fen()
+        for index in generator.sample(range(moves), min(moves, 3)):
+            requests.append({"fen": fen, "move": move_to_coordinates(buffer[index])})
+        # The King moving onto its own piece's square, or a move from an empty
+        #   square, is never legal.
+        requests.append({"fen": fen, "move": "e1e2" if board.get_active_p() == "W" else "e8e7"})
+        board.make_encoded_move(buffer[generator.randrange(moves)], simulation=True)
+        plies += 1
+    return requests[:count]
+
+
+def validate_naive(requests):
+    """This function validates requests the way they were validated before: a new
+    Board() and a full make_move() for each request."""
+    answers = []
+    for request in requests:
+        try:
+            board = Board()
+            board.set_verbose(False)
+            board.generate_board(request["fen"])
+            code = coordinates_to_move(board, request["move"])
+            start, end, flags = decode_move(code)
+            if board.make_move(start, end, promotion=get_promotion_letter(flags) or "Q") is not True:
+                raise ValueError("illegal move: " + request["move"])
+            answers.append({"legal": True, "fen": board.to_fen()})
+        except (ValueError, IndexError, KeyError) as error:
+            answers.append({"legal": False, "error": str(error)})
+    return answers
+
+
+def benchmark(count=20000, workers=1, seed=0):
+    """
+    This function measures batch validation against a new Board() per request,
+    and checks that both give the same answers.
+    :param count: number of requests.
+    :param workers: number of worker processes for the batch validation.
+    :param seed: random seed for the games the positions come from.
+    :return: dictionary with requests, naive_per_sec, batch_per_sec and
+        mismatches.
+    """
+    requests = random_requests(count, seed)
+    start_time = time.perf_counter()
+    expected = validate_naive(requests)
+    naive_seconds = time.perf_counter() - start_time
+    answers, stats = validate_batch(requests, workers)
+    mismatches = sum(1 for first, second in zip(expected, answers)
+                     if first["legal"] != second["legal"] or first.get("fen") != second.get("fen"))
+    return {
+        "requests": count,
+        "naive_per_sec": count / naive_seconds if naive_seconds else 0.0,
+        "batch_per_sec": stats["requests_per_sec"],
+        "mismatches": mismatches,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate batches of (position, move) requests.")
+    parser.add_argument("requests", nargs="?", help="file of JSON requests, one per line")
+    parser.add_argument("--output", default=None, help="file the answers are written to (default: stdout)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--benchmark", type=int, default=None, help="compare with a new Board() per request")
+    args = parser.parse_args(argv)
+
+    if args.benchmark is not None:
+        stats = benchmark(args.benchmark, args.workers)
+        print("requests: %d (%d answers differ)" % (stats["requests"], stats["mismatches"]))
+        print("new Board() per request: %.0f requests/sec" % stats["naive_per_sec"])
+        print("batch: %.0f requests/sec" % stats["batch_per_sec"])
+        return
+    if args.requests is None:
+        parser.error("a requests file (or --benchmark) is needed")
+
+    with open(args.requests) as file:
+        requests = [json.loads(line) for line in file if line.strip()]
+    answers, stats = validate_batch(requests, args.workers)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for answer in answers:
+            output.write(json.dumps(answer) + "\n")
+    finally:
+        if args.output:
+            output.close()
+    print("requests: %d (%d legal)  time: %.2f s (%.0f requests/sec)" % (
+        stats["requests"], stats["legal"], stats["seconds"], stats["requests_per_sec"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())